@@ -6,29 +6,123 @@ See documentation in :ref:`declaring-loaders`.
 
 from __future__ import annotations
 
+import asyncio
+import dataclasses
+import re
+from collections.abc import Awaitable
 from contextlib import suppress
-from typing import TYPE_CHECKING, Any, Protocol
+from functools import lru_cache, partial
+from inspect import isawaitable
+from types import FunctionType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ClassVar,
+    NamedTuple,
+    NoReturn,
+    Protocol,
+    TypeGuard,
+)
 
 from itemadapter import ItemAdapter
-from parsel import Selector  # noqa: TC002  # for sphinx
-from parsel.utils import extract_regex, flatten
-
-from itemloaders.common import wrap_loader_context
-from itemloaders.processors import Identity
-from itemloaders.utils import arg_to_iter
+from lxml import etree
+from parsel import Selector, SelectorList
+from parsel.utils import flatten
+from w3lib.html import replace_entities
+
+from itemloaders.cache import (
+    ExtractionCache,
+    _getall,
+    _getall_each,
+    _search,
+    _search_result,
+    _select,
+)
+from itemloaders.common import (
+    is_async,
+    is_impure,
+    takes_loader_context,
+    wrap_loader_context,
+)
+from itemloaders.processors import Identity, MapCompose, TakeFirst, simplify
+from itemloaders.sources import JSONDocument, _guess_type, _parse_markup, _read_file
+from itemloaders.utils import _is_iterable_class, _iterable_classes, arg_to_iter
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Iterable, MutableMapping
+    import mmap
+    from collections.abc import Callable, Iterable, Iterator, Mapping, MutableMapping
+    from io import BufferedIOBase
+    from os import PathLike
     from re import Pattern
+    from typing import IO
 
     # typing.Self requires Python 3.11
-    from typing_extensions import Self
+    from typing_extensions import Buffer, Self
 
 
 class _StatsCollector(Protocol):
     def inc_value(self, key: str, count: int = 1) -> None: ...
 
 
+class _FieldProcessors(NamedTuple):
+    """The processors of a field that a loader class resolved for an item
+    class, as declared and as simplified. A processor is ``None`` when it can
+    only be resolved through the loader instance, e.g. because it is a
+    method."""
+
+    input_processor: Callable[..., Any] | None
+    output_processor: Callable[..., Any] | None
+    simplified_input_processor: Callable[..., Any] | None
+    simplified_output_processor: Callable[..., Any] | None
+    # The class attributes that the processors were resolved from, and the
+    # functions of the declared processors, to resolve them again when any
+    # of those changes.
+    sources: tuple[Any, ...]
+
+
+class _DeferredRule(NamedTuple):
+    """A call to a method of *loader* that adds data to *field_name*, recorded
+    while :attr:`ItemLoader.defer_rules` is enabled."""
+
+    loader: ItemLoader
+    field_name: str
+    call: partial[Any]
+    # The context of *loader* when the call was made.
+    context: dict[str, Any]
+
+
+def _matches_context(snapshot: Mapping[str, Any], context: Mapping[str, Any]) -> bool:
+    """Tell whether *context* has the keys of *snapshot*, and only those, with
+    the same objects as values."""
+    return len(snapshot) == len(context) and all(
+        context.get(key, _MISSING) is value for key, value in snapshot.items()
+    )
+
+
+@lru_cache(maxsize=256)
+def _is_awaitable_class(cls: type) -> bool:
+    return issubclass(cls, Awaitable)
+
+
+def _close_awaitable(awaitable: Any) -> None:
+    """Close *awaitable* if it can be closed, e.g. a coroutine, which would
+    otherwise warn that it was never awaited."""
+    close = getattr(awaitable, "close", None)
+    if close is not None:
+        close()
+
+
+def _copy_value(value: Any) -> Any:
+    """Return a copy of *value* that later changes to *value* do not affect,
+    unless its items change."""
+    cls = value.__class__
+    if cls is dict:
+        return value.copy()
+    if cls is not tuple and (_iterable_classes.get(cls) or _is_iterable_class(cls)):
+        return list(value)
+    return value
+
+
 def unbound_method(method: Callable[..., Any]) -> Callable[..., Any]:
     """
     Allow to use single-argument functions as input or output processors
@@ -40,6 +134,98 @@ def unbound_method(method: Callable[..., Any]) -> Callable[..., Any]:
     return method
 
 
+_MISSING = object()
+
+# Types of output values that forks can share.
+_IMMUTABLE_TYPES = frozenset({str, bytes, int, float, bool, type(None)})
+
+# Methods whose deferred calls apply XPath expressions.
+_XPATH_METHODS = frozenset({"add_xpath", "replace_xpath", "add_first_xpath"})
+_JMES_METHODS = frozenset({"add_jmes", "replace_jmes", "add_first_jmes"})
+
+# Reaching this many patterns means that patterns are being built dynamically,
+# and caching each of them would grow the cache without bound.
+_MAX_CACHED_PATTERNS = 1000
+
+
+@lru_cache(maxsize=1024)
+def _get_attribute_field_names(item_class: type) -> frozenset[str] | None:
+    """Return the field names of *item_class* if it is a dataclass or an attrs
+    class, whose fields are stored as attributes, or ``None`` otherwise."""
+    if dataclasses.is_dataclass(item_class):
+        return frozenset(field.name for field in dataclasses.fields(item_class))
+    try:
+        import attr  # noqa: PLC0415
+    except ImportError:
+        return None
+    if attr.has(item_class):
+        return frozenset(attribute.name for attribute in attr.fields(item_class))
+    return None
+
+
+def _extract_regex(regex: Pattern[str], texts: Iterable[str]) -> list[str]:
+    """Return the strings that :func:`~parsel.utils.extract_regex` extracts
+    from each of *texts*, in a single pass over them."""
+    strings: list[str]
+    if "extract" in regex.groupindex:
+        strings = []
+        for match in map(regex.search, texts):
+            if match is not None:
+                extracted = match.group("extract")
+                if extracted is not None:
+                    strings.append(extracted)
+    elif regex.groups > 1:
+        strings = [
+            string
+            for text in texts
+            for groups in regex.findall(text)
+            for string in groups
+        ]
+    else:
+        strings = [string for text in texts for string in regex.findall(text)]
+    return [
+        replace_entities(string, keep=["lt", "amp"]) if "&" in string else string
+        for string in strings
+    ]
+
+
+def _get_class_attr(cls: type, name: str) -> Any:
+    """Return the attribute *name* of *cls* as stored in the class namespace,
+    i.e. without invoking descriptors, or ``_MISSING``."""
+    for klass in cls.__mro__:
+        if name in klass.__dict__:
+            return klass.__dict__[name]
+    return _MISSING
+
+
+def _lookup_namespaces(namespaces: tuple[Mapping[str, Any], ...], name: str) -> Any:
+    """Return the attribute *name* as :func:`_get_class_attr` does, from the
+    namespaces of the classes in the ``__mro__`` of a class, or ``None``.
+
+    Unlike :func:`getattr`, this does not raise and catch an error for
+    missing attributes, which are common for processor attributes."""
+    for namespace in namespaces:
+        if name in namespace:
+            return namespace[name]
+    return None
+
+
+def _get_class_processor(cls: type, name: str) -> Any:
+    """Return what :func:`unbound_method` would return for the attribute
+    *name* of any instance of *cls* that does not override it, or ``None`` if
+    it depends on the instance."""
+    attr = _get_class_attr(cls, name)
+    if attr is _MISSING:
+        return _MISSING
+    if isinstance(attr, FunctionType):
+        # Functions become methods of the instance, and unbound_method only
+        # turns them back into functions if they are not defined in a class.
+        return attr if "." not in attr.__qualname__ else None
+    if hasattr(type(attr), "__get__"):
+        return None
+    return unbound_method(attr)
+
+
 class ItemLoader:
     """
     Return a new Item Loader for populating the given item. If no item is
@@ -60,12 +246,24 @@ class ItemLoader:
         (resp. :meth:`replace_css`, :meth:`replace_jmes`) method.
     :type selector: :class:`~parsel.selector.Selector` object
 
+    :param python_data: Python data, e.g. the result of :func:`json.loads`, to extract
+        data from with :meth:`add_jmes`, :meth:`replace_jmes`,
+        :meth:`add_first_jmes`, :meth:`get_jmes` and :meth:`nested_jmes`,
+        instead of the selector, or a :class:`~itemloaders.sources.JSONDocument`
+        to parse only as far as those methods need. See :ref:`python-data`.
+        Unlike the item and selector, it is not assigned to the Loader
+        context.
+
     The item, selector and the remaining keyword arguments are
     assigned to the Loader context (accessible through the :attr:`context` attribute).
 
     Pass *stats* to keep track of which parsing rules are being used, as
     described in :ref:`rule-usage`.
 
+    Pass an :class:`~itemloaders.cache.ExtractionCache` as *extraction_cache*
+    to share the strings that parsing rules extract with other loaders that
+    read from the same page, as described in :ref:`extraction-cache`.
+
     .. attribute:: item
 
         The item object being parsed by this Item Loader.
@@ -109,18 +307,62 @@ class ItemLoader:
         The default output processor to use for those fields which don't specify
         one.
 
+    .. attribute:: stop_on_first_value
+
+        Whether fields with a :class:`~itemloaders.processors.TakeFirst`
+        output processor stop collecting data once they have a value for it,
+        ``False`` by default. See :ref:`stop-on-first-value`.
+
+    .. attribute:: defer_rules
+
+        Whether the methods that add data to a field only record the call, to
+        run it when :meth:`load_item` needs that field, ``False`` by default.
+        See :ref:`deferred-rules`.
+
+    .. attribute:: adaptive_rule_order
+
+        Whether :meth:`add_first_xpath`, :meth:`add_first_css` and
+        :meth:`add_first_jmes` try the rules that matched most often for this
+        loader class first, ``False`` by default.
+
     .. attribute:: selector
 
         The :class:`~parsel.selector.Selector` object to extract data from.
         It's the selector given in the ``__init__`` method.
         This attribute is meant to be read-only.
 
+    .. attribute:: python_data
+
+        The Python data to extract data from with JMESPath expressions.
+        It's the data given in the ``__init__`` method.
+        This attribute is meant to be read-only.
+
     .. _parsel: https://parsel.readthedocs.io/en/latest/
     """
 
+    # Each loader class gets its own tables, see __init_subclass__().
+    # The namespaces of the classes in __mro__, which reflect later changes
+    _namespaces: ClassVar[tuple[Mapping[str, Any], ...]]
+    # The processors that the class resolved per item class and field name
+    _processor_tables: ClassVar[dict[type, dict[str, _FieldProcessors]]] = {}
+    # [times used, times matched] per (field name, rule type, rule)
+    _rule_usage: ClassVar[dict[tuple[str | None, str, str], list[int]]] = {}
+    # Compiled patterns of the re arguments given as strings
+    _patterns: ClassVar[dict[str, Pattern[str]]] = {}
+
     default_item_class: type = dict
     default_input_processor: Callable[..., Any] = Identity()
     default_output_processor: Callable[..., Any] = Identity()
+    stop_on_first_value: bool = False
+    adaptive_rule_order: bool = False
+    defer_rules: bool = False
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._namespaces = tuple(klass.__dict__ for klass in cls.__mro__)
+        cls._processor_tables = {}
+        cls._rule_usage = {}
+        cls._patterns = {}
 
     def __init__(
         self,
@@ -128,40 +370,102 @@ class ItemLoader:
         selector: Selector | None = None,
         parent: ItemLoader | None = None,
         stats: _StatsCollector | None = None,
+        extraction_cache: ExtractionCache | None = None,
+        python_data: Any = None,
         **context: Any,
     ):
         self.selector: Selector | None = selector
+        self.python_data: Any = python_data
         self.stats: _StatsCollector | None = (
             stats if stats is not None or parent is None else parent.stats
         )
+        self.extraction_cache: ExtractionCache | None = (
+            extraction_cache
+            if extraction_cache is not None or parent is None
+            else parent.extraction_cache
+        )
         context.update(selector=selector)
         # An item built here has no data, only the field defaults of its class,
         # which must not be mistaken for loaded values.
         has_initial_values = item is not None
         if item is None:
             item = self.default_item_class()
-        self._local_item = item
         context["item"] = item
         self.context: MutableMapping[str, Any] = context
         self.parent: ItemLoader | None = parent
-        self._local_values: dict[str, list[Any]] = {}
+        # Nested loaders bind the item and the values of their root loader
+        # here, instead of looking them up through their parents every time.
+        self._root: ItemLoader
+        self._values: dict[str, list[Any]]
+        if parent is None:
+            self._root = self
+            self._local_item = item
+            self._values = {}
+        else:
+            self._root = parent._root
+            self._local_item = self._root._local_item
+            self._values = self._root._values
+        # Only used in the root loader.
+        self._local_adapter: ItemAdapter | None = None
+        # Input and output processors wrapped with wrap_loader_context for
+        # _bound_context, indexed by field name and processor type.
+        self._bound_context: MutableMapping[str, Any] = context
+        self._bound_processors: dict[
+            tuple[str, str], tuple[Callable[..., Any], Callable[..., Any]]
+        ] = {}
+        # Calls recorded by defer_rules, only used in the root loader.
+        self._deferred_rules: list[_DeferredRule] = []
+        # Copy of the context recorded with deferred calls, reused while the
+        # context does not change.
+        self._deferred_context: dict[str, Any] | None = None
+        # Fields to which input processors added awaitables, which
+        # load_item() cannot load, only used in the root loader.
+        self._awaitable_fields: set[str] = set()
+        self._running_deferred_rules = False
+        # Memory map of the file that from_file() read the data from, closed
+        # once the item is loaded.
+        self._mapping: mmap.mmap | None = None
+        # Fields whose collected values are shared with forks, only used in
+        # the root loader. Their lists are copied before adding values to them.
+        self._shared_fields: set[str] = set()
+        # Output values of shared fields, as (collected values, output
+        # processor, output value) by field name, shared with forks.
+        self._shared_outputs: dict[str, tuple[list[Any], Any, Any]] = {}
+        # Output values of fields whose collected values did not change since
+        # they were computed, only used in the root loader, as (output
+        # processor, its functions, context snapshot, output value) by field
+        # name. Collecting or replacing values of a field drops its entry.
+        self._outputs: dict[str, tuple[Any, Any, dict[str, Any] | None, Any]] = {}
+        # Values of the initial item, by field name, that are not collected
+        # yet, only used in the root loader. Each field is collected the first
+        # time that values are added to it or its collected values are needed.
+        self._initial_values: dict[str, Any] = {}
         if has_initial_values:
-            for field_name, value in ItemAdapter(item).items():
-                self._values.setdefault(field_name, [])
-                self._values[field_name] += arg_to_iter(value)
-
-    @property
-    def _values(self) -> dict[str, list[Any]]:
-        if self.parent is not None:
-            return self.parent._values
-        return self._local_values
+            initial_values: Iterable[tuple[str, Any]]
+            if item.__class__ is dict:
+                initial_values = item.items()
+            elif item is self._local_item:
+                initial_values = self._adapter.items()
+            else:
+                # The adapter wraps the item of the root loader.
+                initial_values = ItemAdapter(item).items()
+            if parent is None:
+                self._initial_values = dict(initial_values)
+            elif item is not self._local_item:
+                for field_name, value in initial_values:
+                    self._collect(field_name, arg_to_iter(value))
 
     @property
     def item(self) -> Any:
-        if self.parent is not None:
-            return self.parent.item
         return self._local_item
 
+    @property
+    def _adapter(self) -> ItemAdapter:
+        root = self._root
+        if root._local_adapter is None:
+            root._local_adapter = ItemAdapter(root._local_item)
+        return root._local_adapter
+
     def nested_xpath(self, xpath: str, **context: Any) -> Self:
         """
         Create a nested loader with an xpath selector.
@@ -172,7 +476,7 @@ class ItemLoader:
         """
         self._check_selector_method()
         assert self.selector is not None
-        selector = self.selector.xpath(xpath)
+        selector = _select(self.selector, "xpath", xpath)
         context.update(selector=selector)
         return self.__class__(item=self.item, parent=self, **context)
 
@@ -186,10 +490,197 @@ class ItemLoader:
         """
         self._check_selector_method()
         assert self.selector is not None
-        selector = self.selector.css(css)
+        selector = _select(self.selector, "css", css)
         context.update(selector=selector)
         return self.__class__(item=self.item, parent=self, **context)
 
+    def nested_jmes(self, jmes: str, **context: Any) -> Self:
+        """
+        Create a nested loader with a JMESPath expression.
+        The supplied expression is applied relative to the data, or the
+        selector, associated with this :class:`ItemLoader`. The nested loader
+        shares the item with the parent :class:`ItemLoader` so calls to
+        :meth:`add_jmes`, :meth:`add_value`, :meth:`replace_value`, etc. will
+        behave as expected.
+
+        The data of a nested loader is the result of *jmes* as is, e.g. a
+        list for ``offers``. With a selector, the rules of the nested loader
+        are applied to each of the values of that list instead. If *jmes*
+        matches nothing, the rules of the nested loader match nothing either,
+        with data as with a selector.
+        """
+        self._check_jmespath_method()
+        if isinstance(self.python_data, JSONDocument):
+            document = self.python_data._nested(jmes)
+            return self.__class__(
+                item=self.item, parent=self, python_data=document, **context
+            )
+        if self.python_data is not None:
+            data = _search_result(self.python_data, jmes)
+            if data is not None:
+                return self.__class__(
+                    item=self.item, parent=self, python_data=data, **context
+                )
+            # As with a selector, which selects no node.
+            selector: SelectorList[Any] = SelectorList([])
+        else:
+            assert self.selector is not None
+            selector = _select(self.selector, "jmes", jmes)
+        context.update(selector=selector)
+        return self.__class__(item=self.item, parent=self, **context)
+
+    def fork(self, item: Any = None, **context: Any) -> Self:
+        """
+        Return a new loader of this class for a new item, e.g. a variant of a
+        product, that starts with the values collected so far for the item
+        of this loader.
+
+        The new loader shares the selector, the data, the stats and the
+        extraction cache of this loader, and its context, updated with
+        *context*. *item* is the item of the new loader, a new item of
+        :attr:`default_item_class` by default.
+
+        Collected values are not copied: the lists of values of each field
+        are shared until either loader adds values to that field, or returns
+        them from :meth:`get_collected_values`, which copies its list first. Output processors that do not take the loader
+        context are only run once for the shared values of a field, as long
+        as they return a string, a number, ``None`` or bytes.
+
+        If :attr:`defer_rules` is enabled, the recorded calls run first, so
+        that the new loader shares their values too.
+
+        See :ref:`forking-loaders`.
+        """
+        root = self._root
+        if root.defer_rules:
+            root._run_deferred_rules(None)
+        context = {
+            **{
+                key: value
+                for key, value in self.context.items()
+                if key not in ("item", "selector")
+            },
+            **context,
+        }
+        loader = self.__class__(
+            item=item,
+            selector=self.selector,
+            stats=self.stats,
+            extraction_cache=self.extraction_cache,
+            python_data=self.python_data,
+            **context,
+        )
+        values = loader._values
+        initial_values = loader._initial_values
+        for field_name, field_values in root._values.items():
+            if field_name in initial_values:
+                # Values of the given item.
+                values[field_name] = [
+                    *field_values,
+                    *arg_to_iter(initial_values.pop(field_name)),
+                ]
+                continue
+            values[field_name] = field_values
+            loader._shared_fields.add(field_name)
+            root._shared_fields.add(field_name)
+        for field_name, value in list(root._initial_values.items()):
+            if value.__class__ is list:
+                # Items must not share the list.
+                value = value[:]  # noqa: PLW2901
+            else:
+                # Iterators can only be read once, so both loaders collect
+                # their values now.
+                root._collect(field_name, ())
+                value = root._values[field_name][:]  # noqa: PLW2901
+            if field_name in initial_values:
+                values[field_name] = [
+                    *value,
+                    *arg_to_iter(initial_values.pop(field_name)),
+                ]
+            else:
+                initial_values[field_name] = value
+        loader._shared_outputs = root._shared_outputs
+        return loader
+
+    def iter_nested_xpath(
+        self, xpath: str, rules: Mapping[str, str | Iterable[str]], **context: Any
+    ) -> Iterator[Any]:
+        """
+        Load an item from each node that *xpath* selects, relative to the
+        selector associated with this :class:`ItemLoader`, and return an
+        iterator over those items.
+
+        *rules* maps field names to an XPath expression relative to each node,
+        or an iterable of them. Each item is the same as if a new loader of
+        this class, with the node as selector and *context* as context, got
+        the rules of each field through :meth:`add_xpath`. Each expression is
+        evaluated on all nodes first, and the items share a single loader, so
+        that the processors of each field are only resolved once.
+
+        See :ref:`row-extraction`.
+        """
+        self._check_selector_method()
+        assert self.selector is not None
+        rows = _select(self.selector, "xpath", xpath)
+        return self._iter_rows(rows, "xpath", rules, context)
+
+    def iter_nested_css(
+        self, css: str, rules: Mapping[str, str | Iterable[str]], **context: Any
+    ) -> Iterator[Any]:
+        """
+        Same as :meth:`iter_nested_xpath`, but with CSS selectors, for the
+        nodes and for *rules*, which are given to :meth:`add_css` instead.
+        """
+        self._check_selector_method()
+        assert self.selector is not None
+        rows = _select(self.selector, "css", css)
+        return self._iter_rows(rows, "css", rules, context)
+
+    def _iter_rows(
+        self,
+        rows: SelectorList[Any],
+        rule_type: str,
+        rules: Mapping[str, str | Iterable[str]],
+        context: dict[str, Any],
+    ) -> Iterator[Any]:
+        extraction_cache = self.extraction_cache
+        # The values of each rule for each row, by field.
+        rule_values = {
+            field_name: [
+                (
+                    rule,
+                    _getall_each(rows, rule_type, rule)
+                    if extraction_cache is None
+                    else [
+                        extraction_cache.getall(row, rule_type, rule) for row in rows
+                    ],
+                )
+                for rule in arg_to_iter(field_rules)
+            ]
+            for field_name, field_rules in rules.items()
+        }
+        loader = self.__class__(
+            stats=self.stats, extraction_cache=self.extraction_cache, **context
+        )
+        loader_context = loader.context
+        for index, row in enumerate(rows):
+            # Reset the loader for the item of the row, keeping the context
+            # object, and with it the processors bound to it.
+            item = loader.default_item_class()
+            loader._local_item = loader_context["item"] = item
+            loader._local_adapter = None
+            loader._values = {}
+            loader._outputs = {}
+            loader.selector = loader_context["selector"] = row
+            for field_name, field_rule_values in rule_values.items():
+                values = []
+                for rule, row_values in field_rule_values:
+                    values += loader._track_rule(
+                        field_name, rule_type, rule, row_values[index]
+                    )
+                loader.add_value(field_name, values)
+            yield loader.load_item()
+
     def add_value(
         self,
         field_name: str | None,
@@ -223,12 +714,22 @@ class ItemLoader:
             loader.add_value(None, {'name': 'foo', 'sex': 'male'})
 
         """
+        if self.defer_rules and self._defer(
+            partial(
+                self.add_value, field_name, _copy_value(value), *processors, re=re, **kw
+            )
+        ):
+            return self
         value = self.get_value(value, *processors, re=re, **kw)
         if value is None:
             return self
         if not field_name:
             for k, v in value.items():
-                self._add_value(k, v)
+                if self.defer_rules:
+                    # Defer the call of each field.
+                    self.add_value(k, v)
+                else:
+                    self._add_value(k, v)
         else:
             self._add_value(field_name, value)
         return self
@@ -248,12 +749,27 @@ class ItemLoader:
         :returns: The current ItemLoader instance for method chaining.
         :rtype: ItemLoader
         """
+        if self.defer_rules and self._defer(
+            partial(
+                self.replace_value,
+                field_name,
+                _copy_value(value),
+                *processors,
+                re=re,
+                **kw,
+            )
+        ):
+            return self
         value = self.get_value(value, *processors, re=re, **kw)
         if value is None:
             return self
         if not field_name:
             for k, v in value.items():
-                self._replace_value(k, v)
+                if self.defer_rules:
+                    # Defer the call of each field.
+                    self.replace_value(k, v)
+                else:
+                    self._replace_value(k, v)
         else:
             self._replace_value(field_name, value)
         return self
@@ -262,13 +778,63 @@ class ItemLoader:
         value = arg_to_iter(value)
         processed_value = self._process_input_value(field_name, value)
         if processed_value:
-            self._values.setdefault(field_name, [])
-            self._values[field_name] += arg_to_iter(processed_value)
+            if processed_value.__class__ is not list and _is_awaitable_class(
+                processed_value.__class__
+            ):
+                self._root._awaitable_fields.add(field_name)
+            self._collect(field_name, arg_to_iter(processed_value))
+
+    def _collect(self, field_name: str, values: Iterable[Any]) -> None:
+        """Add *values* to the collected values of *field_name*."""
+        outputs = self._root._outputs
+        if outputs:
+            outputs.pop(field_name, None)
+        collected = self._values.get(field_name)
+        if collected is None:
+            initial_values = self._root._initial_values
+            if initial_values and field_name in initial_values:
+                self._values[field_name] = [
+                    *arg_to_iter(initial_values.pop(field_name)),
+                    *values,
+                ]
+            else:
+                self._values[field_name] = list(values)
+            return
+        shared_fields = self._root._shared_fields
+        if shared_fields and field_name in shared_fields:
+            shared_fields.discard(field_name)
+            self._values[field_name] = collected + list(values)
+        else:
+            collected += values
 
     def _replace_value(self, field_name: str, value: Any) -> None:
-        self._values.pop(field_name, None)
+        self._drop_values(field_name)
         self._add_value(field_name, value)
 
+    def _drop_values(self, field_name: str) -> None:
+        """Remove the collected values of *field_name*."""
+        self._values.pop(field_name, None)
+        self._root._initial_values.pop(field_name, None)
+        self._root._outputs.pop(field_name, None)
+
+    def _get_values(self, field_name: str) -> list[Any]:
+        """Return the collected values of *field_name*, which must not be
+        modified, without collecting the value of the initial item."""
+        values = self._values.get(field_name)
+        if values is not None:
+            return values
+        initial_values = self._root._initial_values
+        if initial_values and field_name in initial_values:
+            value = initial_values[field_name]
+            if value.__class__ is list:
+                return value
+            # Iterators can only be read once.
+            values = self._values[field_name] = list(
+                arg_to_iter(initial_values.pop(field_name))
+            )
+            return values
+        return []
+
     def get_value(
         self,
         value: Any,
@@ -296,8 +862,7 @@ class ItemLoader:
         'FOO'
         """
         if re:
-            value = arg_to_iter(value)
-            value = flatten(extract_regex(re, x) for x in value)
+            value = _extract_regex(self._get_pattern(re), arg_to_iter(value))
 
         for proc in processors:
             if value is None:
@@ -313,28 +878,333 @@ class ItemLoader:
                 ) from e
         return value
 
-    def load_item(self) -> Any:
+    def load_item(self, fields: Iterable[str] | None = None) -> Any:
         """
         Populate the item with the data collected so far, and return it. The
         data collected is first passed through the :ref:`output processors
         <processors>` to get the final value to assign to each item field.
+
+        If *fields* is given, only those fields are populated.
+        """
+        if self.defer_rules:
+            self._run_deferred_rules(fields)
+        item = self.item
+        field_names = self._get_loaded_field_names(fields)
+        if self._root._awaitable_fields:
+            for field_name in field_names:
+                self._check_awaitable_values(field_name, "load_item")
+        set_value = self._get_value_setter(item, field_names)
+        initial_values = self._root._initial_values
+        for field_name in field_names:
+            if (
+                initial_values
+                and field_name in initial_values
+                and self._keeps_initial_value(item, field_name)
+            ):
+                continue
+            value = self._get_output_value(field_name)
+            if value is not None:
+                self._check_awaitable_output_value(field_name, value, "load_item")
+                set_value(field_name, value)
+        self._close_mapping()
+        return item
+
+    def _check_awaitable_values(self, field_name: str, method: str) -> None:
+        """Raise :exc:`RuntimeError` if input processors collected awaitables
+        for *field_name*, which *method* cannot await, closing them first."""
+        if field_name not in self._root._awaitable_fields:
+            return
+        collected = self._values.get(field_name)
+        if not collected or not any(map(isawaitable, collected)):
+            return
+        for value in collected:
+            if isawaitable(value):
+                _close_awaitable(value)
+        collected[:] = [value for value in collected if not isawaitable(value)]
+        self._root._outputs.pop(field_name, None)
+        self._root._shared_outputs.pop(field_name, None)
+        self._raise_awaitable_error(field_name, "input", method)
+
+    def _check_awaitable_output_value(
+        self, field_name: str, value: Any, method: str
+    ) -> None:
+        """Raise :exc:`RuntimeError` if *value*, the output value of
+        *field_name*, is an awaitable, which *method* cannot await, closing
+        it first."""
+        if value.__class__ is not list and _is_awaitable_class(value.__class__):
+            _close_awaitable(value)
+            self._raise_awaitable_error(field_name, "output", method)
+
+    def _raise_awaitable_error(
+        self, field_name: str, processor_type: str, method: str
+    ) -> NoReturn:
+        raise RuntimeError(
+            f"The {processor_type} processor of field {field_name!r} of "
+            f"{self.__class__.__name__} is async, use aload_item() instead of "
+            f"{method}()"
+        )
+
+    async def aload_item(self, fields: Iterable[str] | None = None) -> Any:
+        """
+        Populate the item with the data collected so far, as
+        :meth:`load_item` does, awaiting the values and output values that
+        :ref:`async processors <async-processors>` return.
+
+        The awaitable values collected for all fields are awaited
+        concurrently before running the output processors, and then the
+        awaitable output values of all fields are awaited concurrently.
         """
-        adapter = ItemAdapter(self.item)
-        for field_name in tuple(self._values):
-            value = self.get_output_value(field_name)
+        if self.defer_rules:
+            self._run_deferred_rules(fields)
+        item = self.item
+        field_names = self._get_loaded_field_names(fields)
+        await self._await_values(field_names)
+        initial_values = self._root._initial_values
+        output_values = {}
+        for field_name in field_names:
+            if (
+                initial_values
+                and field_name in initial_values
+                and self._keeps_initial_value(item, field_name)
+            ):
+                continue
+            output_values[field_name] = self._get_output_value(field_name)
+        pending = [
+            (field_name, value)
+            for field_name, value in output_values.items()
+            if isawaitable(value)
+        ]
+        if pending:
+            results = await asyncio.gather(
+                *(
+                    self._await_output_value(field_name, value)
+                    for field_name, value in pending
+                )
+            )
+            for (field_name, _), result in zip(pending, results, strict=True):
+                output_values[field_name] = result
+        set_value = self._get_value_setter(item, field_names)
+        for field_name, value in output_values.items():
             if value is not None:
-                adapter[field_name] = value
+                set_value(field_name, value)
+        self._close_mapping()
+        return item
+
+    def _get_loaded_field_names(self, fields: Iterable[str] | None) -> tuple[str, ...]:
+        """Return the names of the fields of *fields*, or of all fields, that
+        have collected values or values of the initial item."""
+        values = self._values
+        initial_values = self._root._initial_values
+        if fields is None:
+            return (*values, *initial_values)
+        return tuple(
+            field_name
+            for field_name in fields
+            if field_name in values or field_name in initial_values
+        )
+
+    def _get_value_setter(
+        self, item: Any, field_names: tuple[str, ...]
+    ) -> Callable[[str, Any], None]:
+        """Return a function that sets the given fields of *item*."""
+        if item.__class__ is dict:
+            return item.__setitem__
+        # Setting the attributes of dataclass and attrs items directly saves a
+        # field name check per field.
+        attribute_names = _get_attribute_field_names(item.__class__)
+        if attribute_names is not None and attribute_names.issuperset(field_names):
+            return partial(setattr, item)
+        return self._adapter.__setitem__
+
+    def _keeps_initial_value(self, item: Any, field_name: str) -> bool:
+        """Tell whether the value of *field_name* in *item* is its untouched
+        initial value, which loading would leave as it is."""
+        value = self._root._initial_values[field_name]
+        if value.__class__ is not list:
+            return False
+        get_value = item.get if item.__class__ is dict else self._adapter.get
+        return (
+            get_value(field_name) is value
+            and self._get_output_processor(field_name).__class__ is Identity
+        )
 
-        return adapter.item
+    async def _await_values(self, field_names: tuple[str, ...]) -> None:
+        """Replace the awaitable collected values of the given fields with
+        the values that they return, awaiting all of them concurrently."""
+        root = self._root
+        awaited_fields = [
+            (field_name, collected)
+            for field_name in field_names
+            if (collected := self._values.get(field_name))
+            and any(map(isawaitable, collected))
+        ]
+        if not awaited_fields:
+            return
+        results = iter(
+            await asyncio.gather(
+                *(
+                    value
+                    for _, collected in awaited_fields
+                    for value in collected
+                    if isawaitable(value)
+                )
+            )
+        )
+        for field_name, collected in awaited_fields:
+            field_values: list[Any] = []
+            for value in collected:
+                if isawaitable(value):
+                    field_values += arg_to_iter(next(results))
+                else:
+                    field_values.append(value)
+            # Forks that share the list get the awaited values too, instead
+            # of awaiting the same awaitables again.
+            collected[:] = field_values
+            root._awaitable_fields.discard(field_name)
+            root._outputs.pop(field_name, None)
+            root._shared_outputs.pop(field_name, None)
+
+    async def _await_output_value(self, field_name: str, value: Awaitable[Any]) -> Any:
+        try:
+            return await value
+        except Exception as e:
+            raise ValueError(
+                f"Error with output processor: field={field_name!r} "
+                f"value={self._get_values(field_name)!r} "
+                f"error='{type(e).__name__}: {e!s}'"
+            ) from e
+
+    def _close_mapping(self) -> None:
+        root = self._root
+        if root._mapping is not None:
+            root._mapping.close()
+            root._mapping = None
+
+    @classmethod
+    def from_file(
+        cls,
+        source: str | PathLike[str] | IO[bytes] | BufferedIOBase | Buffer,
+        /,
+        type: str | None = None,  # noqa: A002
+        encoding: str | None = None,
+        **kwargs: Any,
+    ) -> Self:
+        """
+        Return a loader of the document in *source*, a file path, a binary
+        file object or a bytes-like object, without reading the document
+        into a Python string first.
+
+        Files are memory-mapped, and parsed from the map, unless they are
+        file objects that are not plain binary files at their start, which
+        are read from their current position instead. *type* is
+        ``"html"``, ``"xml"`` or ``"json"``, or ``None`` to use ``"json"`` if
+        the document starts like a JSON object or array, and ``"html"``
+        otherwise. *encoding* is the encoding of HTML and XML documents, by
+        default the one that their byte order mark or declaration gives, or
+        UTF-8.
+
+        HTML and XML documents are parsed right away into the
+        :attr:`selector` of the loader, and the map is closed afterwards.
+        JSON documents become the :attr:`python_data` of the loader, as a
+        :class:`~itemloaders.sources.JSONDocument` of the map, which is closed
+        once :meth:`load_item` returns, after which the document cannot be
+        parsed again.
+
+        *kwargs* are passed to the loader.
+
+        See :ref:`file-sources`.
+        """
+        body, mapping = _read_file(source)
+        if type is None:
+            type = _guess_type(body)  # noqa: A001
+        if type == "json":
+            loader = cls(python_data=JSONDocument(body), **kwargs)
+            loader._mapping = mapping
+            return loader
+        try:
+            selector = _parse_markup(body, type, encoding)
+        finally:
+            if mapping is not None:
+                mapping.close()
+        return cls(selector=selector, **kwargs)
+
+    @classmethod
+    def iter_items(
+        cls,
+        source: str | PathLike[str] | IO[bytes],
+        record_tag: str,
+        populate: Callable[[Self], Any],
+        /,
+        namespaces: Mapping[str, str] | None = None,
+        **kwargs: Any,
+    ) -> Iterator[Any]:
+        """
+        Load an item from each *record_tag* element of the XML document
+        *source*, a file path or a binary file object, and return an iterator
+        over those items.
+
+        The document is parsed incrementally, and each record is parsed and
+        loaded as soon as its end tag is read. *populate* gets a loader of
+        this class whose selector is the record element, and adds the values
+        of the record to it, e.g. with :meth:`add_xpath` and XPath expressions
+        relative to the record. Once an item is loaded, its record is removed
+        from the parsed document, so memory usage does not grow with the
+        number of records, only with the size of the chunks that the parser
+        reads at a time.
+
+        *record_tag* is the name of the record elements, in the
+        ``{namespace}name`` notation if they have a namespace.
+        *namespaces* are registered in each selector, and *kwargs* are passed
+        to each loader.
+
+        See :ref:`xml-feeds`.
+        """
+        for _, element in etree.iterparse(
+            source,
+            tag=record_tag,
+            huge_tree=True,
+            recover=True,
+            resolve_entities=False,
+        ):
+            selector = Selector(root=element, type="xml", namespaces=namespaces)
+            loader = cls(selector=selector, **kwargs)
+            populate(loader)
+            item = loader.load_item()
+            element.clear(keep_tail=True)
+            # clear() leaves the empty elements of previous records behind.
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+            yield item
 
     def get_output_value(self, field_name: str) -> Any:
         """
         Return the collected values parsed using the output processor, for the
         given field. This method doesn't populate or modify the item at all.
         """
-        proc = self.get_output_processor(field_name)
-        proc = wrap_loader_context(proc, self.context)
-        value = self._values.get(field_name, [])
+        if self.defer_rules:
+            self._run_deferred_rules((field_name,))
+        self._check_awaitable_values(field_name, "get_output_value")
+        output_value = self._get_output_value(field_name)
+        if output_value is not None:
+            self._check_awaitable_output_value(
+                field_name, output_value, "get_output_value"
+            )
+        return output_value
+
+    def _get_output_value(self, field_name: str) -> Any:
+        proc = self._get_output_processor(field_name)
+        value = self._get_values(field_name)
+        shared_fields = self._root._shared_fields
+        if shared_fields and field_name in shared_fields:
+            return self._get_shared_output_value(field_name, proc, value)
+        if proc.__class__ is Identity:
+            return value
+        return self._get_cached_output_value(field_name, proc, value)
+
+    def _process_output_value(
+        self, field_name: str, proc: Callable[..., Any], value: list[Any]
+    ) -> Any:
+        proc = self._bind_processor(proc, field_name, "output")
         try:
             return proc(value)
         except Exception as e:
@@ -343,11 +1213,216 @@ class ItemLoader:
                 f"value={value!r} error='{type(e).__name__}: {e!s}'"
             ) from e
 
+    def _get_cached_output_value(
+        self, field_name: str, proc: Callable[..., Any], value: list[Any]
+    ) -> Any:
+        """Return the output value of *field_name*, reusing the one computed
+        last time if its collected values *value*, *proc* and, if *proc* takes
+        the loader context, the values of the context did not change since."""
+        outputs = self._root._outputs
+        functions = getattr(proc, "functions", None)
+        entry = outputs.get(field_name)
+        if entry is not None and entry[0] is proc and entry[1] is functions:
+            snapshot = entry[2]
+            if snapshot is None or _matches_context(snapshot, self.context):
+                output = entry[3]
+                return output[:] if output.__class__ is list else output
+        output = self._process_output_value(field_name, proc, value)
+        if (
+            output.__class__ in _IMMUTABLE_TYPES or output.__class__ is list
+        ) and not is_impure(proc):
+            snapshot = dict(self.context) if takes_loader_context(proc) else None
+            outputs[field_name] = (
+                proc,
+                functions,
+                snapshot,
+                output[:] if output.__class__ is list else output,
+            )
+        return output
+
+    def _get_shared_output_value(
+        self, field_name: str, proc: Callable[..., Any], value: list[Any]
+    ) -> Any:
+        """Return the output value of *field_name*, whose collected values
+        *value* are shared with forks, computing it once for all of them when
+        *proc* does not take the loader context and returns an immutable
+        value."""
+        if proc.__class__ is Identity:
+            # Items must not share the list.
+            return list(value)
+        shared_outputs = self._root._shared_outputs
+        entry = shared_outputs.get(field_name)
+        if entry is not None and entry[0] is value and entry[1] is proc:
+            return entry[2]
+        output = self._process_output_value(field_name, proc, value)
+        if (
+            output.__class__ in _IMMUTABLE_TYPES
+            and not takes_loader_context(proc)
+            and not is_impure(proc)
+        ):
+            shared_outputs[field_name] = (value, proc, output)
+        return output
+
     def get_collected_values(self, field_name: str) -> list[Any]:
         """Return the collected values for the given field."""
-        return self._values.get(field_name, [])
+        if self.defer_rules:
+            self._run_deferred_rules((field_name,))
+        root = self._root
+        initial_values = root._initial_values
+        if initial_values and field_name in initial_values:
+            self._collect(field_name, ())
+        self._check_awaitable_values(field_name, "get_collected_values")
+        # The list may be changed in place, so it must not be shared with
+        # forks anymore.
+        root._outputs.pop(field_name, None)
+        root._shared_outputs.pop(field_name, None)
+        values = self._values.get(field_name)
+        if values is None:
+            return []
+        shared_fields = root._shared_fields
+        if shared_fields and field_name in shared_fields:
+            shared_fields.discard(field_name)
+            values = self._values[field_name] = values[:]
+        return values
 
     def get_input_processor(self, field_name: str) -> Callable[..., Any]:
+        proc = self._get_field_processors(
+            self._local_item.__class__, field_name
+        ).input_processor
+        if proc is not None and not self._overrides_processor(
+            f"{field_name}_in", "default_input_processor"
+        ):
+            return proc
+        return self._resolve_input_processor(field_name)
+
+    def get_output_processor(self, field_name: str) -> Callable[..., Any]:
+        proc = self._get_field_processors(
+            self._local_item.__class__, field_name
+        ).output_processor
+        if proc is not None and not self._overrides_processor(
+            f"{field_name}_out", "default_output_processor"
+        ):
+            return proc
+        return self._resolve_output_processor(field_name)
+
+    def _get_input_processor(self, field_name: str) -> Callable[..., Any]:
+        """Return the input processor to run for *field_name*, i.e. that of
+        :meth:`get_input_processor`, simplified if the class declares it."""
+        proc = self._get_field_processors(
+            self._local_item.__class__, field_name
+        ).simplified_input_processor
+        if (
+            proc is not None
+            and self.__class__.get_input_processor is ItemLoader.get_input_processor
+            and not self._overrides_processor(
+                f"{field_name}_in", "default_input_processor"
+            )
+        ):
+            return proc
+        return self.get_input_processor(field_name)
+
+    def _get_output_processor(self, field_name: str) -> Callable[..., Any]:
+        """Return the output processor to run for *field_name*, i.e. that of
+        :meth:`get_output_processor`, simplified if the class declares it."""
+        proc = self._get_field_processors(
+            self._local_item.__class__, field_name
+        ).simplified_output_processor
+        if (
+            proc is not None
+            and self.__class__.get_output_processor is ItemLoader.get_output_processor
+            and not self._overrides_processor(
+                f"{field_name}_out", "default_output_processor"
+            )
+        ):
+            return proc
+        return self.get_output_processor(field_name)
+
+    def _overrides_processor(self, name: str, default_name: str) -> bool:
+        """Tell whether this instance sets a processor that the processors
+        resolved for its class do not account for."""
+        instance_attrs = self.__dict__
+        return name in instance_attrs or default_name in instance_attrs
+
+    @classmethod
+    def _get_field_processors(
+        cls, item_class: type, field_name: str
+    ) -> _FieldProcessors:
+        """Return the processors of *field_name* for items of *item_class*
+        that any instance of this class uses unless it overrides them,
+        resolving them if needed."""
+        namespaces = cls._namespaces
+        field_input_processor = _lookup_namespaces(namespaces, f"{field_name}_in")
+        field_output_processor = _lookup_namespaces(namespaces, f"{field_name}_out")
+        tables = cls._processor_tables
+        table = tables.get(item_class)
+        if table is None:
+            table = tables[item_class] = {}
+        processors = table.get(field_name)
+        if processors is not None:
+            sources = processors.sources
+            if (
+                sources[0] is field_input_processor
+                and sources[1] is field_output_processor
+                and sources[2] is cls.default_input_processor
+                and sources[3] is cls.default_output_processor
+                and getattr(processors.input_processor, "functions", None) is sources[4]
+                and getattr(processors.output_processor, "functions", None)
+                is sources[5]
+            ):
+                return processors
+        input_processor = cls._get_class_field_processor(
+            item_class, field_name, "_in", "input_processor", "default_input_processor"
+        )
+        output_processor = cls._get_class_field_processor(
+            item_class,
+            field_name,
+            "_out",
+            "output_processor",
+            "default_output_processor",
+        )
+        processors = _FieldProcessors(
+            input_processor,
+            output_processor,
+            None if input_processor is None else simplify(input_processor),
+            None if output_processor is None else simplify(output_processor),
+            (
+                field_input_processor,
+                field_output_processor,
+                cls.default_input_processor,
+                cls.default_output_processor,
+                getattr(input_processor, "functions", None),
+                getattr(output_processor, "functions", None),
+            ),
+        )
+        table[field_name] = processors
+        return processors
+
+    @classmethod
+    def _get_class_field_processor(
+        cls,
+        item_class: type,
+        field_name: str,
+        suffix: str,
+        key: str,
+        default_attr: str,
+    ) -> Callable[..., Any] | None:
+        proc = _get_class_processor(cls, f"{field_name}{suffix}")
+        if proc is None:
+            return None
+        if proc is not _MISSING and proc:
+            return proc  # type: ignore[no-any-return]
+        proc = _MISSING
+        if item_class is not dict:
+            field_meta = ItemAdapter.get_field_meta_from_class(item_class, field_name)
+            proc = field_meta.get(key, _MISSING)
+        if proc is not _MISSING:
+            return unbound_method(proc)
+        proc = _get_class_processor(cls, default_attr)
+        if proc is _MISSING:
+            return None
+        return proc  # type: ignore[no-any-return]
+
+    def _resolve_input_processor(self, field_name: str) -> Callable[..., Any]:
         proc = getattr(self, f"{field_name}_in", None)
         if not proc:
             proc = self._get_item_field_attr(
@@ -355,7 +1430,7 @@ class ItemLoader:
             )
         return unbound_method(proc)
 
-    def get_output_processor(self, field_name: str) -> Callable[..., Any]:
+    def _resolve_output_processor(self, field_name: str) -> Callable[..., Any]:
         proc = getattr(self, f"{field_name}_out", None)
         if not proc:
             proc = self._get_item_field_attr(
@@ -366,13 +1441,46 @@ class ItemLoader:
     def _get_item_field_attr(
         self, field_name: str, key: Any, default: Any = None
     ) -> Any:
-        field_meta = ItemAdapter(self.item).get_field_meta(field_name)
+        if self.item.__class__ is dict:
+            return default
+        field_meta = self._adapter.get_field_meta(field_name)
         return field_meta.get(key, default)
 
+    def _bind_processor(
+        self, proc: Callable[..., Any], field_name: str, processor_type: str
+    ) -> Callable[..., Any]:
+        """Return :func:`~itemloaders.common.wrap_loader_context` for *proc*,
+        the *processor_type* processor of *field_name*, and the current
+        context, reusing the result of earlier calls while *proc* remains the
+        processor of the field and :attr:`context` is not replaced.
+
+        Only one wrapped processor is kept per field and processor type, so
+        processors that are replaced, or built anew on every call, are not
+        kept alive. Processors passed to methods like :meth:`add_value` are
+        wrapped on every call instead.
+
+        Changes to the context itself need no special handling, since wrapped
+        processors get the context object, not a copy of it.
+        """
+        context = self.context
+        bound_processors = self._bound_processors
+        if context is not self._bound_context:
+            bound_processors.clear()
+            self._bound_context = context
+        key = (field_name, processor_type)
+        entry = bound_processors.get(key)
+        if entry is not None and entry[0] is proc:
+            return entry[1]
+        bound_proc = wrap_loader_context(proc, context)
+        bound_processors[key] = (proc, bound_proc)
+        return bound_proc
+
     def _process_input_value(self, field_name: str, value: Any) -> Any:
-        proc = self.get_input_processor(field_name)
+        proc = self._get_input_processor(field_name)
+        if proc.__class__ is Identity:
+            return value
         _proc = proc
-        proc = wrap_loader_context(proc, self.context)
+        proc = self._bind_processor(proc, field_name, "input")
         try:
             return proc(value)
         except Exception as e:
@@ -381,14 +1489,273 @@ class ItemLoader:
                 f" field={field_name!r} value={value!r} error='{type(e).__name__}: {e!s}'"
             ) from e
 
+    def _stops_on_first_value(
+        self, field_name: str | None, processors: tuple[Callable[..., Any], ...]
+    ) -> TypeGuard[str]:
+        """Tell whether data for *field_name* can be extracted and processed
+        one value at a time, stopping at the first one that makes it to the
+        output of the field, as :meth:`_add_first_value` does."""
+        if not self.stop_on_first_value or not field_name or processors:
+            return False
+        if self._get_output_processor(field_name).__class__ is not TakeFirst:
+            return False
+        # Processing values one at a time gives the same result only with
+        # input processors that process each value on its own, and values of
+        # async processors are not known until they are awaited.
+        input_processor = self._get_input_processor(field_name)
+        return input_processor.__class__ in (Identity, MapCompose) and not is_async(
+            input_processor
+        )
+
+    def _add_first_value(
+        self,
+        field_name: str,
+        values: Iterable[Any],
+        re: str | Pattern[str] | None = None,
+    ) -> Self:
+        """Add *values* to *field_name* one at a time, only until the output
+        processor of the field, :class:`~itemloaders.processors.TakeFirst`,
+        has a value to return.
+
+        *values* may be a generator that extracts each value on demand, so
+        that values after that are not even extracted.
+        """
+        collected = self._get_values(field_name)
+        if collected and TakeFirst()(collected) is not None:
+            return self
+        pattern = self._get_pattern(re) if re else None
+        for value in values:
+            processed_value = self._process_input_value(
+                field_name, _extract_regex(pattern, [value]) if pattern else [value]
+            )
+            if not processed_value:
+                continue
+            processed_values = list(arg_to_iter(processed_value))
+            self._collect(field_name, processed_values)
+            if TakeFirst()(processed_values) is not None:
+                break
+        return self
+
+    def _defer(self, call: partial[Any]) -> bool:
+        """Record *call*, a call to a method that adds data to a field, to run
+        it when that field is needed, and return ``True``, or return ``False``
+        if *call* must run now."""
+        field_name = call.args[0]
+        root = self._root
+        if field_name is None or root._running_deferred_rules:
+            return False
+        if call.func.__name__ in _JMES_METHODS:
+            self._check_jmespath_method()
+        elif call.func.__name__ not in ("add_value", "replace_value"):
+            self._check_selector_method()
+        context = self._deferred_context
+        if context is None or not _matches_context(context, self.context):
+            context = self._deferred_context = dict(self.context)
+        root._deferred_rules.append(_DeferredRule(self, field_name, call, context))
+        return True
+
+    def _run_deferred_rules(self, field_names: Iterable[str] | None) -> None:
+        """Run the deferred calls of *field_names*, or of all fields if
+        ``None``.
+
+        Calls run in the order they were recorded for each field. While a
+        field has a value for its :class:`~itemloaders.processors.TakeFirst`
+        output processor, the calls that would only add more values to it are
+        skipped. Identical rules applied to the same node for different fields
+        are only evaluated once, and so are the prefixes shared by XPath
+        expressions, while the JMESPath expressions applied to the same node
+        are evaluated together.
+        """
+        root = self._root
+        rules = root._deferred_rules
+        if not rules:
+            return
+        if field_names is None:
+            selected = rules
+            root._deferred_rules = []
+        else:
+            wanted = set(field_names)
+            selected = [rule for rule in rules if rule.field_name in wanted]
+            if not selected:
+                return
+            root._deferred_rules = [
+                rule for rule in rules if rule.field_name not in wanted
+            ]
+        # JSON documents are only parsed as far as the JMESPath expressions
+        # recorded for them so far need.
+        documents: dict[int, tuple[JSONDocument, list[tuple[str, ...]]]] = {}
+        for rule in rules:
+            data = rule.loader.python_data
+            if rule.call.func.__name__ in _JMES_METHODS and isinstance(
+                data, JSONDocument
+            ):
+                _, chains = documents.setdefault(
+                    id(data._document), (data._document, [])
+                )
+                chains.extend(
+                    (*data._prefix, query) for query in arg_to_iter(rule.call.args[1])
+                )
+        for document, chains in documents.values():
+            document._prune(chains)
+        plan: dict[str, list[_DeferredRule]] = {}
+        for rule in selected:
+            plan.setdefault(rule.field_name, []).append(rule)
+        # Loaders without an extraction cache share one for this run.
+        extraction_cache = ExtractionCache()
+        uncached_loaders = {
+            id(rule.loader): rule.loader
+            for rule in selected
+            if rule.loader.extraction_cache is None
+        }.values()
+        for loader in uncached_loaders:
+            loader.extraction_cache = extraction_cache
+        # XPath expressions evaluated through the same cache share the
+        # evaluation of their common prefixes.
+        caches: dict[int, tuple[ExtractionCache, list[str]]] = {}
+        for rule in selected:
+            if rule.call.func.__name__ in _XPATH_METHODS:
+                cache = rule.loader.extraction_cache
+                assert cache is not None
+                caches.setdefault(id(cache), (cache, []))[1].extend(
+                    arg_to_iter(rule.call.args[1])
+                )
+        for cache, queries in caches.values():
+            cache.share_xpath_prefixes(queries)
+        # JMESPath expressions evaluated through the same cache on the same
+        # node are evaluated together, in a single pass over the data.
+        jmes_queries: dict[tuple[int, int], tuple[ExtractionCache, Any, list[str]]] = {}
+        for rule in selected:
+            if rule.call.func.__name__ in _JMES_METHODS:
+                cache = rule.loader.extraction_cache
+                source = rule.loader.python_data
+                if source is None:
+                    source = rule.loader.selector
+                assert cache is not None
+                jmes_queries.setdefault((id(cache), id(source)), (cache, source, []))[
+                    2
+                ].extend(arg_to_iter(rule.call.args[1]))
+        for cache, source, queries in jmes_queries.values():
+            cache.prefetch_jmespath(
+                source.get_data(queries)
+                if isinstance(source, JSONDocument)
+                else source,
+                queries,
+            )
+        root._running_deferred_rules = True
+        try:
+            for field_name, field_rules in plan.items():
+                # Values of async processors are not known until they are
+                # awaited.
+                takes_first = self._get_output_processor(
+                    field_name
+                ).__class__ is TakeFirst and not is_async(
+                    self._get_input_processor(field_name)
+                )
+                for rule in field_rules:
+                    if (
+                        takes_first
+                        and not rule.call.func.__name__.startswith("replace_")
+                        and TakeFirst()(root._get_values(field_name)) is not None
+                    ):
+                        continue
+                    loader = rule.loader
+                    context = loader.context
+                    if _matches_context(rule.context, context):
+                        rule.call()
+                        continue
+                    # Run the call with the context that it was made with.
+                    loader.context = rule.context
+                    try:
+                        rule.call()
+                    finally:
+                        loader.context = context
+        finally:
+            root._running_deferred_rules = False
+            for loader in uncached_loaders:
+                loader.extraction_cache = None
+
+    @classmethod
+    def _get_pattern(cls, regex: str | Pattern[str]) -> Pattern[str]:
+        """Return *regex* compiled, compiling each string only once per loader
+        class."""
+        if not isinstance(regex, str):
+            return regex
+        patterns = cls._patterns
+        pattern = patterns.get(regex)
+        if pattern is None:
+            if len(patterns) >= _MAX_CACHED_PATTERNS:
+                patterns.clear()
+            pattern = patterns[regex] = re.compile(regex, re.UNICODE)
+        return pattern
+
     def _track_rule(
         self, field_name: str | None, rule_type: str, rule: str, values: list[Any]
     ) -> list[Any]:
         if self.stats is not None:
             key = f"parser/{field_name or '<none>'}/{rule_type}/{rule}"
             self.stats.inc_value(key, 1 if values else 0)
+        if self.adaptive_rule_order:
+            usage = self._rule_usage.setdefault((field_name, rule_type, rule), [0, 0])
+            usage[0] += 1
+            if values:
+                usage[1] += 1
         return values
 
+    def _order_rules(
+        self, field_name: str | None, rule_type: str, rules: str | Iterable[str]
+    ) -> list[str]:
+        """Return *rules* in the order to try them, which is the given order
+        unless :attr:`adaptive_rule_order` is enabled."""
+        rules = list(arg_to_iter(rules))
+        if not self.adaptive_rule_order or len(rules) < 2:
+            return rules
+        rule_usage = self._rule_usage
+
+        def match_rate(rule: str) -> float:
+            used, matched = rule_usage.get((field_name, rule_type, rule), (0, 0))
+            # Rules not used yet get a rate of 0.5, which rules that keep
+            # matching end up above, and rules that keep failing below.
+            return (matched + 1) / (used + 2)
+
+        # Sorting is stable, so rules with the same rate keep their order.
+        return sorted(rules, key=match_rate, reverse=True)
+
+    def _get_first_values(
+        self,
+        field_name: str | None,
+        rule_type: str,
+        rules: str | Iterable[str],
+        **kw: Any,
+    ) -> list[Any]:
+        """Return the values of the first of *rules* that matches anything,
+        without evaluating the rules after it."""
+        for rule in self._order_rules(field_name, rule_type, rules):
+            values = self._track_rule(
+                field_name, rule_type, rule, self._select_all(rule_type, rule, **kw)
+            )
+            if values:
+                return values
+        return []
+
+    def _select_all(self, rule_type: str, rule: str, **kw: Any) -> list[Any]:
+        """Return the strings that *rule* extracts from :attr:`selector`, or
+        from :attr:`python_data` for JMESPath rules if there is data, through
+        :attr:`extraction_cache` if there is one."""
+        if rule_type == "jmes" and self.python_data is not None:
+            data = self.python_data
+            if isinstance(data, JSONDocument):
+                data = data.get_data((rule,))
+                # The part of the document of a nested loader is missing.
+                if data is None and self.python_data._prefix:
+                    return []
+            if self.extraction_cache is not None:
+                return self.extraction_cache.search(data, rule)
+            return _search(data, rule)
+        assert self.selector is not None
+        if self.extraction_cache is not None:
+            return self.extraction_cache.getall(self.selector, rule_type, rule, **kw)
+        return _getall(self.selector, rule_type, rule, **kw)
+
     def _check_selector_method(self) -> None:
         if self.selector is None:
             raise RuntimeError(
@@ -396,6 +1763,15 @@ class ItemLoader:
                 f"must be instantiated with a selector"
             )
 
+    def _check_jmespath_method(self) -> None:
+        if self.python_data is not None:
+            return
+        self._check_selector_method()
+        if not hasattr(self.selector, "jmespath"):
+            raise AttributeError(
+                "Please install parsel >= 1.8.1 to get JMESPath support"
+            )
+
     def add_xpath(
         self,
         field_name: str | None,
@@ -425,6 +1801,14 @@ class ItemLoader:
             loader.add_xpath('price', '//p[@id="price"]', re='the price is (.*)')
 
         """
+        if self.defer_rules and self._defer(
+            partial(self.add_xpath, field_name, xpath, *processors, re=re, **kw)
+        ):
+            return self
+        if self._stops_on_first_value(field_name, processors):
+            return self._add_first_value(
+                field_name, self._iter_xpathvalues(xpath, field_name, **kw), re=re
+            )
         values = self._get_xpathvalues(xpath, field_name, **kw)
         return self.add_value(field_name, values, *processors, re=re, **kw)
 
@@ -443,9 +1827,53 @@ class ItemLoader:
         :rtype: ItemLoader
 
         """
+        if self.defer_rules and self._defer(
+            partial(self.replace_xpath, field_name, xpath, *processors, re=re, **kw)
+        ):
+            return self
+        if self._stops_on_first_value(field_name, processors):
+            lazy_values = self._iter_xpathvalues(xpath, field_name, **kw)
+            self._drop_values(field_name)
+            return self._add_first_value(field_name, lazy_values, re=re)
         values = self._get_xpathvalues(xpath, field_name, **kw)
         return self.replace_value(field_name, values, *processors, re=re, **kw)
 
+    def add_first_xpath(
+        self,
+        field_name: str | None,
+        xpath: str | Iterable[str],
+        *processors: Callable[..., Any],
+        re: str | Pattern[str] | None = None,
+        **kw: Any,
+    ) -> Self:
+        """
+        Similar to :meth:`add_xpath`, but when given an iterable of XPath
+        expressions it only collects the strings extracted by the first one
+        that matches anything, and does not evaluate the ones after it.
+
+        Set :attr:`adaptive_rule_order` to try the expressions that matched
+        most often first.
+
+        :returns: The current ItemLoader instance for method chaining.
+        :rtype: ItemLoader
+
+        Examples::
+
+            loader.add_first_xpath('name', [
+                '//p[@class="product-name"]/text()',
+                '//h1/text()',
+            ])
+
+        """
+        if self.defer_rules and self._defer(
+            partial(self.add_first_xpath, field_name, xpath, *processors, re=re, **kw)
+        ):
+            return self
+        self._check_selector_method()
+        assert self.selector is not None
+        values = self._get_first_values(field_name, "xpath", xpath, **kw)
+        return self.add_value(field_name, values, *processors, re=re, **kw)
+
     def get_xpath(
         self,
         xpath: str | Iterable[str],
@@ -486,11 +1914,47 @@ class ItemLoader:
         xpaths = arg_to_iter(xpaths)
         return flatten(
             self._track_rule(
-                field_name, "xpath", xpath, self.selector.xpath(xpath, **kw).getall()
+                field_name, "xpath", xpath, self._select_all("xpath", xpath, **kw)
             )
             for xpath in xpaths
         )
 
+    def _iter_xpathvalues(
+        self,
+        xpaths: str | Iterable[str],
+        field_name: str | None = None,
+        **kw: Any,
+    ) -> Iterator[Any]:
+        """Return an iterator over the same values as :meth:`_get_xpathvalues`,
+        which only evaluates each XPath expression, and extracts each of its
+        matches, when the iteration reaches it."""
+        self._check_selector_method()
+        assert self.selector is not None
+        return self._iter_rule_values(field_name, "xpath", xpaths, **kw)
+
+    def _iter_rule_values(
+        self,
+        field_name: str | None,
+        rule_type: str,
+        rules: str | Iterable[str],
+        **kw: Any,
+    ) -> Iterator[Any]:
+        # Cached results and results out of data are already extracted.
+        extracted = self.extraction_cache is not None or (
+            rule_type == "jmes" and self.python_data is not None
+        )
+        for rule in arg_to_iter(rules):
+            if extracted:
+                yield from self._track_rule(
+                    field_name, rule_type, rule, self._select_all(rule_type, rule, **kw)
+                )
+                continue
+            assert self.selector is not None
+            matches = _select(self.selector, rule_type, rule, **kw)
+            self._track_rule(field_name, rule_type, rule, matches)
+            for match in matches:
+                yield match.get()
+
     def add_css(
         self,
         field_name: str | None,
@@ -520,6 +1984,14 @@ class ItemLoader:
             loader.add_css('price', 'p#price', re='the price is (.*)')
 
         """
+        if self.defer_rules and self._defer(
+            partial(self.add_css, field_name, css, *processors, re=re, **kw)
+        ):
+            return self
+        if self._stops_on_first_value(field_name, processors):
+            return self._add_first_value(
+                field_name, self._iter_cssvalues(css, field_name), re=re
+            )
         values = self._get_cssvalues(css, field_name)
         return self.add_value(field_name, values, *processors, re=re, **kw)
 
@@ -538,9 +2010,45 @@ class ItemLoader:
         :rtype: ItemLoader
 
         """
+        if self.defer_rules and self._defer(
+            partial(self.replace_css, field_name, css, *processors, re=re, **kw)
+        ):
+            return self
+        if self._stops_on_first_value(field_name, processors):
+            lazy_values = self._iter_cssvalues(css, field_name)
+            self._drop_values(field_name)
+            return self._add_first_value(field_name, lazy_values, re=re)
         values = self._get_cssvalues(css, field_name)
         return self.replace_value(field_name, values, *processors, re=re, **kw)
 
+    def add_first_css(
+        self,
+        field_name: str | None,
+        css: str | Iterable[str],
+        *processors: Callable[..., Any],
+        re: str | Pattern[str] | None = None,
+        **kw: Any,
+    ) -> Self:
+        """
+        Similar to :meth:`add_css`, but when given an iterable of CSS
+        selectors it only collects the strings extracted by the first one
+        that matches anything, and does not evaluate the ones after it.
+
+        Set :attr:`adaptive_rule_order` to try the selectors that matched
+        most often first.
+
+        :returns: The current ItemLoader instance for method chaining.
+        :rtype: ItemLoader
+        """
+        if self.defer_rules and self._defer(
+            partial(self.add_first_css, field_name, css, *processors, re=re, **kw)
+        ):
+            return self
+        self._check_selector_method()
+        assert self.selector is not None
+        values = self._get_first_values(field_name, "css", css)
+        return self.add_value(field_name, values, *processors, re=re, **kw)
+
     def get_css(
         self,
         css: str | Iterable[str],
@@ -576,10 +2084,19 @@ class ItemLoader:
         assert self.selector is not None
         csss = arg_to_iter(csss)
         return flatten(
-            self._track_rule(field_name, "css", css, self.selector.css(css).getall())
+            self._track_rule(field_name, "css", css, self._select_all("css", css))
             for css in csss
         )
 
+    def _iter_cssvalues(
+        self, csss: str | Iterable[str], field_name: str | None = None
+    ) -> Iterator[Any]:
+        """Iterator counterpart of :meth:`_get_cssvalues`, see
+        :meth:`_iter_xpathvalues`."""
+        self._check_selector_method()
+        assert self.selector is not None
+        return self._iter_rule_values(field_name, "css", csss)
+
     def add_jmes(
         self,
         field_name: str | None,
@@ -608,6 +2125,14 @@ class ItemLoader:
             # JSON snippet: {"price": "the price is $1200"}
             loader.add_jmes('price', 'price', TakeFirst(), re='the price is (.*)')
         """
+        if self.defer_rules and self._defer(
+            partial(self.add_jmes, field_name, jmes, *processors, re=re, **kw)
+        ):
+            return self
+        if self._stops_on_first_value(field_name, processors):
+            return self._add_first_value(
+                field_name, self._iter_jmesvalues(jmes, field_name), re=re
+            )
         values = self._get_jmesvalues(jmes, field_name)
         return self.add_value(field_name, values, *processors, re=re, **kw)
 
@@ -625,9 +2150,44 @@ class ItemLoader:
         :returns: The current ItemLoader instance for method chaining.
         :rtype: ItemLoader
         """
+        if self.defer_rules and self._defer(
+            partial(self.replace_jmes, field_name, jmes, *processors, re=re, **kw)
+        ):
+            return self
+        if self._stops_on_first_value(field_name, processors):
+            lazy_values = self._iter_jmesvalues(jmes, field_name)
+            self._drop_values(field_name)
+            return self._add_first_value(field_name, lazy_values, re=re)
         values = self._get_jmesvalues(jmes, field_name)
         return self.replace_value(field_name, values, *processors, re=re, **kw)
 
+    def add_first_jmes(
+        self,
+        field_name: str | None,
+        jmes: str | Iterable[str],
+        *processors: Callable[..., Any],
+        re: str | Pattern[str] | None = None,
+        **kw: Any,
+    ) -> Self:
+        """
+        Similar to :meth:`add_jmes`, but when given an iterable of JMESPath
+        selectors it only collects the strings extracted by the first one
+        that matches anything, and does not evaluate the ones after it.
+
+        Set :attr:`adaptive_rule_order` to try the selectors that matched
+        most often first.
+
+        :returns: The current ItemLoader instance for method chaining.
+        :rtype: ItemLoader
+        """
+        if self.defer_rules and self._defer(
+            partial(self.add_first_jmes, field_name, jmes, *processors, re=re, **kw)
+        ):
+            return self
+        self._check_jmespath_method()
+        values = self._get_first_values(field_name, "jmes", jmes)
+        return self.add_value(field_name, values, *processors, re=re, **kw)
+
     def get_jmes(
         self,
         jmes: str | Iterable[str],
@@ -659,16 +2219,21 @@ class ItemLoader:
     def _get_jmesvalues(
         self, jmess: str | Iterable[str], field_name: str | None = None
     ) -> list[Any]:
-        self._check_selector_method()
-        assert self.selector is not None
+        self._check_jmespath_method()
         jmess = arg_to_iter(jmess)
-        if not hasattr(self.selector, "jmespath"):
-            raise AttributeError(
-                "Please install parsel >= 1.8.1 to get JMESPath support"
-            )
         return flatten(
-            self._track_rule(
-                field_name, "jmes", jmes, self.selector.jmespath(jmes).getall()
-            )
+            self._track_rule(field_name, "jmes", jmes, self._select_all("jmes", jmes))
             for jmes in jmess
         )
+
+    def _iter_jmesvalues(
+        self, jmess: str | Iterable[str], field_name: str | None = None
+    ) -> Iterator[Any]:
+        """Iterator counterpart of :meth:`_get_jmesvalues`, see
+        :meth:`_iter_xpathvalues`."""
+        self._check_jmespath_method()
+        return self._iter_rule_values(field_name, "jmes", jmess)
+
+
+# __init_subclass__() only runs for subclasses.
+ItemLoader._namespaces = tuple(klass.__dict__ for klass in ItemLoader.__mro__)
@@ -0,0 +1,143 @@
+"""
+Loading of items from many documents in a pool of processes.
+
+See documentation in :ref:`batch-loading`.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import suppress
+from itertools import islice
+from typing import TYPE_CHECKING, Any
+
+from itemadapter import ItemAdapter
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+    from concurrent.futures import Future
+    from multiprocessing.context import BaseContext
+    from os import PathLike
+
+    from typing_extensions import Buffer
+
+    from itemloaders import ItemLoader
+
+    Job = tuple[str | PathLike[str] | Buffer, type[ItemLoader]]
+
+
+def warm_up(loader_class: type[ItemLoader]) -> None:
+    """Resolve the input and output processors of the fields that
+    *loader_class* or its default item class declare, as loaders of that class
+    would the first time that they use them, without creating a loader.
+
+    When its workers are forked, :func:`load_items` calls this in the main
+    process before starting them, so that they inherit those processors.
+    """
+    field_names = {
+        name.removesuffix("_in").removesuffix("_out")
+        for name in dir(loader_class)
+        if name.endswith(("_in", "_out")) and not name.startswith(("_", "default_"))
+    }
+    item_class = loader_class.default_item_class
+    if item_class is not dict:
+        field_names.update(ItemAdapter.get_field_names_from_class(item_class) or ())
+    for field_name in field_names:
+        # Fields that the item class does not support fail when loaded.
+        with suppress(KeyError):
+            loader_class._get_field_processors(item_class, field_name)
+
+
+def _load_chunk(chunk: list[Job], populate: Callable[[Any], Any]) -> list[Any]:
+    items = []
+    for document, loader_class in chunk:
+        loader = loader_class.from_file(document)
+        populate(loader)
+        items.append(loader.load_item())
+    return items
+
+
+def load_items(
+    jobs: Iterable[Job],
+    populate: Callable[[Any], Any],
+    /,
+    max_workers: int | None = None,
+    chunksize: int = 1,
+    max_pending: int | None = None,
+    ordered: bool = True,
+    mp_context: BaseContext | None = None,
+) -> Iterator[Any]:
+    """
+    Load an item from each of *jobs* in a pool of processes, and return an
+    iterator over those items.
+
+    Each job is a ``(document, loader_class)`` tuple, where *document* is
+    anything that :meth:`ItemLoader.from_file
+    <itemloaders.ItemLoader.from_file>` takes, e.g. a file path or bytes.
+    Workers create a loader with ``loader_class.from_file(document)``, pass it
+    to *populate*, which adds the values of the document to it, and send the
+    loaded item back. *populate*, loader classes and items must be picklable,
+    so *populate* must be a module-level function, not a lambda.
+
+    Jobs are sent to workers in chunks of *chunksize* jobs, and at most
+    *max_pending* chunks, by default twice *max_workers*, are in the pool at a
+    time, so memory usage does not grow with the number of jobs. Items are
+    returned in the order of *jobs*, or as soon as their chunk is done if
+    *ordered* is ``False``.
+
+    *max_workers* and *mp_context* are passed to
+    :class:`~concurrent.futures.ProcessPoolExecutor`, so workers are started
+    with the default start method of the platform unless *mp_context* sets
+    one. If workers are forked, the processors of each loader class are
+    resolved with :func:`warm_up` in the main process first, and workers
+    inherit them.
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_pending is None:
+        max_pending = 2 * max_workers
+    if mp_context is None:
+        # What ProcessPoolExecutor uses by default.
+        mp_context = multiprocessing.get_context()
+    # Workers started otherwise do not inherit what warm_up() resolves.
+    warms_up = mp_context.get_start_method() == "fork"
+    executor = ProcessPoolExecutor(max_workers, mp_context=mp_context)
+    warmed_up: set[type[ItemLoader]] = set()
+    pending: deque[Future[list[Any]]] = deque()
+    job_iterator = iter(jobs)
+
+    def get_chunk() -> list[Job]:
+        chunk = list(islice(job_iterator, chunksize))
+        for _, loader_class in chunk:
+            if warms_up and loader_class not in warmed_up:
+                warm_up(loader_class)
+                warmed_up.add(loader_class)
+        return chunk
+
+    try:
+        # Forked workers are started on the first submission, so the loader
+        # classes of all the first chunks are warmed up before that.
+        chunks: list[list[Job]] = []
+        while len(chunks) < max_pending and (chunk := get_chunk()):
+            chunks.append(chunk)
+        for chunk in chunks:
+            pending.append(executor.submit(_load_chunk, chunk, populate))
+        del chunks
+        while pending:
+            if ordered:
+                future = pending.popleft()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = next(future for future in pending if future in done)
+                pending.remove(future)
+            items = future.result()
+            if chunk := get_chunk():
+                pending.append(executor.submit(_load_chunk, chunk, populate))
+            yield from items
+    finally:
+        executor.shutdown(cancel_futures=True)
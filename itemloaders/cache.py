@@ -0,0 +1,633 @@
+"""
+Caches of parsing rules and of the data they extract.
+
+See documentation in :ref:`extraction-cache`.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from contextlib import suppress
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+import jmespath
+from jmespath.parser import ParsedResult
+from lxml import etree
+from parsel import Selector, SelectorList
+from parsel.csstranslator import GenericTranslator, HTMLTranslator
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Iterable, Mapping, Sequence
+
+DEFAULT_COMPILED_CACHE_SIZE = 1024
+
+_css_translators = {"html": HTMLTranslator(), "xml": GenericTranslator()}
+
+# Functions that are node tests, and may appear in a location path.
+_NODE_TESTS = frozenset({"comment", "node", "processing-instruction", "text"})
+_NAME_END = re.compile(r"[\w.-]*$")
+# XPath variable that holds the nodes of a shared prefix.
+_PREFIX_VARIABLE = "_itemloaders_prefix"
+
+
+def _compile_xpath(query: str, namespaces: tuple[tuple[str, str], ...]) -> etree.XPath:
+    try:
+        return etree.XPath(query, namespaces=dict(namespaces), smart_strings=False)
+    except etree.XPathError as exc:
+        raise ValueError(f"XPath error: {exc} in {query}") from exc
+
+
+def _translate_css(query: str, selector_type: str) -> str:
+    return _css_translators[selector_type].css_to_xpath(query)
+
+
+def _compile_jmespath(query: str) -> ParsedResult:
+    return jmespath.compile(query)
+
+
+def _compile_jmespath_rules(queries: tuple[str, ...]) -> ParsedResult:
+    """Return a multiselect hash expression that evaluates each of *queries*,
+    as the value of its index in *queries*."""
+    # Combine the parsed expressions, which need no quoting, rather than their
+    # source.
+    keys = [str(index) for index in range(len(queries))]
+    expression = ", ".join(
+        f'"{key}": ({query})' for key, query in zip(keys, queries, strict=True)
+    )
+    return ParsedResult(
+        f"{{{expression}}}",
+        {
+            "type": "multi_select_dict",
+            "value": None,
+            "children": [
+                {
+                    "type": "key_val_pair",
+                    "children": [_cached_compile_jmespath(query).parsed],
+                    "value": key,
+                }
+                for key, query in zip(keys, queries, strict=True)
+            ],
+        },
+    )
+
+
+_cached_compile_xpath = lru_cache(maxsize=DEFAULT_COMPILED_CACHE_SIZE)(_compile_xpath)
+_cached_translate_css = lru_cache(maxsize=DEFAULT_COMPILED_CACHE_SIZE)(_translate_css)
+_cached_compile_jmespath = lru_cache(maxsize=DEFAULT_COMPILED_CACHE_SIZE)(
+    _compile_jmespath
+)
+_cached_compile_jmespath_rules = lru_cache(maxsize=DEFAULT_COMPILED_CACHE_SIZE)(
+    _compile_jmespath_rules
+)
+
+
+def set_compiled_cache_size(maxsize: int | None) -> None:
+    """Empty the caches of compiled XPath expressions, translated CSS
+    selectors and compiled JMESPath expressions, including the expressions
+    that combine several JMESPath expressions, and make each of them keep up
+    to *maxsize* entries from now on, or any number of entries if *maxsize* is
+    ``None``.
+
+    These caches are shared by all the loaders of the process, and keep
+    :data:`DEFAULT_COMPILED_CACHE_SIZE` entries each by default.
+    """
+    global _cached_compile_xpath, _cached_translate_css, _cached_compile_jmespath  # noqa: PLW0603  # pylint: disable=global-statement
+    global _cached_compile_jmespath_rules  # noqa: PLW0603  # pylint: disable=global-statement
+    _cached_compile_xpath = lru_cache(maxsize=maxsize)(_compile_xpath)
+    _cached_translate_css = lru_cache(maxsize=maxsize)(_translate_css)
+    _cached_compile_jmespath = lru_cache(maxsize=maxsize)(_compile_jmespath)
+    _cached_compile_jmespath_rules = lru_cache(maxsize=maxsize)(_compile_jmespath_rules)
+
+
+def _uses_parsel_method(selector: Selector, name: str) -> bool:
+    return getattr(type(selector), name, None) is getattr(Selector, name, None)
+
+
+def _compiles_xpath(selector: Selector) -> bool:
+    """Tell whether XPath expressions can be compiled here for *selector*,
+    instead of leaving them to the selector."""
+    return (
+        selector.type in ("html", "xml")
+        and hasattr(selector.root, "xpath")
+        and not getattr(selector, "_lxml_smart_strings", False)
+        and _uses_parsel_method(selector, "xpath")
+    )
+
+
+def _get_namespaces(
+    selector: Selector, query: str, extra: Mapping[str, str] | None = None
+) -> tuple[tuple[str, str], ...] | None:
+    """Return the namespaces of *selector*, updated with *extra* as parsel
+    does, that *query* may use, or ``None`` if *query* must be left to the
+    selector."""
+    all_namespaces = selector.namespaces
+    if extra:
+        all_namespaces = {**all_namespaces, **extra}
+    # Mapping a prefix that the query does not use changes nothing but the
+    # cache key.
+    namespaces = tuple(
+        sorted(
+            (prefix, uri)
+            for prefix, uri in all_namespaces.items()
+            if f"{prefix}:" in query
+        )
+    )
+    # lxml registers the functions of EXSLT namespaces on every call of an
+    # evaluator that maps them, which makes it grow, so leave those to parsel.
+    if any(uri.startswith("http://exslt.org/") for _, uri in namespaces):
+        return None
+    return namespaces
+
+
+def _evaluate_xpath(
+    selector: Selector,
+    query: str,
+    namespaces: tuple[tuple[str, str], ...],
+    expression: str,
+    /,
+    **kw: Any,
+) -> SelectorList[Any]:
+    """Evaluate *query* on *selector*, and return its matches as the matches
+    of *expression*."""
+    evaluator = _cached_compile_xpath(query, namespaces)
+    try:
+        result: Any = evaluator(selector.root, **kw)
+    except etree.XPathError as exc:
+        raise ValueError(f"XPath error: {exc} in {expression}") from exc
+    if not isinstance(result, list):
+        result = [result]
+    return selector.selectorlist_cls(
+        selector.__class__(
+            root=x,
+            _expr=expression,
+            namespaces=selector.namespaces,
+            type=selector.type,
+        )
+        for x in result
+    )
+
+
+def _xpath(
+    selector: Selector,
+    query: str,
+    namespaces: Mapping[str, str] | None = None,
+    **kw: Any,
+) -> SelectorList[Any]:
+    """Return ``selector.xpath(query, namespaces, **kw)``, with *query*
+    compiled once per process."""
+    if not _compiles_xpath(selector):
+        return selector.xpath(query, namespaces, **kw)
+    query_namespaces = _get_namespaces(selector, query, namespaces)
+    if query_namespaces is None:
+        return selector.xpath(query, namespaces, **kw)
+    return _evaluate_xpath(selector, query, query_namespaces, query, **kw)
+
+
+def _css(selector: Selector, query: str) -> SelectorList[Any]:
+    """Return ``selector.css(query)``, with *query* translated into XPath once
+    per process."""
+    if selector.type not in ("html", "xml") or not (
+        _uses_parsel_method(selector, "css")
+        and _uses_parsel_method(selector, "_css2xpath")
+    ):
+        return selector.css(query)
+    return _xpath(selector, _cached_translate_css(query, selector.type))
+
+
+def _jmespath_values(result: Any) -> list[Any]:
+    """Return the values that parsel gets out of the JMESPath *result*."""
+    if result is None:
+        return []
+    if isinstance(result, list):
+        return list(result)
+    return [result]
+
+
+def _jmespath(selector: Selector, query: str) -> SelectorList[Any]:
+    """Return ``selector.jmespath(query)``, with *query* compiled once per
+    process."""
+    if not _searches_jmespath(selector):
+        return selector.jmespath(query)
+    return selector.selectorlist_cls(
+        selector.__class__(text=x, _expr=query, type="text")
+        if isinstance(x, str)
+        else selector.__class__(root=x, _expr=query)
+        for x in _jmespath_values(_cached_compile_jmespath(query).search(selector.root))
+    )
+
+
+def _searches_jmespath(selector: Selector) -> bool:
+    """Return whether the JMESPath expressions of *selector* can be searched
+    on its root directly.
+
+    Parsel decodes string roots of JSON selectors again before searching
+    them, so those are left to it."""
+    return (
+        selector.type == "json"
+        and not isinstance(selector.root, str)
+        and _uses_parsel_method(selector, "jmespath")
+    )
+
+
+def _select(
+    selector: Selector | SelectorList[Any], rule_type: str, rule: str, **kw: Any
+) -> SelectorList[Any]:
+    """Apply the *rule* of type *rule_type* (``"xpath"``, ``"css"`` or
+    ``"jmes"``) to *selector*, compiling *rule* once per process. *kw* are
+    XPath variables, and are only used with XPath rules."""
+    if isinstance(selector, SelectorList):
+        return selector.__class__(
+            match
+            for node_selector in selector
+            for match in _select(node_selector, rule_type, rule, **kw)
+        )
+    if rule_type == "xpath":
+        return _xpath(selector, rule, **kw)
+    if rule_type == "css":
+        return _css(selector, rule)
+    if rule_type == "jmes":
+        return _jmespath(selector, rule)
+    raise ValueError(f"Unknown rule type: {rule_type!r}")
+
+
+def _getall(
+    selector: Selector | SelectorList[Any], rule_type: str, rule: str, **kw: Any
+) -> list[Any]:
+    """Return ``_select(selector, rule_type, rule, **kw).getall()``, without
+    wrapping the results of JMESPath expressions in selectors first."""
+    if rule_type != "jmes":
+        return _select(selector, rule_type, rule, **kw).getall()
+    if isinstance(selector, SelectorList):
+        return [
+            value
+            for node_selector in selector
+            for value in _getall(node_selector, rule_type, rule)
+        ]
+    if _searches_jmespath(selector):
+        return _search(selector.root, rule)
+    return _select(selector, rule_type, rule, **kw).getall()
+
+
+def _getall_each(
+    selectors: Sequence[Selector], rule_type: str, rule: str
+) -> list[list[Any]]:
+    """Return ``[_getall(selector, rule_type, rule) for selector in
+    selectors]``, resolving *rule* once for all *selectors* if they are
+    alike, and only wrapping the matches of XPath and CSS rules in selectors
+    to serialize those that are not strings."""
+    if not selectors:
+        return []
+    first = selectors[0]
+    if rule_type == "css" and (
+        first.type in ("html", "xml")
+        and _uses_parsel_method(first, "css")
+        and _uses_parsel_method(first, "_css2xpath")
+    ):
+        rule_type, rule = "xpath", _cached_translate_css(rule, first.type)
+    namespaces = None
+    if rule_type == "xpath" and _compiles_xpath(first):
+        namespaces = _get_namespaces(first, rule)
+    if namespaces is None or any(
+        selector.__class__ is not first.__class__
+        or selector.type != first.type
+        or selector.namespaces != first.namespaces
+        for selector in selectors
+    ):
+        return [_getall(selector, rule_type, rule) for selector in selectors]
+    evaluator = _cached_compile_xpath(rule, namespaces)
+    results = []
+    for selector in selectors:
+        try:
+            result: Any = evaluator(selector.root)
+        except etree.XPathError as exc:
+            raise ValueError(f"XPath error: {exc} in {rule}") from exc
+        if not isinstance(result, list):
+            result = [result]
+        results.append(
+            [
+                # Strings are what parsel would serialize them into.
+                str(match)
+                if isinstance(match, str)
+                else selector.__class__(
+                    root=match, namespaces=selector.namespaces, type=selector.type
+                ).get()
+                for match in result
+            ]
+        )
+    return results
+
+
+def _search(data: Any, query: str) -> list[Any]:
+    """Return the values that the JMESPath expression *query* gets out of the
+    Python *data*, as ``getall()`` would for a JSON selector of *data*."""
+    return _jmespath_values(_search_result(data, query))
+
+
+def _search_result(data: Any, query: str) -> Any:
+    """Return the result of the JMESPath expression *query* on the Python
+    *data*, compiling *query* once per process."""
+    return _cached_compile_jmespath(query).search(data)
+
+
+def _get_xpath_boundaries(query: str) -> list[int] | None:
+    """Return the positions of the ``/`` and ``//`` separators between the
+    steps of *query*, or ``None`` if *query* is not a plain location path,
+    e.g. ``//a/@href``."""
+    boundaries = []
+    depth = 0
+    quote = None
+    for index, char in enumerate(query):
+        if quote is not None:
+            if char == quote:
+                quote = None
+        elif char in "\"'":
+            if not depth:
+                return None
+            quote = char
+        elif char in "[(":
+            if char == "(" and not depth:
+                match = _NAME_END.search(query, 0, index)
+                assert match is not None
+                if match.group() not in _NODE_TESTS:
+                    return None
+            depth += 1
+        elif char in "])":
+            depth -= 1
+            if depth < 0:
+                return None
+        elif depth:
+            continue
+        elif char == "/":
+            if index and query[index - 1] != "/":
+                boundaries.append(index)
+        elif (
+            char.isspace()
+            or char in "|=<>!+,$"
+            or (char == "*" and index and query[index - 1] not in "/:@")
+        ):
+            return None
+    if depth or quote is not None or query[:1].isdigit() or query.endswith("/"):
+        return None
+    return boundaries
+
+
+def _get_xpath_prefixes(query: str) -> list[str]:
+    """Return the prefixes of *query* that end between two of its steps, from
+    the shortest to the longest."""
+    boundaries = _get_xpath_boundaries(query) or ()
+    return [query[:boundary] for boundary in boundaries]
+
+
+def find_shared_xpath_prefixes(queries: Iterable[str]) -> dict[str, list[str]]:
+    """Find the XPath expressions among *queries* that start with the same
+    steps, and return them grouped by the prefix that they share, picking the
+    longest shared prefixes first.
+
+    >>> find_shared_xpath_prefixes([
+    ...     '//div[@id="product"]//h1/text()',
+    ...     '//div[@id="product"]//p[@class="price"]/text()',
+    ...     '//title/text()',
+    ... ])
+    {'//div[@id="product"]': ['//div[@id="product"]//h1/text()', \
+'//div[@id="product"]//p[@class="price"]/text()']}
+
+    Only the prefixes shared by at least two expressions are returned.
+    """
+    prefixes = {query: _get_xpath_prefixes(query) for query in dict.fromkeys(queries)}
+    shared: dict[str, list[str]] = {}
+    while True:
+        counts = Counter(
+            prefix for query_prefixes in prefixes.values() for prefix in query_prefixes
+        )
+        # Longer prefixes leave less to evaluate from their nodes.
+        prefix = max(
+            (prefix for prefix, count in counts.items() if count > 1),
+            key=len,
+            default=None,
+        )
+        if prefix is None:
+            return shared
+        shared[prefix] = [
+            query
+            for query, query_prefixes in prefixes.items()
+            if prefix in query_prefixes
+        ]
+        for query in shared[prefix]:
+            del prefixes[query]
+
+
+class ExtractionCache:
+    """Cache of the strings that parsing rules extract from a page.
+
+    Pass the same instance as the *extraction_cache* of every
+    :class:`~itemloaders.ItemLoader` that reads from a page, and each rule is
+    only evaluated once per node of that page, no matter how many loaders or
+    :ref:`nested loaders <nested-loaders>` use it.
+
+    Results are kept for as long as the cache exists, so use a new cache for
+    each page.
+
+    .. attribute:: hits
+
+        Number of rule evaluations that the cache saved.
+
+    .. attribute:: misses
+
+        Number of rule evaluations that the cache could not save.
+
+    .. attribute:: shared_xpath_prefixes
+
+        The XPath prefixes that :meth:`share_xpath_prefixes` found, with the
+        XPath expressions that share each of them.
+    """
+
+    def __init__(self) -> None:
+        self.hits: int = 0
+        self.misses: int = 0
+        # Results by (node id, selector type, rule type, rule, XPath
+        # variables). Each result also keeps its node, so that the node id
+        # cannot be reused by another node while the result is cached.
+        self._results: dict[Hashable, tuple[Any, list[Any]]] = {}
+        # Results of JMESPath expressions evaluated together by
+        # prefetch_jmespath(), by the same keys as _results, until they are
+        # first requested.
+        self._prefetched: dict[Hashable, tuple[Any, list[Any]]] = {}
+        self.shared_xpath_prefixes: dict[str, list[str]] = {}
+        self._xpath_prefixes: dict[str, str] = {}
+        # Nodes of shared XPath prefixes by (node id, selector type, prefix),
+        # or None where the nodes of a prefix cannot be shared.
+        self._prefix_nodes: dict[Hashable, tuple[Any, list[Any] | None]] = {}
+
+    def __len__(self) -> int:
+        return len(self._results) + len(self._prefetched)
+
+    def clear(self) -> None:
+        """Remove all cached results, and reset :attr:`hits` and
+        :attr:`misses`."""
+        self._results.clear()
+        self._prefetched.clear()
+        self._prefix_nodes.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def getall(
+        self,
+        selector: Selector | SelectorList[Any],
+        rule_type: str,
+        rule: str,
+        **kw: Any,
+    ) -> list[Any]:
+        """Return the same as ``selector.xpath(rule, **kw).getall()``,
+        ``selector.css(rule).getall()`` or ``selector.jmespath(rule).getall()``
+        for a *rule_type* of ``"xpath"``, ``"css"`` or ``"jmes"``
+        respectively, evaluating *rule* only for the nodes of *selector* that
+        it has not been evaluated for yet."""
+        if isinstance(selector, SelectorList):
+            values = []
+            for node_selector in selector:
+                values += self.getall(node_selector, rule_type, rule, **kw)
+            return values
+        variables: tuple[tuple[str, Any], ...] = ()
+        if rule_type == "xpath":
+            variables = tuple(sorted(kw.items()))
+            if kw.get("namespaces"):
+                # Key the namespaces as merged into those of the selector,
+                # and as a tuple, since dicts are unhashable.
+                namespaces = {**selector.namespaces, **kw["namespaces"]}
+                variables = tuple(
+                    (name, tuple(sorted(namespaces.items())))
+                    if name == "namespaces"
+                    else (name, value)
+                    for name, value in variables
+                )
+        key = (id(selector.root), selector.type, rule_type, rule, variables)
+        try:
+            result = self._results.get(key)
+        except TypeError:  # unhashable XPath variable values
+            self.misses += 1
+            return _getall(selector, rule_type, rule, **kw)
+        if result is not None:
+            self.hits += 1
+            return list(result[1])
+        self.misses += 1
+        result = self._prefetched.pop(key, None)
+        if result is not None:
+            self._results[key] = result
+            return list(result[1])
+        prefix = self._xpath_prefixes.get(rule) if rule_type == "xpath" else None
+        matches = None
+        if prefix is not None and not kw:
+            matches = self._xpath_after_prefix(selector, rule, prefix)
+        if matches is None:
+            values = _getall(selector, rule_type, rule, **kw)
+        else:
+            values = matches.getall()
+        self._results[key] = (selector.root, values)
+        return list(values)
+
+    def share_xpath_prefixes(self, queries: Iterable[str]) -> dict[str, list[str]]:
+        """Find the prefixes that XPath expressions among *queries* share, as
+        :func:`find_shared_xpath_prefixes` does, and from now on evaluate each
+        of those prefixes only once per node, and those expressions from the
+        nodes of their prefix.
+
+        Return the prefixes found, which are also added to
+        :attr:`shared_xpath_prefixes`.
+        """
+        shared = find_shared_xpath_prefixes(
+            query for query in queries if query not in self._xpath_prefixes
+        )
+        for prefix, prefix_queries in shared.items():
+            self.shared_xpath_prefixes.setdefault(prefix, []).extend(prefix_queries)
+            for query in prefix_queries:
+                self._xpath_prefixes[query] = prefix
+        return shared
+
+    def search(self, data: Any, query: str) -> list[Any]:
+        """Return the values that the JMESPath expression *query* gets out of
+        the Python *data*, as :meth:`getall` does for a JSON selector of
+        *data*, evaluating *query* only if it has not been evaluated for
+        *data* yet.
+
+        Results are shared with JSON selectors whose root is *data*.
+        """
+        key = (id(data), "json", "jmes", query, ())
+        result = self._results.get(key)
+        if result is not None:
+            self.hits += 1
+            return list(result[1])
+        self.misses += 1
+        result = self._prefetched.pop(key, None)
+        if result is None:
+            result = (data, _search(data, query))
+        self._results[key] = result
+        return list(result[1])
+
+    def prefetch_jmespath(
+        self, source: Selector | SelectorList[Any] | Any, queries: Iterable[str]
+    ) -> None:
+        """Evaluate the JMESPath expressions among *queries* that have not
+        been evaluated for the nodes of *source*, a selector or Python data,
+        yet, all of them at once, as a single multiselect hash expression, so
+        that :meth:`getall` and :meth:`search` return their results without
+        evaluating them again.
+
+        Only JSON selectors and Python data are supported. For other
+        selectors, nothing is evaluated in advance.
+        """
+        if isinstance(source, SelectorList):
+            queries = list(queries)
+            for node_selector in source:
+                self.prefetch_jmespath(node_selector, queries)
+            return
+        if isinstance(source, Selector):
+            if not _searches_jmespath(source):
+                return
+            source = source.root
+        # A multiselect hash of null is null, whatever its expressions.
+        if source is None:
+            return
+        keys = {}
+        for query in queries:
+            key = (id(source), "json", "jmes", query, ())
+            if key not in self._results and key not in self._prefetched:
+                keys[query] = key
+        if not keys:
+            return
+        result = _cached_compile_jmespath_rules(tuple(keys)).search(source)
+        for index, key in enumerate(keys.values()):
+            self._prefetched[key] = (source, _jmespath_values(result[str(index)]))
+
+    def _xpath_after_prefix(
+        self, selector: Selector, query: str, prefix: str
+    ) -> SelectorList[Any] | None:
+        """Return the matches of *query* on *selector*, evaluated from the
+        nodes of *prefix*, or ``None`` if that is not possible."""
+        if not _compiles_xpath(selector):
+            return None
+        key = (id(selector.root), selector.type, prefix)
+        entry = self._prefix_nodes.get(key)
+        if entry is None:
+            nodes = None
+            namespaces = _get_namespaces(selector, prefix)
+            if namespaces is not None:
+                with suppress(ValueError, etree.XPathError):
+                    result = _cached_compile_xpath(prefix, namespaces)(selector.root)
+                    # Only elements can be passed back as XPath variables.
+                    if isinstance(result, list) and all(
+                        isinstance(node, etree._Element) for node in result
+                    ):
+                        nodes = result
+            entry = self._prefix_nodes[key] = (selector.root, nodes)
+        nodes = entry[1]
+        if nodes is None:
+            return None
+        remainder = f"${_PREFIX_VARIABLE}{query[len(prefix) :]}"
+        namespaces = _get_namespaces(selector, remainder)
+        if namespaces is None:
+            return None
+        return _evaluate_xpath(
+            selector, remainder, namespaces, query, **{_PREFIX_VARIABLE: nodes}
+        )
@@ -3,12 +3,13 @@
 from __future__ import annotations
 
 from functools import lru_cache, partial
+from inspect import iscoroutinefunction
 from typing import TYPE_CHECKING, Any
 
 from itemloaders.utils import get_func_args
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, MutableMapping
+    from collections.abc import Callable, Iterable, MutableMapping
 
 
 @lru_cache(maxsize=1024)
@@ -16,16 +17,49 @@ def _takes_loader_context(function: Callable[..., Any]) -> bool:
     return "loader_context" in get_func_args(function)
 
 
+def takes_loader_context(function: Callable[..., Any]) -> bool:
+    """Tell whether the given function receives a loader_context argument"""
+    try:
+        return _takes_loader_context(function)
+    except TypeError:  # unhashable function
+        return "loader_context" in get_func_args(function)
+
+
+def _get_functions(function: Any) -> Iterable[Callable[..., Any]]:
+    """Return the functions of processors like
+    :class:`~itemloaders.processors.MapCompose`, or nothing for other
+    functions, e.g. mocks, whose ``functions`` attribute is something else."""
+    functions = getattr(function, "functions", None)
+    if functions.__class__ is tuple or functions.__class__ is list:
+        return functions
+    return ()
+
+
+def is_async(function: Callable[..., Any]) -> bool:
+    """Tell whether the given processor is a coroutine function, has an
+    ``async`` ``__call__`` method, or has any such function among its
+    ``functions``, as in :class:`~itemloaders.processors.MapCompose`"""
+    if iscoroutinefunction(function) or iscoroutinefunction(type(function).__call__):
+        return True
+    return any(map(is_async, _get_functions(function)))
+
+
+def is_impure(function: Callable[..., Any]) -> bool:
+    """Tell whether the given processor is marked as impure, i.e. whether it
+    or any of its ``functions``, as in
+    :class:`~itemloaders.processors.MapCompose`, has an ``impure`` attribute
+    set to ``True``"""
+    if getattr(function, "impure", False) is True:
+        return True
+    return any(map(is_impure, _get_functions(function)))
+
+
 def wrap_loader_context(
     function: Callable[..., Any], context: MutableMapping[str, Any]
 ) -> Callable[..., Any]:
     """Wrap functions that receive loader_context to contain the context
     "pre-loaded" and expose an interface that receives only one argument
     """
-    try:
-        takes_loader_context = _takes_loader_context(function)
-    except TypeError:  # unhashable function
-        takes_loader_context = "loader_context" in get_func_args(function)
-    if takes_loader_context:
+    if takes_loader_context(function):
         return partial(function, loader_context=context)
     return function
@@ -6,14 +6,126 @@ See documentation in :ref:`declaring-loaders`.
 
 from __future__ import annotations
 
-from collections import ChainMap
+import asyncio
+import linecache
+import weakref
+from collections import ChainMap, deque
+from functools import partial
+from inspect import isawaitable
+from itertools import count
 from typing import TYPE_CHECKING, Any
 
-from itemloaders.common import wrap_loader_context
-from itemloaders.utils import arg_to_iter
+from itemloaders.common import is_async, takes_loader_context, wrap_loader_context
+from itemloaders.utils import _is_iterable_class, _iterable_classes, arg_to_iter
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Iterable, MutableMapping
+    from collections.abc import Callable, Iterable, MutableMapping, Sequence
+
+_compiled_numbers = count()
+
+
+def _wrap_functions(
+    processor: MapCompose | Compose,
+    loader_context: MutableMapping[str, Any] | None,
+) -> Sequence[Callable[..., Any]]:
+    """Return the functions of *processor* ready to be called with a single
+    argument, with the given loader context pre-loaded into those that
+    receive it."""
+    functions = processor.functions
+    checked_functions, any_takes_loader_context, _ = processor._function_usage
+    if checked_functions is not functions:
+        any_takes_loader_context = any(map(takes_loader_context, functions))
+        processor._function_usage = (
+            functions,
+            any_takes_loader_context,
+            any(map(is_async, functions)),
+        )
+    if not any_takes_loader_context:
+        # Nothing to wrap, which is the common case, so there is no need to
+        # build the context either.
+        return functions
+    context: MutableMapping[str, Any]
+    if loader_context:
+        context = ChainMap(loader_context, processor.default_loader_context)
+    else:
+        context = processor.default_loader_context
+    return [wrap_loader_context(f, context) for f in functions]
+
+
+def _compile_function(
+    processor: MapCompose | Compose,
+    setup: list[str],
+    body: list[str],
+    result: str,
+    namespace: dict[str, Any],
+) -> Callable[..., Any]:
+    """Define and return a function that runs the *setup* lines, then the
+    *body* lines and then returns *result*.
+
+    The lines may call the functions of *processor* as ``f0``, ``f1``, etc.,
+    with the loader context pre-loaded into those that receive it. Body lines
+    must be indented for a ``try`` block, and must set ``step`` to the index
+    of each function before calling it, so that errors can be reported the way
+    *processor* reports them.
+
+    The source code is registered with :mod:`linecache`, so that tracebacks
+    and :func:`inspect.getsource` can show it, until the function is garbage
+    collected.
+    """
+    processor_name = processor.__class__.__name__
+    function_name = f"compiled_{processor_name.lower()}"
+    functions = tuple(processor.functions)
+    if any(map(is_async, functions)):
+        raise ValueError(f"Cannot compile a {processor_name} with async functions")
+    context_functions = [
+        index for index, f in enumerate(functions) if takes_loader_context(f)
+    ]
+    lines = [f"def {function_name}(value, loader_context=None):"]
+    if context_functions:
+        lines += [
+            "    if loader_context:",
+            "        context = ChainMap(loader_context, default_loader_context)",
+            "    else:",
+            "        context = default_loader_context",
+        ]
+        lines += [
+            f"    f{index} = partial(raw_f{index}, loader_context=context)"
+            for index in context_functions
+        ]
+    lines += setup
+    if functions:
+        function_tuple = ", ".join(f"f{index}" for index in range(len(functions)))
+        if len(functions) == 1:
+            function_tuple += ","
+        lines += [
+            "    step = 0",
+            "    try:",
+            *body,
+            "    except Exception as e:",
+            f"        func = ({function_tuple})[step]",
+            "        raise ValueError(",
+            f'            f"Error in {processor_name} with "',
+            "            f\"{func!s} value={value!r} error='{type(e).__name__}: {e!s}'\"",
+            "        ) from e",
+        ]
+    lines.append(f"    return {result}")
+    source = "\n".join(lines) + "\n"
+    # Unlike ids, numbers are not reused for later functions.
+    filename = f"<compiled {processor_name} {next(_compiled_numbers)}>"
+    namespace.update(
+        {
+            f"raw_f{index}" if index in context_functions else f"f{index}": f
+            for index, f in enumerate(functions)
+        },
+        ChainMap=ChainMap,
+        partial=partial,
+        default_loader_context=processor.default_loader_context,
+    )
+    exec(compile(source, filename, "exec"), namespace)  # noqa: S102
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    function: Callable[..., Any] = namespace[function_name]
+    weakref.finalize(function, linecache.cache.pop, filename, None)
+    return function
 
 
 class MapCompose:
@@ -57,9 +169,22 @@ class MapCompose:
     ``__init__`` method keyword arguments are used as default context values.
     See :class:`Compose` processor for more info.
 
+    If any function is a coroutine function, or a processor with one, this
+    processor returns an awaitable instead, which runs the whole chain of
+    functions on each input value concurrently, awaiting the awaitables that
+    functions return (see :ref:`async-processors`).
+
     .. _`parsel selectors`: https://parsel.readthedocs.io/en/latest/parsel.html#parsel.selector.Selector.extract
     """
 
+    # The functions last checked, whether any of them has a loader_context
+    # argument, and whether any of them is async.
+    _function_usage: tuple[Sequence[Callable[..., Any]], bool, bool] = (
+        (),
+        False,
+        False,
+    )
+
     def __init__(self, *functions: Callable[..., Any], **default_loader_context: Any):
         self.functions = functions
         self.default_loader_context = default_loader_context
@@ -68,13 +193,10 @@ class MapCompose:
         self, value: Any, loader_context: MutableMapping[str, Any] | None = None
     ) -> Iterable[Any]:
         values = arg_to_iter(value)
-        context: MutableMapping[str, Any]
-        if loader_context:
-            context = ChainMap(loader_context, self.default_loader_context)
-        else:
-            context = self.default_loader_context
-        wrapped_funcs = [wrap_loader_context(f, context) for f in self.functions]
-        for func in wrapped_funcs:
+        functions = _wrap_functions(self, loader_context)
+        if self._function_usage[2]:
+            return self._call_async(value, values, functions)  # type: ignore[return-value]
+        for func in functions:
             next_values: list[Any] = []
             for v in values:
                 try:
@@ -87,6 +209,112 @@ class MapCompose:
             values = next_values
         return values
 
+    async def _call_async(
+        self,
+        value: Any,
+        values: Iterable[Any],
+        functions: Sequence[Callable[..., Any]],
+    ) -> list[Any]:
+        """Run the functions on each of *values* concurrently, awaiting the
+        awaitables that they return."""
+
+        async def process(v: Any) -> list[Any]:
+            values = [v]
+            for func in functions:
+                next_values: list[Any] = []
+                for v in values:  # noqa: PLR1704
+                    try:
+                        result = func(v)
+                        if isawaitable(result):
+                            result = await result
+                    except Exception as e:
+                        raise ValueError(
+                            f"Error in MapCompose with {func!s} value={value!r} "
+                            f"error='{type(e).__name__}: {e!s}'"
+                        ) from e
+                    next_values += arg_to_iter(result)
+                values = next_values
+            return values
+
+        results = await asyncio.gather(*map(process, values))
+        return [v for result in results for v in result]
+
+    def compile(self) -> Callable[..., Any]:
+        """
+        Return a function equivalent to this processor, generated for its
+        current functions, with the loop over each of them fused into a
+        single nested loop.
+
+        The compiled function saves the intermediate lists of values and
+        most of the per-value overhead of this processor, which matters for
+        long chains of cheap functions, like those of most input processors.
+        It raises the same errors as this processor, but it applies the whole
+        chain of functions to each value before moving on to the next value,
+        so it only suits functions whose calls do not depend on each other.
+
+        Changes to :attr:`functions` after compilation do not affect the
+        compiled function.
+
+        >>> from itemloaders.processors import MapCompose
+        >>> proc = MapCompose(str.strip, str.split, str.upper).compile()
+        >>> proc([' hello world', 'this '])
+        ['HELLO', 'WORLD', 'THIS']
+        """
+        count = len(self.functions)
+        setup = ["    values = arg_to_iter(value)"]
+        if not count:
+            return _compile_function(
+                self, setup, [], "values", {"arg_to_iter": arg_to_iter}
+            )
+        # Iterate over lists and tuples only, turning any other result into
+        # one as soon as it is returned, so that errors raised while iterating
+        # it are blamed on the function that returned it.
+        setup += [
+            "    if values.__class__ is not list and values.__class__ is not tuple:",
+            "        values = list(values)",
+            "    result = []",
+            "    append = result.append",
+            "    extend = result.extend",
+        ]
+        body = ["        for v0 in values:"]
+        for index in range(count):
+            indent = " " * 4 * (index + 3)
+            if index or count > 1:
+                body.append(f"{indent}step = {index}")
+            body += [
+                f"{indent}r{index} = f{index}(v{index})",
+                f"{indent}if r{index} is None:",
+                f"{indent}    continue",
+                f"{indent}cls = r{index}.__class__",
+            ]
+            if index < count - 1:
+                body += [
+                    f"{indent}if cls is not list and cls is not tuple:",
+                    f"{indent}    if _iterable_classes.get(cls) or _is_iterable_class(cls):",
+                    f"{indent}        r{index} = list(r{index})",
+                    f"{indent}    else:",
+                    f"{indent}        r{index} = (r{index},)",
+                    f"{indent}for v{index + 1} in r{index}:",
+                ]
+            else:
+                body += [
+                    f"{indent}if _iterable_classes.get(cls) or _is_iterable_class(cls):",
+                    f"{indent}    extend(r{index})",
+                    f"{indent}else:",
+                    f"{indent}    append(r{index})",
+                ]
+        return _compile_function(
+            self,
+            setup,
+            body,
+            "result",
+            {
+                "arg_to_iter": arg_to_iter,
+                "_iterable_classes": _iterable_classes,
+                "_is_iterable_class": _is_iterable_class,
+            },
+        )
+
 
 class Compose:
     """
@@ -115,8 +343,21 @@ class Compose:
     Loader context values passed to functions are overridden with the currently
     active Loader context accessible through the :attr:`ItemLoader.context
     <itemloaders.ItemLoader.context>` attribute.
+
+    If any function is a coroutine function, or a processor with one, this
+    processor returns an awaitable instead, which awaits the awaitables that
+    functions return before passing their result to the next function (see
+    :ref:`async-processors`).
     """
 
+    # The functions last checked, whether any of them has a loader_context
+    # argument, and whether any of them is async.
+    _function_usage: tuple[Sequence[Callable[..., Any]], bool, bool] = (
+        (),
+        False,
+        False,
+    )
+
     def __init__(self, *functions: Callable[..., Any], **default_loader_context: Any):
         self.functions = functions
         self.stop_on_none = default_loader_context.get("stop_on_none", True)
@@ -125,13 +366,10 @@ class Compose:
     def __call__(
         self, value: Any, loader_context: MutableMapping[str, Any] | None = None
     ) -> Any:
-        context: MutableMapping[str, Any]
-        if loader_context:
-            context = ChainMap(loader_context, self.default_loader_context)
-        else:
-            context = self.default_loader_context
-        wrapped_funcs = [wrap_loader_context(f, context) for f in self.functions]
-        for func in wrapped_funcs:
+        functions = _wrap_functions(self, loader_context)
+        if self._function_usage[2]:
+            return self._call_async(value, functions)
+        for func in functions:
             if value is None and self.stop_on_none:
                 break
             try:
@@ -143,6 +381,48 @@ class Compose:
                 ) from e
         return value
 
+    async def _call_async(
+        self, value: Any, functions: Sequence[Callable[..., Any]]
+    ) -> Any:
+        """Run the functions on *value* one after the other, awaiting the
+        awaitables that they return."""
+        for func in functions:
+            if value is None and self.stop_on_none:
+                break
+            try:
+                result = func(value)
+                if isawaitable(result):
+                    result = await result
+            except Exception as e:
+                raise ValueError(
+                    f"Error in Compose with "
+                    f"{func!s} value={value!r} error='{type(e).__name__}: {e!s}'"
+                ) from e
+            value = result
+        return value
+
+    def compile(self) -> Callable[..., Any]:
+        """
+        Return a function equivalent to this processor, generated for its
+        current functions, with the loop over them unrolled.
+
+        Changes to :attr:`functions` after compilation do not affect the
+        compiled function.
+
+        >>> from itemloaders.processors import Compose
+        >>> proc = Compose(lambda v: v[0], str.upper).compile()
+        >>> proc(['hello', 'world'])
+        'HELLO'
+        """
+        body = []
+        for index in range(len(self.functions)):
+            if self.stop_on_none:
+                body += ["        if value is None:", "            return None"]
+            if index:
+                body.append(f"        step = {index}")
+            body.append(f"        value = f{index}(value)")
+        return _compile_function(self, [], body, "value", {})
+
 
 class TakeFirst:
     """
@@ -253,3 +533,152 @@ class Join:
 
     def __call__(self, values: Any) -> str:
         return self.separator.join(values)
+
+
+# Functions that, given a string, return a string, so that their output is a
+# single value even for MapCompose, and that are cheap enough for a chain of
+# them to be called as a single function.
+_STRING_FUNCTIONS = frozenset(
+    {
+        str.capitalize,
+        str.casefold,
+        str.lower,
+        str.lstrip,
+        str.rstrip,
+        str.strip,
+        str.swapcase,
+        str.title,
+        str.upper,
+    }
+)
+
+
+def _is_string_function(function: Any) -> bool:
+    try:
+        return function in _STRING_FUNCTIONS
+    except TypeError:  # unhashable function
+        return False
+
+
+class _StringFunctions:
+    """Call the given string functions, one after the other, as a single
+    function."""
+
+    def __init__(self, *functions: Callable[[str], str]):
+        self.functions = functions
+
+    def __call__(self, value: str) -> str:
+        for function in self.functions:
+            value = function(value)
+        return value
+
+    def __repr__(self) -> str:
+        names = ", ".join(f"str.{function.__name__}" for function in self.functions)
+        return f"<string functions {names}>"
+
+
+def _can_inline(processor: MapCompose | Compose, nested: MapCompose | Compose) -> bool:
+    """Tell whether the functions of *nested*, a function of *processor*, can
+    be called directly by *processor*, i.e. with the same loader context."""
+    return not nested.default_loader_context or (
+        nested.default_loader_context == processor.default_loader_context
+    )
+
+
+def _simplify_compose(processor: Compose) -> Callable[..., Any]:
+    functions: list[Callable[..., Any]] = []
+    for function in processor.functions:
+        function = simplify(function)  # noqa: PLW2901
+        if function.__class__ is Identity:
+            continue
+        if (
+            function.__class__ is Compose
+            and function.stop_on_none == processor.stop_on_none
+            and _can_inline(processor, function)
+        ):
+            functions += function.functions
+            continue
+        functions.append(function)
+    if not functions:
+        return Identity()
+    if functions == list(processor.functions):
+        return processor
+    return Compose(*functions, **processor.default_loader_context)
+
+
+def _simplify_map_compose(processor: MapCompose) -> Callable[..., Any]:
+    functions: list[Callable[..., Any]] = []
+    pending = deque(processor.functions)
+    while pending:
+        function = simplify(pending.popleft())
+        # MapCompose flattens the values that functions return, so functions
+        # that do nothing to single values, like Identity or the functions of
+        # a nested MapCompose, can only be inlined after a function that
+        # returns single values.
+        single_values = bool(functions) and (
+            _is_string_function(functions[-1])
+            or functions[-1].__class__ is _StringFunctions
+        )
+        if not single_values:
+            functions.append(function)
+        elif function.__class__ is Identity:
+            pass
+        elif function.__class__ is MapCompose and _can_inline(processor, function):
+            pending.extendleft(reversed(function.functions))
+        elif _is_string_function(function):
+            previous = functions.pop()
+            if previous.__class__ is _StringFunctions:
+                functions.append(_StringFunctions(*previous.functions, function))
+            else:
+                functions.append(_StringFunctions(previous, function))
+        else:
+            functions.append(function)
+    if functions == list(processor.functions):
+        return processor
+    return MapCompose(*functions, **processor.default_loader_context)
+
+
+def simplify(processor: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Return a processor equivalent to the given one, which may be simpler to
+    run.
+
+    Item Loaders simplify the processors declared in their class the first
+    time they use them, so this function is mostly useful to inspect what
+    they actually run, since
+    :meth:`~itemloaders.ItemLoader.get_input_processor` and
+    :meth:`~itemloaders.ItemLoader.get_output_processor` return processors
+    as declared.
+
+    Simplification only applies to :class:`Compose` and :class:`MapCompose`
+    objects, not to subclasses of them, which:
+
+    -   Drop :class:`Identity` functions, and return :class:`Identity` if no
+        other function is left in a :class:`Compose`.
+
+    -   Inline the functions of a nested processor of the same class,
+        unless the nested processor has a different default loader context
+        or, for :class:`Compose`, a different ``stop_on_none``.
+
+    -   In :class:`MapCompose`, merge consecutive string functions, such as
+        ``str.strip`` and ``str.lower``, into a single function.
+
+    :class:`MapCompose` flattens the values that its functions return, so it
+    only drops an :class:`Identity`, or inlines a nested :class:`MapCompose`,
+    right after a string function.
+
+    Processors that are already as simple as possible are returned as is.
+    Errors may name a different function than the original processor would,
+    e.g. a merged function instead of one of its parts.
+
+    >>> from itemloaders.processors import Compose, MapCompose, simplify
+    >>> simplify(Compose(Compose(str.strip, Identity()), str.upper)).functions
+    (<method 'strip' of 'str' objects>, <method 'upper' of 'str' objects>)
+    >>> simplify(MapCompose(str.strip, Identity(), str.upper)).functions
+    (<string functions str.strip, str.upper>,)
+    """
+    if processor.__class__ is Compose:
+        return _simplify_compose(processor)
+    if processor.__class__ is MapCompose:
+        return _simplify_map_compose(processor)
+    return processor
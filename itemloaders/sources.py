@@ -0,0 +1,452 @@
+"""
+Data sources that are only read and parsed as far as the rules of loaders
+need.
+
+See documentation in :ref:`json-documents` and :ref:`file-sources`.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import mmap
+import os
+import re
+from functools import lru_cache
+from json.decoder import scanstring  # type: ignore[attr-defined]
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypeGuard, cast
+
+import jmespath
+from lxml import etree, html
+from parsel import Selector
+from w3lib.encoding import html_body_declared_encoding, read_bom
+
+from itemloaders.cache import DEFAULT_COMPILED_CACHE_SIZE, _search_result
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+    from typing import IO
+
+    from typing_extensions import Buffer
+
+_decoder = json.JSONDecoder()
+# Decoder that drops every object as soon as it is parsed, which keeps memory
+# usage flat while skipping values, at the speed of the C parser.
+_skipping_decoder = json.JSONDecoder(object_pairs_hook=lambda pairs: None)
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Expressions whose first child is applied to the data, and the second one to
+# each item of its result.
+_PROJECTIONS = frozenset({"projection", "value_projection", "filter_projection"})
+# Expressions that result in a list of parts of the data they are applied to.
+_LISTS = _PROJECTIONS | {"flatten"}
+_UNPARSED = object()
+_JSON_START = re.compile(r"\ufeff?[ \t\n\r]*[\[{]")
+
+
+class _Path:
+    """Parts of a JSON value that JMESPath expressions can reach."""
+
+    __slots__ = ("all", "children", "items")
+
+    def __init__(self) -> None:
+        # Whether the whole value is needed.
+        self.all = False
+        # Paths of the values of object keys.
+        self.children: dict[str, _Path] = {}
+        # Path of every item of an array and every value of an object, on top
+        # of the paths in children.
+        self.items: _Path | None = None
+
+    def child(self, key: str) -> _Path:
+        path = self.children.get(key)
+        if path is None:
+            path = self.children[key] = _Path()
+        return path
+
+    def item(self) -> _Path:
+        if self.items is None:
+            self.items = _Path()
+        return self.items
+
+    def merge(self, other: _Path) -> None:
+        self.all = self.all or other.all
+        for key, path in other.children.items():
+            self.child(key).merge(path)
+        if other.items is not None:
+            self.item().merge(other.items)
+
+    def finish(self) -> None:
+        """Make the paths in :attr:`children` include :attr:`items`, so that
+        the path of each object key is a single lookup."""
+        if self.all:
+            self.children.clear()
+            self.items = None
+            return
+        if self.items is not None:
+            self.items.finish()
+            for path in self.children.values():
+                path.merge(self.items)
+        for path in self.children.values():
+            path.finish()
+
+
+def _reach(node: Mapping[str, Any], paths: list[_Path]) -> list[_Path]:
+    """Add to *paths* the parts of the values at *paths* that the JMESPath
+    expression *node* needs, and return the paths of its result, of its items
+    if *node* is one of :data:`_LISTS` or a slice, or an empty list if its
+    result is not a part of those values."""
+    node_type = node["type"]
+    children = node["children"]
+    if node_type == "field":
+        return [path.child(node["value"]) for path in paths]
+    if node_type in ("identity", "current"):
+        return paths
+    if node_type == "subexpression":
+        for child in children:
+            paths = _reach(child, paths)
+        return paths
+    if node_type == "index_expression":
+        paths = _get_items(children[0], paths)
+        for _ in children[2:]:
+            paths = [path.item() for path in paths]
+        return paths
+    if node_type == "flatten":
+        items = _get_items(children[0], paths)
+        return items + [path.item() for path in items]
+    if node_type in _PROJECTIONS:
+        items = _get_items(children[0], paths)
+        if node_type == "filter_projection":
+            _mark_all(items)
+        return _reach(children[1], items)
+    if node_type == "pipe":
+        # The right expression applies to the result of the left one.
+        _mark_all(_reach(children[0], paths))
+        return []
+    if node_type in ("literal", "expref"):
+        # Expression references apply to the items of another argument.
+        return []
+    # The result of other expressions, such as functions or comparisons, is
+    # built out of whole values of their children.
+    for child in children:
+        if isinstance(child, dict):
+            _mark_all(_reach(child, paths))
+    return []
+
+
+def _get_items(node: Mapping[str, Any], paths: list[_Path]) -> list[_Path]:
+    """Return the paths of the items of the result of *node*."""
+    if node["type"] in _LISTS or (
+        node["type"] == "index_expression" and node["children"][-1]["type"] == "slice"
+    ):
+        # _reach() returns the paths of their items already.
+        return _reach(node, paths)
+    return [path.item() for path in _reach(node, paths)]
+
+
+def _mark_all(paths: Iterable[_Path]) -> None:
+    for path in paths:
+        path.all = True
+
+
+@lru_cache(maxsize=DEFAULT_COMPILED_CACHE_SIZE)
+def _get_path(chains: frozenset[tuple[str, ...]]) -> _Path:
+    """Return the parts of a JSON document that *chains* of JMESPath
+    expressions, each applied to the result of the previous one, can reach."""
+    root = _Path()
+    for chain in chains:
+        paths = [root]
+        for query in chain:
+            node = jmespath.compile(query).parsed
+            paths = _reach(node, paths)
+            if node["type"] in _LISTS:
+                # What comes next applies to the whole list.
+                _mark_all(paths)
+                break
+        else:
+            _mark_all(paths)
+    root.finish()
+    return root
+
+
+def _skip_whitespace(text: str, index: int) -> int:
+    match = _WHITESPACE.match(text, index)
+    assert match is not None
+    return match.end()
+
+
+def _skip(text: str, index: int) -> int:
+    """Return the end of the JSON value that starts at *index* of *text*,
+    only keeping the Python objects of its parts while parsing them."""
+    return _skipping_decoder.raw_decode(text, index)[1]
+
+
+def _prune(value: Any, path: _Path) -> Any:
+    """Return the parts of the parsed JSON *value* that *path* covers."""
+    if path.all:
+        return value
+    if isinstance(value, dict):
+        if path.items is None:
+            return {
+                key: _prune(value[key], child)
+                for key, child in path.children.items()
+                if key in value
+            }
+        return {
+            key: _prune(item, path.children.get(key, path.items))
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        if path.items is None:
+            return []
+        return [_prune(item, path.items) for item in value]
+    return value
+
+
+def _parse(text: str, index: int, path: _Path) -> tuple[Any, int]:
+    """Return the parts of the JSON value that starts at *index* of *text*
+    that *path* covers, and the end of that value."""
+    char = text[index : index + 1]
+    if path.all or char not in "[{":
+        return _decoder.raw_decode(text, index)
+    if char == "[":
+        if path.items is None:
+            # Nothing in the items is needed, and neither is their number:
+            # only object keys are, which arrays do not have.
+            return [], _skip(text, index)
+        return _parse_array(text, index, path.items)
+    value: dict[str, Any] = {}
+    index = _skip_whitespace(text, index + 1)
+    if text[index : index + 1] == "}":
+        return value, index + 1
+    while True:
+        if text[index : index + 1] != '"':
+            raise json.JSONDecodeError(
+                "Expecting property name enclosed in double quotes", text, index
+            )
+        key, index = scanstring(text, index + 1)
+        index = _skip_whitespace(text, index)
+        if text[index : index + 1] != ":":
+            raise json.JSONDecodeError("Expecting ':' delimiter", text, index)
+        index = _skip_whitespace(text, index + 1)
+        child = path.children.get(key, path.items)
+        if child is None:
+            index = _skip(text, index)
+        else:
+            value[key], index = _parse(text, index, child)
+        index = _skip_whitespace(text, index)
+        char = text[index : index + 1]
+        if char == "}":
+            return value, index + 1
+        if char != ",":
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, index)
+        index = _skip_whitespace(text, index + 1)
+
+
+def _parse_array(text: str, index: int, path: _Path) -> tuple[list[Any], int]:
+    """Return the parts of the items of the JSON array that starts at *index*
+    of *text* that *path* covers, and the end of that array.
+
+    Array items, usually records of similar and moderate size, are parsed
+    whole by the C parser and pruned afterwards, which is much faster than
+    walking their keys in Python, while only keeping one of them at a time.
+    """
+    items: list[Any] = []
+    index = _skip_whitespace(text, index + 1)
+    if text[index : index + 1] == "]":
+        return items, index + 1
+    while True:
+        item, index = _decoder.raw_decode(text, index)
+        items.append(_prune(item, path))
+        index = _skip_whitespace(text, index)
+        char = text[index : index + 1]
+        if char == "]":
+            return items, index + 1
+        if char != ",":
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, index)
+        index = _skip_whitespace(text, index + 1)
+
+
+def _decode(text: str | Buffer) -> str:
+    if isinstance(text, str):
+        return text
+    return str(text, json.detect_encoding(bytes(memoryview(text)[:4])))
+
+
+def parse_json(text: str | Buffer, queries: Iterable[str]) -> Any:
+    """Parse the JSON document *text*, only creating the Python objects of the
+    parts that the JMESPath expressions *queries* can reach.
+
+    Applying any of *queries* to the result returns the same as applying it
+    to ``json.loads(text)``:
+
+    >>> data = parse_json('{"a": {"b": 1, "c": [2, 3]}, "d": 4}', ['a.b'])
+    >>> data
+    {'a': {'b': 1}}
+    >>> jmespath.search('a.b', data)
+    1
+
+    Parts that no expression can reach are still validated, but the objects
+    that parsing them creates are dropped right away, instead of being kept
+    for the result, which keeps memory usage low.
+    """
+    return _parse_json(text, frozenset((query,) for query in queries))
+
+
+def _parse_json(text: str | Buffer, chains: frozenset[tuple[str, ...]]) -> Any:
+    text = _decode(text)
+    path = _get_path(chains)
+    index = _skip_whitespace(text, 0)
+    data, index = _parse(text, index, path)
+    if _skip_whitespace(text, index) != len(text):
+        raise json.JSONDecodeError("Extra data", text, index)
+    return data
+
+
+class JSONDocument:
+    """A JSON document to pass as the *python_data* of an
+    :class:`~itemloaders.ItemLoader`, which is parsed the first time that
+    loader, or any of its :meth:`nested loaders
+    <itemloaders.ItemLoader.nested_jmes>`, needs it.
+
+    With :attr:`~itemloaders.ItemLoader.defer_rules`, the document is parsed
+    with :func:`parse_json`, only as far as the JMESPath expressions recorded
+    for it by then need. Otherwise, or once loaders use other expressions, the
+    whole document is parsed.
+    """
+
+    def __init__(self, text: str | Buffer):
+        self.text: str | Buffer = text
+        self._data: Any = _UNPARSED
+        # Chains of expressions that the parsed data covers, None for all.
+        self._chains: frozenset[tuple[str, ...]] | None = None
+        # The document to parse, and the expressions to apply to its data to
+        # get the data of this one.
+        self._document: JSONDocument = self
+        self._prefix: tuple[str, ...] = ()
+
+    def prune(self, queries: Iterable[str]) -> None:
+        """Parse the document only as far as the JMESPath expressions
+        *queries* need, unless it has been parsed already."""
+        self._document._prune((*self._prefix, query) for query in queries)
+
+    def get_data(self, queries: Iterable[str] | None = None) -> Any:
+        """Return the data of the document, which is complete enough for the
+        JMESPath expressions *queries*, or complete if *queries* is ``None``,
+        parsing the document if needed.
+
+        The data of a nested document whose part of the document is missing
+        is ``None``."""
+        chains = None
+        if queries is not None:
+            chains = [(*self._prefix, query) for query in queries]
+        data = self._document._get_data(chains)
+        for query in self._prefix:
+            data = _search_result(data, query)
+            if data is None:
+                break
+        return data
+
+    def _prune(self, chains: Iterable[tuple[str, ...]]) -> None:
+        if self._data is _UNPARSED:
+            self._chains = frozenset(chains)
+            self._data = _parse_json(self.text, self._chains)
+
+    def _get_data(self, chains: Iterable[tuple[str, ...]] | None) -> Any:
+        if self._data is _UNPARSED or not (
+            self._chains is None
+            or (chains is not None and self._chains.issuperset(chains))
+        ):
+            self._chains = None
+            self._data = json.loads(_decode(self.text))
+        return self._data
+
+    def _nested(self, query: str) -> JSONDocument:
+        """Return the part of this document that the JMESPath expression
+        *query* selects, as a document that is only parsed when needed."""
+        nested = JSONDocument(self.text)
+        nested._document = self._document
+        nested._prefix = (*self._prefix, query)
+        return nested
+
+
+def _read_file(
+    source: str | os.PathLike[str] | IO[bytes] | io.BufferedIOBase | Buffer,
+) -> tuple[Buffer, mmap.mmap | None]:
+    """Return the bytes of *source*, and the memory map of those bytes, which
+    must be closed once they are no longer needed, if *source* is a file."""
+    if isinstance(source, (str, os.PathLike)):
+        with Path(source).open("rb") as file:
+            return _map_file(file)
+    if _is_mappable(source):
+        return _map_file(source)
+    if isinstance(source, io.IOBase):
+        return source.read(), None
+    return cast("Buffer", source), None
+
+
+def _is_mappable(source: object) -> TypeGuard[IO[bytes]]:
+    """Tell whether *source* reads the bytes of a file as they are, from the
+    start of the file, so that mapping the file gives the same bytes.
+
+    Other file objects, e.g. those of :func:`gzip.open`, or files that were
+    read from already, must be read instead."""
+    if isinstance(source, io.BufferedReader):
+        raw = source.raw
+    elif isinstance(source, io.FileIO):
+        raw = source
+    else:
+        return False
+    try:
+        return isinstance(raw, io.FileIO) and source.tell() == 0
+    except OSError:  # e.g. pipes
+        return False
+
+
+def _map_file(file: IO[bytes]) -> tuple[Buffer, mmap.mmap | None]:
+    fileno = file.fileno()
+    if os.fstat(fileno).st_size == 0:
+        # Empty files cannot be mapped.
+        return b"", None
+    # The map stays valid once the file is closed.
+    mapping = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    return mapping, mapping
+
+
+def _guess_type(body: Buffer) -> str:
+    """Return ``"json"`` if *body* starts like a JSON object or array, or
+    ``"html"`` otherwise."""
+    head = bytes(memoryview(body)[:64])
+    text = head.decode(json.detect_encoding(head), errors="ignore")
+    return "json" if _JSON_START.match(text) else "html"
+
+
+def _parse_markup(
+    body: Buffer,
+    type: str,  # noqa: A002
+    encoding: str | None,
+) -> Selector:
+    """Return a selector of the HTML or XML document *body*, parsed by lxml
+    straight from *body*, with the parser options that parsel uses.
+
+    Without *encoding*, lxml uses the encoding that the byte order mark or the
+    declaration of the document gives, or UTF-8 if there is none.
+    """
+    parser: etree.XMLParser | html.HTMLParser
+    if type == "xml":
+        parser = etree.XMLParser(
+            recover=True, encoding=encoding, huge_tree=True, resolve_entities=False
+        )
+    else:
+        if encoding is None:
+            # The HTML parser of lxml falls back to Latin-1.
+            head = bytes(memoryview(body)[:4096])
+            if read_bom(head)[0] is None and html_body_declared_encoding(head) is None:
+                encoding = "utf-8"
+        parser = html.HTMLParser(recover=True, encoding=encoding, huge_tree=True)
+    root = None
+    if memoryview(body).nbytes:
+        root = etree.fromstring(body, parser=parser)  # type: ignore[call-overload]
+    if root is None:
+        root = etree.fromstring(b"<html/>", parser=parser)
+    return Selector(root=root, type=type)
@@ -0,0 +1,159 @@
+"""
+Compilation of XPath rules into an XSLT stylesheet.
+
+See documentation in :ref:`xslt-rules`.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Any
+
+from lxml import etree
+from parsel import Selector, SelectorList
+
+from itemloaders.cache import _compiles_xpath, _get_xpath_boundaries, _select
+from itemloaders.utils import arg_to_iter
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    from itemloaders import ItemLoader
+
+_XSL = "http://www.w3.org/1999/XSL/Transform"
+_STRING_LITERALS = re.compile(r"'[^']*'|\"[^\"]*\"")
+_NAMESPACE_PREFIX = re.compile(r"(?<!:):(?!:)")
+# Steps whose matches parsel returns as the string value that xsl:value-of
+# also returns: text nodes and attributes.
+_STRING_STEP = re.compile(r"(text\(\)|@[\w.*-]+|attribute::[\w.*-]+)(\[.*\])?")
+
+
+def get_xslt_incompatibility(query: str) -> str | None:
+    """Return why the XPath expression *query* cannot be part of an
+    :class:`XPathStylesheet`, or ``None`` if it can.
+
+    >>> get_xslt_incompatibility('//h1/text()') is None
+    True
+    >>> get_xslt_incompatibility('//h1')  # doctest: +ELLIPSIS
+    'it selects elements or values other than text nodes and attributes, ...'
+    """
+    try:
+        etree.XPath(query)
+    except etree.XPathSyntaxError as exc:
+        return f"it is not a valid XPath expression: {exc}"
+    boundaries = _get_xpath_boundaries(query)
+    if boundaries is None:
+        return (
+            "it is not a plain location path, e.g. it is a union or a function "
+            "call, which this compiler does not translate"
+        )
+    code = _STRING_LITERALS.sub("''", query)
+    if "$" in code:
+        return "it uses XPath variables, which a stylesheet does not get"
+    if _NAMESPACE_PREFIX.search(code):
+        return "it uses namespace prefixes, which a stylesheet does not get"
+    last_step = query[boundaries[-1] :] if boundaries else query
+    if not _STRING_STEP.fullmatch(last_step.lstrip("/")):
+        return (
+            "it selects elements or values other than text nodes and "
+            "attributes, which parsel serializes differently from XSLT"
+        )
+    return None
+
+
+class XPathStylesheet:
+    """XPath rules of several fields, compiled into a single XSLT stylesheet
+    that extracts the strings of all those rules in one pass over a document.
+
+    *rules* maps field names to an XPath expression or an iterable of XPath
+    expressions, as :meth:`ItemLoader.add_xpath
+    <itemloaders.ItemLoader.add_xpath>` would get them. Each expression
+    must select text nodes or attributes, and be a plain location path
+    without XPath variables or namespace prefixes, which
+    :func:`get_xslt_incompatibility` checks. If any expression is not,
+    :exc:`ValueError` is raised with the reason of each of them.
+    """
+
+    def __init__(self, rules: Mapping[str, str | Iterable[str]]):
+        self.rules: dict[str, list[str]] = {
+            field_name: list(arg_to_iter(queries))
+            for field_name, queries in rules.items()
+        }
+        errors = [
+            f"{query!r} of field {field_name!r}: {reason}"
+            for field_name, queries in self.rules.items()
+            for query in queries
+            if (reason := get_xslt_incompatibility(query)) is not None
+        ]
+        if errors:
+            raise ValueError(
+                "Cannot compile XPath rules into XSLT:\n" + "\n".join(errors)
+            )
+        stylesheet = etree.Element(
+            f"{{{_XSL}}}stylesheet", version="1.0", nsmap={"xsl": _XSL}
+        )
+        template = etree.SubElement(stylesheet, f"{{{_XSL}}}template", match="/")
+        result = etree.SubElement(template, "result")
+        # Evaluate rules from the root element, as selectors do.
+        root_element = etree.SubElement(result, f"{{{_XSL}}}for-each", select="/*")
+        for queries in self.rules.values():
+            for query in queries:
+                rule = etree.SubElement(root_element, "rule")
+                matches = etree.SubElement(rule, f"{{{_XSL}}}for-each", select=query)
+                value = etree.SubElement(matches, "value")
+                etree.SubElement(value, f"{{{_XSL}}}value-of", select=".")
+        self.stylesheet: etree._Element = stylesheet
+        # Rules cannot read files or the network.
+        self._transform = etree.XSLT(
+            stylesheet,
+            access_control=etree.XSLTAccessControl.DENY_ALL,  # type: ignore[attr-defined]
+        )
+
+    def _extract_rules(self, selector: Selector | SelectorList[Any]) -> list[list[str]]:
+        """Return the strings of each rule, in the order of :attr:`rules`."""
+        if isinstance(selector, SelectorList):
+            rule_values: list[list[str]] = [
+                [] for queries in self.rules.values() for _ in queries
+            ]
+            for node_selector in selector:
+                for values, node_values in zip(
+                    rule_values, self._extract_rules(node_selector), strict=True
+                ):
+                    values.extend(node_values)
+            return rule_values
+        root = selector.root
+        # A stylesheet is applied to a whole document, so the rules of other
+        # nodes are evaluated one by one.
+        if not _compiles_xpath(selector) or root.getroottree().getroot() is not root:
+            return [
+                _select(selector, "xpath", query).getall()
+                for queries in self.rules.values()
+                for query in queries
+            ]
+        result = self._transform(root).getroot()
+        return [[value.text or "" for value in rule] for rule in result]
+
+    def extract(self, selector: Selector | SelectorList[Any]) -> dict[str, list[str]]:
+        """Return the strings that the rules of each field extract from
+        *selector*, as :meth:`~parsel.selector.Selector.xpath` would."""
+        rule_values = iter(self._extract_rules(selector))
+        return {
+            field_name: [value for _ in queries for value in next(rule_values)]
+            for field_name, queries in self.rules.items()
+        }
+
+    def add_values(self, loader: ItemLoader) -> None:
+        """Add the strings that the rules of each field extract from the
+        selector of *loader* to that field, as calling
+        :meth:`~itemloaders.ItemLoader.add_xpath` with the rules of each field
+        would."""
+        loader._check_selector_method()
+        assert loader.selector is not None
+        rule_values = iter(self._extract_rules(loader.selector))
+        for field_name, queries in self.rules.items():
+            values = []
+            for query in queries:
+                values += loader._track_rule(
+                    field_name, "xpath", query, next(rule_values)
+                )
+            loader.add_value(field_name, values)
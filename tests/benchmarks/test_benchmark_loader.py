@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import json
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any
 
@@ -32,6 +34,31 @@ SELECTOR = Selector(
 
 NAMES = [f" product {index} " for index in range(50)]
 
+LIST_SELECTOR = Selector(
+    text="<ul>"
+    + "".join(
+        f'<li class="product"><h2> product {index} </h2>'
+        f'<span class="price">{index}.50</span><i>foo</i><i>bar</i></li>'
+        for index in range(300)
+    )
+    + "</ul>"
+)
+
+ROW_RULES = {
+    "name": "h2::text",
+    "price": "span.price::text",
+    "tags": "i::text",
+}
+
+JSON_DATA = {
+    "product": {
+        f"attribute_{index}": {"value": f"value {index}", "unit": "cm"}
+        for index in range(50)
+    }
+}
+
+JSON_SELECTOR = Selector(text=json.dumps(JSON_DATA))
+
 
 @dataclass
 class Seller:
@@ -45,6 +72,7 @@ class ProductLoader(ItemLoader):
     description_out = Join()
     tags_out = Identity()
     price_in = MapCompose(str.strip, float)
+    variants_out = MapCompose(str.strip, str.upper)
 
 
 def strip_with_context(value: str, loader_context: dict[str, Any]) -> str:
@@ -55,6 +83,10 @@ class ContextProductLoader(ProductLoader):
     name_in = MapCompose(strip_with_context, str.title)
 
 
+class DeferredProductLoader(ProductLoader):
+    defer_rules = True
+
+
 class DynamicProductLoader(ProductLoader):
     """Loader that builds its processors per instance, so that every item gets
     a different processor object."""
@@ -81,6 +113,62 @@ def test_selector(benchmark: BenchmarkFixture) -> None:
         loader.load_item()
 
 
+def test_rows(benchmark: BenchmarkFixture) -> None:
+    """Load an item from each row of a list page, with a loader per row."""
+
+    @benchmark
+    def factory() -> None:
+        for row in LIST_SELECTOR.css("li.product"):
+            loader = ProductLoader(selector=row)
+            for field_name, css in ROW_RULES.items():
+                loader.add_css(field_name, css)
+            loader.load_item()
+
+
+def test_nested_rows(benchmark: BenchmarkFixture) -> None:
+    """Load the same items with iter_nested_css()."""
+
+    @benchmark
+    def factory() -> None:
+        loader = ProductLoader(selector=LIST_SELECTOR)
+        for _ in loader.iter_nested_css("li.product", ROW_RULES):
+            pass
+
+
+def test_jmes(benchmark: BenchmarkFixture) -> None:
+    """Load an item with many fields out of a JSON API response."""
+
+    @benchmark
+    def factory() -> None:
+        loader = ProductLoader(selector=JSON_SELECTOR)
+        for index in range(50):
+            loader.add_jmes(f"attribute_{index}", f"product.attribute_{index}.value")
+        loader.load_item()
+
+
+def test_deferred_jmes(benchmark: BenchmarkFixture) -> None:
+    """Load the same item with deferred rules, which evaluate all JMESPath
+    expressions together."""
+
+    @benchmark
+    def factory() -> None:
+        loader = DeferredProductLoader(selector=JSON_SELECTOR)
+        for index in range(50):
+            loader.add_jmes(f"attribute_{index}", f"product.attribute_{index}.value")
+        loader.load_item()
+
+
+def test_data_jmes(benchmark: BenchmarkFixture) -> None:
+    """Load the same item out of the Python data of the JSON API response."""
+
+    @benchmark
+    def factory() -> None:
+        loader = ProductLoader(python_data=JSON_DATA)
+        for index in range(50):
+            loader.add_jmes(f"attribute_{index}", f"product.attribute_{index}.value")
+        loader.load_item()
+
+
 def test_values(benchmark: BenchmarkFixture) -> None:
     """Load an item out of already extracted values."""
 
@@ -95,6 +183,41 @@ def test_values(benchmark: BenchmarkFixture) -> None:
         loader.load_item()
 
 
+def test_repeated_load_item(benchmark: BenchmarkFixture) -> None:
+    """Load an item after adding each value, to check intermediate state."""
+
+    @benchmark
+    def factory() -> None:
+        loader = ProductLoader()
+        loader.add_value("name", " a product name ")
+        loader.add_value("variants", NAMES)
+        loader.load_item()
+        loader.add_value("tags", ["foo", "bar", "baz"])
+        loader.load_item()
+        loader.add_value("url", "http://www.example.com/product")
+        loader.load_item()
+        loader.add_value("price", "42.50")
+        loader.load_item()
+
+
+async def title(value: str) -> str:
+    return value.title()
+
+
+class AsyncProductLoader(ProductLoader):
+    name_in = MapCompose(str.strip, title)
+
+
+def test_aload_item(benchmark: BenchmarkFixture) -> None:
+    """Load a field with many values that a coroutine function processes."""
+
+    @benchmark
+    def factory() -> None:
+        loader = AsyncProductLoader()
+        loader.add_value("name", NAMES)
+        asyncio.run(loader.aload_item())
+
+
 def test_many_values(benchmark: BenchmarkFixture) -> None:
     """Load a field with as many values as a listing page can yield."""
 
@@ -105,6 +228,28 @@ def test_many_values(benchmark: BenchmarkFixture) -> None:
         loader.load_item()
 
 
+def test_initial_values(benchmark: BenchmarkFixture) -> None:
+    """Add two fields to an item that already has many fields."""
+    item = {f"attribute_{index}": [f"value {index}"] for index in range(80)}
+
+    @benchmark
+    def factory() -> None:
+        loader = ItemLoader(item=dict(item))
+        loader.add_value("attribute_0", "another value")
+        loader.add_value("price", "42.50")
+        loader.load_item()
+
+
+def test_regex(benchmark: BenchmarkFixture) -> None:
+    """Load a field with values that a regular expression extracts data from."""
+
+    @benchmark
+    def factory() -> None:
+        loader = ProductLoader()
+        loader.add_value("name", NAMES, re=r"product (\d+)")
+        loader.load_item()
+
+
 def test_loader_context(benchmark: BenchmarkFixture) -> None:
     """Load a field whose processor takes the loader context."""
 
@@ -135,3 +280,44 @@ def test_nested_items(benchmark: BenchmarkFixture) -> None:
         loader.add_value("brand", {"name": "Foo", "url": "http://www.example.com/foo"})
         loader.add_value("seller", Seller(name="Bar"))
         loader.load_item()
+
+
+def test_nested_loaders(benchmark: BenchmarkFixture) -> None:
+    """Add values through nested loaders a few levels deep."""
+
+    @benchmark
+    def factory() -> None:
+        loader = ProductLoader(selector=SELECTOR)
+        nested_loader = loader.nested_css("body").nested_css("ul").nested_css("li")
+        for name in NAMES:
+            nested_loader.add_value("tags", name)
+        loader.load_item()
+
+
+def test_variants(benchmark: BenchmarkFixture) -> None:
+    """Load 20 variants of a product, running the shared rules for each."""
+
+    @benchmark
+    def factory() -> None:
+        for index in range(20):
+            loader = ProductLoader(selector=SELECTOR)
+            loader.add_css("name", "h1.name::text")
+            loader.add_css("description", "#description p::text")
+            loader.add_css("tags", "ul.tags li::text")
+            loader.add_value("sku", index)
+            loader.load_item()
+
+
+def test_forked_variants(benchmark: BenchmarkFixture) -> None:
+    """Load the same variants from forks of a loader of the shared rules."""
+
+    @benchmark
+    def factory() -> None:
+        loader = ProductLoader(selector=SELECTOR)
+        loader.add_css("name", "h1.name::text")
+        loader.add_css("description", "#description p::text")
+        loader.add_css("tags", "ul.tags li::text")
+        for index in range(20):
+            variant_loader = loader.fork()
+            variant_loader.add_value("sku", index)
+            variant_loader.load_item()
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from itemloaders.processors import Compose, MapCompose
+
+if TYPE_CHECKING:
+    from pytest_codspeed import BenchmarkFixture
+
+# Each round calls the processor this many times, so that the measurement
+# reflects the processor itself rather than the benchmark call overhead.
+CALLS_PER_ROUND = 100
+
+VALUES = [f" Product {index} " for index in range(20)]
+
+
+def _none_if_empty(value: str) -> str | None:
+    return value or None
+
+
+MAP_COMPOSE = MapCompose(str.strip, str.lower, str.title, _none_if_empty)
+COMPOSE = Compose(" ".join, str.strip, str.lower, str.title)
+
+CASES: dict[str, Any] = {
+    "map_compose": MAP_COMPOSE,
+    "map_compose_compiled": MAP_COMPOSE.compile(),
+    "compose": COMPOSE,
+    "compose_compiled": COMPOSE.compile(),
+}
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_processor(benchmark: BenchmarkFixture, case: str) -> None:
+    processor = CASES[case]
+
+    @benchmark
+    def factory() -> None:
+        for _ in range(CALLS_PER_ROUND):
+            processor(VALUES)
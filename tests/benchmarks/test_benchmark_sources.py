@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import jmespath
+
+from itemloaders.sources import parse_json
+
+if TYPE_CHECKING:
+    from pytest_codspeed import BenchmarkFixture
+
+TEXT = json.dumps(
+    {
+        "meta": {"name": "feed", "count": 1000},
+        "items": [
+            {
+                "name": f"Product {i}",
+                "description": "A product description. " * 20,
+                "price": {"amount": i, "currency": "USD"},
+                "tags": ["foo", "bar", "baz"],
+                "reviews": [{"author": "a", "text": "Great!" * 10}] * 5,
+            }
+            for i in range(1000)
+        ],
+    }
+)
+
+QUERIES = ["meta.name"]
+
+
+def test_json_loads(benchmark: BenchmarkFixture) -> None:
+    """Parse a whole feed to get its name."""
+
+    @benchmark
+    def factory() -> None:
+        jmespath.search("meta.name", json.loads(TEXT))
+
+
+def test_parse_json(benchmark: BenchmarkFixture) -> None:
+    """Parse only the name of the feed."""
+
+    @benchmark
+    def factory() -> None:
+        jmespath.search("meta.name", parse_json(TEXT, QUERIES))
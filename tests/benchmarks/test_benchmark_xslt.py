@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from parsel import Selector
+
+from itemloaders import ItemLoader
+from itemloaders.processors import TakeFirst
+from itemloaders.xslt import XPathStylesheet
+
+if TYPE_CHECKING:
+    from pytest_codspeed import BenchmarkFixture
+
+SELECTOR = Selector(
+    text="""
+    <html>
+    <body>
+        <h1 class="name">A product name</h1>
+        <div id="description"><p>First paragraph.</p><p>Second paragraph.</p></div>
+        <ul class="tags"><li>foo</li><li>bar</li><li>baz</li></ul>
+        <a class="url" href="http://www.example.com/product">Product</a>
+        <span class="price">42.50</span>
+        <span class="currency">USD</span>
+        <span class="stock">In stock</span>
+        <img class="image" src="/product.png" alt="Product">
+    </body>
+    </html>
+    """
+)
+
+RULES = {
+    "name": "//h1[@class='name']/text()",
+    "description": "//div[@id='description']/p/text()",
+    "tags": "//ul[@class='tags']/li/text()",
+    "url": "//a[@class='url']/@href",
+    "price": "//span[@class='price']/text()",
+    "currency": "//span[@class='currency']/text()",
+    "stock": "//span[@class='stock']/text()",
+    "image": "//img[@class='image']/@src",
+    "image_alt": "//img[@class='image']/@alt",
+}
+
+STYLESHEET = XPathStylesheet(RULES)
+
+
+class ProductLoader(ItemLoader):
+    default_output_processor = TakeFirst()
+
+
+def test_rules(benchmark: BenchmarkFixture) -> None:
+    """Load an item with an XPath rule per field, one rule at a time."""
+
+    @benchmark
+    def factory() -> None:
+        loader = ProductLoader(selector=SELECTOR)
+        for field_name, query in RULES.items():
+            loader.add_xpath(field_name, query)
+        loader.load_item()
+
+
+def test_stylesheet(benchmark: BenchmarkFixture) -> None:
+    """Load an item with the same rules compiled into a single stylesheet."""
+
+    @benchmark
+    def factory() -> None:
+        loader = ProductLoader(selector=SELECTOR)
+        STYLESHEET.add_values(loader)
+        loader.load_item()
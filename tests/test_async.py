@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import asyncio
+import gc
+import warnings
+from typing import Any
+
+import pytest
+
+from itemloaders import ItemLoader
+from itemloaders.common import is_async
+from itemloaders.processors import Compose, Join, MapCompose, TakeFirst
+
+
+async def upper(value: str) -> str:
+    await asyncio.sleep(0)
+    return value.upper()
+
+
+async def split(value: str) -> list[str]:
+    await asyncio.sleep(0)
+    return value.split()
+
+
+async def fail(value: Any) -> Any:
+    raise ZeroDivisionError("boom")
+
+
+def run(awaitable: Any) -> Any:
+    return asyncio.run(awaitable)
+
+
+class AsyncUpper:
+    async def __call__(self, value: str) -> str:
+        return await upper(value)
+
+
+def test_is_async():
+    assert is_async(upper)
+    assert is_async(AsyncUpper())
+    assert is_async(MapCompose(str.strip, Compose(upper)))
+    assert not is_async(str.upper)
+    assert not is_async(MapCompose(str.strip, Compose(TakeFirst())))
+
+
+def test_map_compose():
+    proc = MapCompose(str.strip, split, AsyncUpper(), lambda v: v + "!")
+    result = proc([" a b ", "c"])
+    assert run(result) == ["A!", "B!", "C!"]
+    assert MapCompose(str.strip, str.upper)([" a "]) == ["A"]
+
+
+def test_map_compose_concurrency():
+    running = 0
+    peak = 0
+
+    async def track(value: str) -> str:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0)
+        running -= 1
+        return value
+
+    assert run(MapCompose(track)(["a", "b", "c"])) == ["a", "b", "c"]
+    assert peak == 3
+
+
+def test_compose():
+    proc = Compose(TakeFirst(), upper, lambda v: v + "!")
+    assert run(proc(["a", "b"])) == "A!"
+    proc = Compose(TakeFirst(), upper)
+    assert run(proc([None])) is None
+
+
+def test_errors():
+    with pytest.raises(
+        ValueError, match=r"Error in MapCompose .* error='ZeroDivisionError"
+    ):
+        run(MapCompose(fail)(["a"]))
+    with pytest.raises(
+        ValueError, match=r"Error in Compose .* error='ZeroDivisionError"
+    ):
+        run(Compose(fail)(["a"]))
+    with pytest.raises(ValueError, match="Cannot compile a MapCompose"):
+        MapCompose(upper).compile()
+
+
+class AsyncLoader(ItemLoader):
+    default_output_processor = TakeFirst()
+    name_in = MapCompose(str.strip, upper)
+    tags_in = MapCompose(split)
+    tags_out = Compose(Join(), upper)
+
+
+def test_aload_item():
+    loader = AsyncLoader()
+    loader.add_value("name", " foo ")
+    loader.add_value("tags", ["a b", "c"])
+    loader.add_value("url", "http://example.com")
+    assert run(loader.aload_item()) == {
+        "name": "FOO",
+        "tags": "A B C",
+        "url": "http://example.com",
+    }
+    assert loader.get_collected_values("tags") == ["a", "b", "c"]
+    assert run(loader.aload_item(["name"])) == {
+        "name": "FOO",
+        "tags": "A B C",
+        "url": "http://example.com",
+    }
+
+
+def test_aload_item_fork():
+    loader = AsyncLoader()
+    loader.add_value("tags", "a b")
+    fork = loader.fork()
+    fork.add_value("name", "foo")
+    assert run(loader.aload_item()) == {"tags": "A B"}
+    assert run(fork.aload_item()) == {"name": "FOO", "tags": "A B"}
+
+
+def test_aload_item_output_error():
+    class FailingLoader(ItemLoader):
+        default_output_processor = Compose(fail)
+
+    loader = FailingLoader()
+    loader.add_value("name", "foo")
+    with pytest.raises(ValueError, match="Error with output processor: field='name'"):
+        run(loader.aload_item())
+
+
+async def upper_all(values: list[str]) -> list[str]:
+    return [await upper(value) for value in values]
+
+
+async def take_last(values: list[str]) -> str:
+    return values[-1]
+
+
+def test_aload_item_coroutine_functions():
+    class CoroutineLoader(ItemLoader):
+        name_in = upper_all
+        name_out = take_last
+
+    loader = CoroutineLoader()
+    loader.add_value("name", ["foo", "bar"])
+    assert run(loader.aload_item()) == {"name": "BAR"}
+
+
+@pytest.mark.parametrize(
+    "method", ["load_item", "get_output_value", "get_collected_values"]
+)
+def test_sync_methods_async_input(method):
+    loader = AsyncLoader()
+    loader.add_value("name", "foo")
+    loader.add_value("url", "http://example.com")
+    args = () if method == "load_item" else ("name",)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        with pytest.raises(
+            RuntimeError,
+            match=rf"input processor of field 'name' .* instead of {method}",
+        ):
+            getattr(loader, method)(*args)
+        gc.collect()
+    # The awaitables are closed, and dropped from the collected values.
+    assert not caught
+    assert loader.get_collected_values("name") == []
+    loader.add_value("name", "foo")
+    assert run(loader.aload_item()) == {"name": "FOO", "url": "http://example.com"}
+    assert loader.get_output_value("name") == "FOO"
+    assert loader.load_item() == {"name": "FOO", "url": "http://example.com"}
+
+
+@pytest.mark.parametrize("method", ["load_item", "get_output_value"])
+def test_sync_methods_async_output(method):
+    class AsyncOutputLoader(ItemLoader):
+        name_out = Compose(TakeFirst(), upper)
+
+    loader = AsyncOutputLoader()
+    loader.add_value("name", "foo")
+    args = () if method == "load_item" else ("name",)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        with pytest.raises(
+            RuntimeError,
+            match=rf"output processor of field 'name' .* instead of {method}",
+        ):
+            getattr(loader, method)(*args)
+        gc.collect()
+    assert not caught
+    assert run(loader.aload_item()) == {"name": "FOO"}
+
+
+def test_stop_on_first_value():
+    loader = AsyncLoader(stop_on_first_value=True)
+    loader.add_value("name", "foo")
+    loader.add_value("name", "bar")
+    assert run(loader.aload_item()) == {"name": "FOO"}
+    assert loader.get_collected_values("name") == ["FOO", "BAR"]
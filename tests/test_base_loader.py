@@ -1,7 +1,11 @@
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
 from functools import partial
 from typing import Any
 
 import pytest
+from parsel.utils import extract_regex, flatten
 
 from itemloaders import ItemLoader
 from itemloaders.processors import Compose, Identity, Join, MapCompose, TakeFirst
@@ -155,6 +159,36 @@ class TestItemLoaderBasic:
         il.replace_value("name", "name:bar", re="name:(.*)$")
         assert il.get_collected_values("name") == ["bar"]
 
+    @pytest.mark.parametrize(
+        "regex",
+        [
+            r"\d+",
+            r"(\d+)",
+            r"(\w)(\d)",
+            r"(?P<extract>\d+)|none",
+            r"(?P<extract>\d)?x",
+            r"&\w+;|\d",
+        ],
+    )
+    def test_get_value_regex(self, regex):
+        values = ["a1 b22", "x", "", "c333 &amp; &lt; &quot; 4", "no match"]
+        expected = flatten(extract_regex(regex, value) for value in values)
+        il = ItemLoader()
+        assert il.get_value(values, re=regex) == expected
+        assert il.get_value(values, re=re.compile(regex)) == expected
+
+    def test_get_value_regex_cache(self):
+        class RegexItemLoader(ItemLoader):
+            pass
+
+        il = RegexItemLoader()
+        il.add_value("name", "name:foo", re="name:(.*)$")
+        il.add_value("name", "name:bar", re="name:(.*)$")
+        assert il.get_collected_values("name") == ["foo", "bar"]
+        assert list(RegexItemLoader._patterns) == ["name:(.*)$"]
+        pattern = RegexItemLoader._patterns["name:(.*)$"]
+        assert RegexItemLoader._get_pattern("name:(.*)$") is pattern
+
     def test_iter_on_input_processor_input(self):
         class NameFirstItemLoader(ItemLoader):
             name_in = TakeFirst()
@@ -365,6 +399,46 @@ class TestItemLoaderBasic:
         il.replace_value("url", "text2")
         assert il.get_output_value("url") == ["val"]
 
+    def test_loader_context_on_replace(self):
+        class ChildItemLoader(CustomItemLoader):
+            url_in = MapCompose(processor_with_args)
+            url_out = Compose(processor_with_args)
+
+        il = ChildItemLoader(key="val")
+        il.add_value("url", "text")
+        assert il.get_output_value("url") == "val"
+        il.context = {"key": "val2"}
+        il.replace_value("url", "text2")
+        assert il.get_collected_values("url") == ["val2"]
+        assert il.get_output_value("url") == "val2"
+        il.context = {}
+        il.replace_value("url", "text3")
+        assert il.get_output_value("url") == ["text3"]
+
+    def test_loader_context_processors_released(self):
+        class ChildItemLoader(CustomItemLoader):
+            url_in = MapCompose(processor_with_args)
+
+        il = ChildItemLoader(key="val")
+        procs = []
+        for value in ("a", "b"):
+            proc = MapCompose(processor_with_args)
+            procs.append(proc)
+            il.add_value("name", value, proc)
+            il.url_in = MapCompose(processor_with_args)
+            procs.append(il.url_in)
+            il.add_value("url", value)
+        assert il.get_collected_values("name") == ["Val", "Val"]
+        assert il.get_collected_values("url") == ["val", "val"]
+        bound = [entry[0] for entry in il._bound_processors.values()]
+        assert len(bound) == 2
+        assert [any(proc is b for b in bound) for proc in procs] == [
+            False,
+            False,
+            False,
+            True,
+        ]
+
     def test_item_passed_to_input_processor_functions(self):
         def processor(value, loader_context):
             return loader_context["item"]["name"]
@@ -459,6 +533,223 @@ class TestItemLoaderBasic:
         assert loader.load_item() == {}
 
 
+class TestProcessorResolution:
+    def test_class_attribute_change(self):
+        class ChildItemLoader(CustomItemLoader):
+            pass
+
+        il = ChildItemLoader()
+        il.add_value("name", "marta")
+        assert il.get_output_value("name") == ["Marta"]
+
+        CustomItemLoader.name_in = MapCompose(str.upper)
+        try:
+            il = ChildItemLoader()
+            il.add_value("name", "marta")
+            assert il.get_output_value("name") == ["MARTA"]
+        finally:
+            CustomItemLoader.name_in = MapCompose(lambda v: v.title())
+
+    def test_default_processor_change(self):
+        class ChildItemLoader(ItemLoader):
+            pass
+
+        il = ChildItemLoader()
+        il.add_value("name", "marta")
+        assert il.get_output_value("name") == ["marta"]
+
+        ChildItemLoader.default_output_processor = TakeFirst()
+        assert il.get_output_value("name") == "marta"
+        del ChildItemLoader.default_output_processor
+        assert il.get_output_value("name") == ["marta"]
+
+    def test_instance_attribute(self):
+        il = CustomItemLoader()
+        il.name_in = MapCompose(str.upper)
+        il.add_value("name", "marta")
+        assert il.get_output_value("name") == ["MARTA"]
+
+        il = CustomItemLoader()
+        il.default_output_processor = TakeFirst()
+        il.add_value("name", "marta")
+        assert il.get_output_value("name") == "Marta"
+
+    def test_functions_change(self):
+        class FunctionsItemLoader(ItemLoader):
+            name_in = MapCompose(str.strip, str.title)
+
+        il = FunctionsItemLoader()
+        il.add_value("name", " marta ")
+        FunctionsItemLoader.name_in.functions = (str.strip, str.upper)
+        il.add_value("name", " marta ")
+        assert il.get_output_value("name") == ["Marta", "MARTA"]
+
+    def test_abc_subclass(self):
+        class ABCItemLoader(ItemLoader, ABC):
+            @abstractmethod
+            def get_suffix(self) -> str:
+                pass
+
+        class SuffixItemLoader(ABCItemLoader):
+            name_in = MapCompose(str.title)
+
+            def get_suffix(self) -> str:
+                return "!"
+
+        with pytest.raises(TypeError):
+            ABCItemLoader()  # type: ignore[abstract]
+        il = SuffixItemLoader()
+        il.add_value("name", "marta")
+        assert il.get_output_value("name") == ["Marta"]
+        SuffixItemLoader.name_in = MapCompose(str.upper)
+        il.add_value("name", "marta")
+        assert il.get_output_value("name") == ["Marta", "MARTA"]
+
+    def test_method(self):
+        class MethodItemLoader(ItemLoader):
+            suffix = "!"
+
+            def name_in(self, values):
+                return [value + self.suffix for value in values]
+
+        il = MethodItemLoader()
+        il.add_value("name", "marta")
+        assert il.get_output_value("name") == ["marta!"]
+
+        il = MethodItemLoader()
+        il.suffix = "?"
+        il.add_value("name", "marta")
+        assert il.get_output_value("name") == ["marta?"]
+
+    def test_simplified_processors(self):
+        class SimplifiedItemLoader(ItemLoader):
+            name_in = MapCompose(str.strip, str.title)
+            name_out = Compose(TakeFirst(), Identity())
+            url_out = Compose(Identity())
+
+        il = SimplifiedItemLoader()
+        input_processor = il._get_input_processor("name")
+        assert isinstance(input_processor, MapCompose)
+        assert len(input_processor.functions) == 1
+        output_processor = il._get_output_processor("name")
+        assert isinstance(output_processor, Compose)
+        assert output_processor.functions == (
+            SimplifiedItemLoader.name_out.functions[0],
+        )
+        assert isinstance(il._get_output_processor("url"), Identity)
+        assert il.get_input_processor("name") is SimplifiedItemLoader.name_in
+        assert il.get_output_processor("name") is SimplifiedItemLoader.name_out
+        assert il.get_output_processor("url") is SimplifiedItemLoader.url_out
+        il.add_value("name", [" marta ", "other"])
+        il.add_value("url", ["http://scrapy.org"])
+        assert il.load_item() == {"name": "Marta", "url": ["http://scrapy.org"]}
+
+    def test_processor_getters_overridden(self):
+        class GetterItemLoader(ItemLoader):
+            name_in = MapCompose(str.strip, Identity())
+            name_out = Compose(TakeFirst(), Identity())
+
+            def get_input_processor(self, field_name):
+                return MapCompose(str.upper)
+
+            def get_output_processor(self, field_name):
+                return Join()
+
+        il = GetterItemLoader()
+        il.add_value("name", [" marta ", "other"])
+        assert il.load_item() == {"name": " MARTA  OTHER"}
+
+    def test_field_metadata(self):
+        @dataclass
+        class Person:
+            name: Any = field(default=None, metadata={"output_processor": TakeFirst()})
+            age: Any = None
+
+        class PersonLoader(ItemLoader):
+            default_item_class = Person
+            age_out = TakeFirst()
+
+        il = PersonLoader()
+        il.add_value("name", ["marta", "other"])
+        il.add_value("age", ["20", "30"])
+        assert il.load_item() == Person(name="marta", age="20")
+
+        # The same loader class with a different item class
+        il = PersonLoader(item={})
+        il.add_value("name", ["marta", "other"])
+        assert il.load_item() == {"name": ["marta", "other"]}
+
+
+@dataclass
+class DataclassItem:
+    name: Any = None
+
+
+@dataclass
+class PairItem:
+    name: Any = None
+    other: Any = None
+
+
+class SummaryItemLoader(ItemLoader):
+    summary_in = Identity()
+    summary_out = Identity()
+
+
+class TestItemTypes:
+    def test_dataclass(self):
+        item = DataclassItem()
+        il = SummaryItemLoader(item=item)
+        il.add_value("name", "marta")
+        assert il.load_item() is item
+        assert item == DataclassItem(name=["marta"])
+
+        il.add_value("summary", "lala")
+        with pytest.raises(KeyError, match="does not support field: summary"):
+            il.load_item()
+
+    def test_attrs(self):
+        try:
+            import attr  # noqa: PLC0415
+        except ImportError:
+            pytest.skip("Cannot import attr")
+
+        @attr.s
+        class AttrsItem:
+            name = attr.ib(default=None)
+
+        item = AttrsItem()
+        il = SummaryItemLoader(item=item)
+        il.add_value("name", "marta")
+        assert il.load_item() is item
+        assert item == AttrsItem(name=["marta"])
+
+        il.add_value("summary", "lala")
+        with pytest.raises(KeyError, match="does not support field: summary"):
+            il.load_item()
+
+    def test_dict_subclass(self):
+        class CustomDict(dict[str, Any]):
+            pass
+
+        item = CustomDict()
+        il = ItemLoader(item=item)
+        il.add_value("name", "marta")
+        assert il.load_item() is item
+        assert item == {"name": ["marta"]}
+
+    def test_shared_adapter(self):
+        il = ItemLoader(item=DataclassItem(name="marta"))
+        nl = ItemLoader(item=il.item, parent=il)
+        assert nl._adapter is il._adapter
+        assert il._adapter.item is il.item
+
+    def test_nested_loader_item(self):
+        il = ItemLoader(item=PairItem(name="root"))
+        ItemLoader(item=PairItem(other="child"), parent=il)
+        assert il.load_item() == PairItem(name=["root"], other=["child"])
+
+
 class BaseNoInputReprocessingLoader(ItemLoader):
     title_in = MapCompose(str.upper)
     title_out = TakeFirst()
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import multiprocessing
+from dataclasses import dataclass, field
+from typing import Any
+
+import pytest
+
+from itemloaders import ItemLoader
+from itemloaders.batch import load_items, warm_up
+from itemloaders.processors import MapCompose, TakeFirst
+
+
+@dataclass
+class Product:
+    name: Any = None
+    price: Any = None
+    tags: list[str] = field(default_factory=list)
+
+
+class ProductLoader(ItemLoader):
+    default_item_class = Product
+    default_output_processor = TakeFirst()
+    name_in = MapCompose(str.strip)
+
+
+class DictLoader(ItemLoader):
+    pass
+
+
+def populate(loader: ItemLoader) -> None:
+    loader.add_css("name", "h1::text")
+    loader.add_css("price", ".price::text")
+
+
+def fail(loader: ItemLoader) -> None:
+    raise ZeroDivisionError("boom")
+
+
+def page(index: int) -> bytes:
+    return f"<h1> Product {index} </h1><p class='price'>{index}</p>".encode()
+
+
+def test_load_items(tmp_path):
+    path = tmp_path / "page.html"
+    path.write_bytes(page(0))
+    jobs = [(path, ProductLoader)] + [
+        (page(index), ProductLoader) for index in range(1, 20)
+    ]
+    items = list(load_items(jobs, populate, max_workers=2, max_pending=2))
+    assert items == [
+        Product(name=f"Product {index}", price=str(index)) for index in range(20)
+    ]
+
+
+def test_load_items_unordered():
+    jobs = [
+        (page(index), ProductLoader if index % 2 else DictLoader) for index in range(20)
+    ]
+    items = load_items(jobs, populate, max_workers=2, chunksize=3, ordered=False)
+    names = sorted(
+        item.name if isinstance(item, Product) else item["name"][0].strip()
+        for item in items
+    )
+    assert names == sorted(f"Product {index}" for index in range(20))
+
+
+@pytest.mark.parametrize("method", ["fork", "spawn"])
+def test_load_items_start_method(method):
+    if method not in multiprocessing.get_all_start_methods():
+        pytest.skip(f"The {method} start method is not available")
+    jobs = [(page(index), ProductLoader) for index in range(3)]
+    items = load_items(
+        jobs, populate, max_workers=1, mp_context=multiprocessing.get_context(method)
+    )
+    assert [item.name for item in items] == ["Product 0", "Product 1", "Product 2"]
+
+
+def test_load_items_errors():
+    with pytest.raises(ZeroDivisionError, match="boom"):
+        list(load_items([(page(0), ProductLoader)], fail, max_workers=1))
+    with pytest.raises(ValueError, match="chunksize"):
+        list(load_items([], populate, chunksize=0))
+
+
+def test_warm_up(monkeypatch):
+    monkeypatch.setattr(ProductLoader, "_processor_tables", {})
+    warm_up(ProductLoader)
+    assert set(ProductLoader._processor_tables[Product]) == {"name", "price", "tags"}
+
+
+class ArgumentLoader(ProductLoader):
+    unknown_in = MapCompose(str.strip)
+
+    def __init__(self, source: str, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.source = source
+
+
+def test_warm_up_without_loader():
+    warm_up(ArgumentLoader)
+    assert set(ArgumentLoader._processor_tables[Product]) == {"name", "price", "tags"}
+    loader = ArgumentLoader("feed")
+    assert (
+        loader.get_input_processor("name")
+        is ArgumentLoader._processor_tables[Product]["name"].input_processor
+    )
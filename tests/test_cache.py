@@ -0,0 +1,351 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import jmespath
+import pytest
+from parsel import Selector
+
+from itemloaders import ItemLoader, cache
+from itemloaders.cache import (
+    ExtractionCache,
+    _get_xpath_prefixes,
+    _getall_each,
+    _select,
+    find_shared_xpath_prefixes,
+    set_compiled_cache_size,
+)
+
+html_selector = Selector(
+    text="""
+<html>
+<body>
+<div id="a" class="item"><p>first</p><a href="/1">one</a></div>
+<div id="b" class="item"><p>second</p><a href="/2">two</a></div>
+</body>
+</html>
+"""
+)
+xml_selector = Selector(
+    text="""<?xml version="1.0"?>
+<root xmlns:g="http://base.google.com/ns/1.0">
+<g:price>10</g:price>
+<item>one</item>
+</root>
+""",
+    type="xml",
+)
+
+
+@pytest.fixture
+def small_cache():
+    set_compiled_cache_size(2)
+    yield
+    set_compiled_cache_size(cache.DEFAULT_COMPILED_CACHE_SIZE)
+
+
+@pytest.mark.parametrize(
+    ("query", "kw"),
+    [
+        ("//p/text()", {}),
+        ("//div", {}),
+        ("//a/@href", {}),
+        ("count(//div)", {}),
+        ("boolean(//div)", {}),
+        ("string(//p)", {}),
+        ("//div[@id=$id]/p/text()", {"id": "b"}),
+        ("//p[re:test(text(), '^f')]/text()", {}),
+        ("//span", {}),
+    ],
+)
+def test_xpath(query, kw):
+    expected = html_selector.xpath(query, **kw)
+    result = _select(html_selector, "xpath", query, **kw)
+    assert result.getall() == expected.getall()
+    assert [match.type for match in result] == [match.type for match in expected]
+    nested_result = _select(result, "xpath", "./text()")
+    assert nested_result.getall() == expected.xpath("./text()").getall()
+
+
+def test_xpath_namespaces():
+    xml_selector.register_namespace("g", "http://base.google.com/ns/1.0")
+    assert _select(xml_selector, "xpath", "//g:price/text()").getall() == ["10"]
+    assert _select(xml_selector, "xpath", "//item/text()").getall() == ["one"]
+
+
+@pytest.mark.parametrize("extraction_cache", [None, ExtractionCache()])
+@pytest.mark.parametrize("defer_rules", [False, True])
+def test_xpath_namespaces_argument(extraction_cache, defer_rules):
+    selector = Selector(
+        text='<root xmlns:g="urn:g" xmlns:h="urn:h"><g:a>10</g:a><h:a>20</h:a></root>',
+        type="xml",
+    )
+    loader = ItemLoader(
+        selector=selector, extraction_cache=extraction_cache, defer_rules=defer_rules
+    )
+    assert loader.get_xpath("//x:a/text()", namespaces={"x": "urn:g"}) == ["10"]
+    assert loader.get_xpath("//x:a/text()", namespaces={"x": "urn:h"}) == ["20"]
+    loader.add_xpath("g", "//x:a/text()", namespaces={"x": "urn:g"})
+    loader.add_xpath("h", "//x:a/text()", namespaces={"x": "urn:h"})
+    assert loader.load_item() == {"g": ["10"], "h": ["20"]}
+    query, namespaces = "//x:a", {"x": "urn:h"}
+    expected = selector.xpath(query, namespaces=namespaces)
+    result = _select(selector, "xpath", query, namespaces=namespaces)
+    assert result.getall() == expected.getall()
+    assert result[0].namespaces == expected[0].namespaces
+
+
+def test_xpath_error():
+    with pytest.raises(ValueError, match="XPath error"):
+        _select(html_selector, "xpath", "//p[")
+    with pytest.raises(ValueError, match="XPath error"):
+        _select(html_selector, "xpath", "//p[@id=$id]")
+
+
+@pytest.mark.parametrize("query", ["p::text", "div.item > a::attr(href)", "#b"])
+def test_css(query):
+    assert (
+        _select(html_selector, "css", query).getall()
+        == html_selector.css(query).getall()
+    )
+
+
+def test_css_xml():
+    assert _select(xml_selector, "css", "item::text").getall() == ["one"]
+
+
+def test_jmespath():
+    selector = Selector(text='{"a": {"b": ["x", {"c": 1}]}, "d": null}')
+    for query in ("a.b", "a.b[0]", "a.b[1].c", "d", "e"):
+        assert (
+            _select(selector, "jmes", query).getall()
+            == selector.jmespath(query).getall()
+        )
+
+
+@pytest.mark.parametrize("text", ['"abc"', '"[1, 2]"', '"{\\"a\\": 1}"'])
+def test_jmespath_string_root(text):
+    selector = Selector(text=text, type="json")
+    for query in ("@", "a", "[0]"):
+        assert (
+            _select(selector, "jmes", query).getall()
+            == selector.jmespath(query).getall()
+        )
+
+
+@pytest.mark.parametrize(
+    ("rule_type", "rule"),
+    [
+        ("xpath", "p/text()"),
+        ("xpath", "a/@href"),
+        ("xpath", "p"),
+        ("xpath", "count(p)"),
+        ("xpath", "boolean(span)"),
+        ("xpath", "string(a)"),
+        ("css", "a::attr(href)"),
+        ("css", "p"),
+    ],
+)
+def test_getall_each(rule_type, rule):
+    rows = html_selector.css("div")
+    assert _getall_each(rows, rule_type, rule) == [
+        getattr(row, rule_type)(rule).getall() for row in rows
+    ]
+
+
+def test_getall_each_fallback():
+    xml_selector.register_namespace("g", "http://base.google.com/ns/1.0")
+    rows = xml_selector.xpath("/root")
+    assert _getall_each(rows, "xpath", "g:price/text()") == [["10"]]
+    assert _getall_each([], "xpath", "p") == []
+    mixed_rows = [html_selector, xml_selector]
+    assert _getall_each(mixed_rows, "css", "item::text") == [[], ["one"]]
+    with pytest.raises(ValueError, match="XPath error"):
+        _getall_each(html_selector.css("div"), "xpath", "p[")
+
+
+def test_subclass():
+    class CustomSelector(Selector):
+        def xpath(self, query, namespaces=None, **kwargs):
+            return super().xpath("//a/text()")
+
+    selector = CustomSelector(text="<p>p</p><a>a</a>")
+    assert _select(selector, "xpath", "//p/text()").getall() == ["a"]
+
+
+def test_set_compiled_cache_size(small_cache):
+    for query in ("//p", "//a", "//div"):
+        _select(html_selector, "xpath", query)
+        _select(html_selector, "css", query[2:])
+    assert cache._cached_compile_xpath.cache_info().currsize == 2
+    assert cache._cached_translate_css.cache_info().currsize == 2
+
+
+def test_threads():
+    queries = [f"//div[{i % 3}]/p/text()" for i in range(300)]
+    with ThreadPoolExecutor(4) as executor:
+        results = list(
+            executor.map(
+                lambda query: _select(html_selector, "xpath", query).getall(),
+                queries,
+            )
+        )
+    assert results == [html_selector.xpath(query).getall() for query in queries]
+
+
+@pytest.mark.parametrize(
+    ("query", "prefixes"),
+    [
+        ("//div//p/text()", ["//div", "//div//p"]),
+        ("/html/body", ["/html"]),
+        ("//a/@*", ["//a"]),
+        ("div/p", ["div"]),
+        (".//div[@id='a/b']/p[2]", [".", ".//div[@id='a/b']"]),
+        (
+            "//div[p/text() = 'x']/*/@id",
+            ["//div[p/text() = 'x']", "//div[p/text() = 'x']/*"],
+        ),
+        ("descendant::g:price/text()", ["descendant::g:price"]),
+        ("//processing-instruction('x')/..", ["//processing-instruction('x')"]),
+        ("//p", []),
+        ("//div/p | //a", []),
+        ("count(//div/p)", []),
+        ("(//div/p)[1]", []),
+        ("//div/p = 'x'", []),
+        ("//div/p*2", []),
+        ("$nodes/p", []),
+        ("'a/b'", []),
+        ("//div/", []),
+        ("//div[/p", []),
+    ],
+)
+def test_xpath_prefixes(query, prefixes):
+    assert _get_xpath_prefixes(query) == prefixes
+
+
+def test_find_shared_xpath_prefixes():
+    assert find_shared_xpath_prefixes(["//div//p/text()", "//div//a/@href"]) == {
+        "//div": ["//div//p/text()", "//div//a/@href"],
+    }
+    assert find_shared_xpath_prefixes(["//div//p", "//div//p", "//a/b"]) == {}
+    # //div/a/b/text() only shares //div with //div/c once the other two
+    # expressions share //div/a/b/c
+    queries = ["//div/a/b/text()", "//div/a/b/c/d", "//div/a/b/c/e", "//div/c"]
+    assert find_shared_xpath_prefixes(queries) == {
+        "//div/a/b/c": ["//div/a/b/c/d", "//div/a/b/c/e"],
+        "//div": ["//div/a/b/text()", "//div/c"],
+    }
+
+
+def test_share_xpath_prefixes():
+    selector = Selector(
+        text="""
+    <div id="a"><p>1</p><div id="b"><p>2</p><p>3</p></div><a href="/a">a</a></div>
+    <div id="c"><p>4</p></div>
+    """
+    )
+    queries = [
+        "//div//p/text()",
+        "//div//p[1]/text()",
+        "//div/p",
+        "//div//a/@href",
+        "//div[@id='a']//p/text()",
+        "//div[@id='a']//div/p[last()]/text()",
+        "//div//span/text()",
+        "//div/@id",
+        "//div//p/text()",
+    ]
+    extraction_cache = ExtractionCache()
+    assert extraction_cache.share_xpath_prefixes(queries) == {
+        "//div": queries[:4] + queries[6:8],
+        "//div[@id='a']": queries[4:6],
+    }
+    assert extraction_cache.shared_xpath_prefixes == {
+        "//div": queries[:4] + queries[6:8],
+        "//div[@id='a']": queries[4:6],
+    }
+    for query in queries:
+        assert extraction_cache.getall(selector, "xpath", query) == (
+            selector.xpath(query).getall()
+        )
+        nested_selector = selector.xpath("//div[@id='b']")
+        assert extraction_cache.getall(nested_selector, "xpath", query) == (
+            nested_selector.xpath(query).getall()
+        )
+    assert len(extraction_cache._prefix_nodes) == 4
+
+
+def test_deferred_rules_share_xpath_prefixes():
+    class DeferredLoader(ItemLoader):
+        defer_rules = True
+
+    extraction_cache = ExtractionCache()
+    loader = DeferredLoader(selector=html_selector, extraction_cache=extraction_cache)
+    loader.add_xpath("name", "//div[@class='item']/p/text()")
+    loader.add_xpath("url", ["//div[@class='item']/a/@href", "//a/@title"])
+    loader.add_css("url", "a::attr(href)")
+    assert loader.load_item() == {
+        "name": ["first", "second"],
+        "url": ["/1", "/2", "/1", "/2"],
+    }
+    assert extraction_cache.shared_xpath_prefixes == {
+        "//div[@class='item']": [
+            "//div[@class='item']/p/text()",
+            "//div[@class='item']/a/@href",
+        ],
+    }
+
+
+def test_prefetch_jmespath(monkeypatch):
+    selector = Selector(
+        text='{"a": {"b": ["x", {"c": 1}, null]}, "d": null, "e": "y", "f": 1.5}'
+    )
+    queries = ["a.b", "a.b[1].c", "d", "e", "f", "g", "a.b[*].c", "`true`", "a.b"]
+    extraction_cache = ExtractionCache()
+    extraction_cache.prefetch_jmespath(selector, queries)
+    assert len(extraction_cache) == 8
+    monkeypatch.setattr(cache, "_getall", None)
+    for query in queries:
+        assert extraction_cache.getall(selector, "jmes", query) == (
+            selector.jmespath(query).getall()
+        )
+    assert extraction_cache.misses == 8
+    assert extraction_cache.hits == 1
+    extraction_cache.prefetch_jmespath(selector, queries)
+    assert len(extraction_cache) == 8
+
+
+def test_prefetch_jmespath_unsupported():
+    extraction_cache = ExtractionCache()
+    extraction_cache.prefetch_jmespath(html_selector, ["a", "b"])
+    extraction_cache.prefetch_jmespath(Selector(text="null"), ["a", "`1`"])
+    assert len(extraction_cache) == 0
+    with pytest.raises(jmespath.exceptions.ParseError):
+        extraction_cache.prefetch_jmespath(Selector(text="{}"), ["a", "b["])
+
+
+def test_deferred_rules_prefetch_jmespath(monkeypatch):
+    class DeferredLoader(ItemLoader):
+        defer_rules = True
+
+    stats: Counter[str] = Counter()
+
+    class Stats:
+        def inc_value(self, key, count=1):
+            stats[key] += count
+
+    selector = Selector(text='{"name": "TV", "tags": ["a", "b"], "offers": [{}]}')
+    loader = DeferredLoader(selector=selector, stats=Stats())
+    loader.add_jmes("name", "name")
+    loader.add_jmes("tags", ["tags", "labels"])
+    loader.add_value("url", "http://example.com")
+    monkeypatch.setattr(cache, "_getall", None)
+    assert loader.load_item() == {
+        "name": ["TV"],
+        "tags": ["a", "b"],
+        "url": ["http://example.com"],
+    }
+    assert stats == {
+        "parser/name/jmes/name": 1,
+        "parser/tags/jmes/tags": 1,
+        "parser/tags/jmes/labels": 0,
+    }
@@ -1,6 +1,7 @@
 from typing import Any
 
-from itemloaders.common import wrap_loader_context
+from itemloaders.common import is_impure, wrap_loader_context
+from itemloaders.processors import Compose, MapCompose, TakeFirst
 
 CONTEXT: dict[str, Any] = {"encoding": "utf-8"}
 
@@ -14,3 +15,14 @@ class Processor:
 
 def test_unhashable_function():
     assert wrap_loader_context(Processor(), CONTEXT)("foo") == CONTEXT
+
+
+def test_is_impure():
+    def now(value: Any) -> Any:
+        return value
+
+    assert not is_impure(now)
+    assert not is_impure(MapCompose(str.strip, Compose(TakeFirst())))
+    now.impure = True  # type: ignore[attr-defined]
+    assert is_impure(now)
+    assert is_impure(MapCompose(str.strip, Compose(now)))
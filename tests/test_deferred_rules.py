@@ -0,0 +1,171 @@
+from unittest.mock import MagicMock
+
+import pytest
+from parsel import Selector
+
+from itemloaders import ItemLoader
+from itemloaders.processors import MapCompose, TakeFirst
+
+
+class DeferredLoader(ItemLoader):
+    defer_rules = True
+    name_in = MapCompose(str.strip)
+    name_out = TakeFirst()
+
+
+@pytest.fixture
+def selector():
+    return MagicMock(
+        wraps=Selector(
+            text="""
+    <html>
+    <body>
+    <h1> Color TV </h1>
+    <p class="price">$1200</p>
+    <div class="tags"><span>tv</span><span>color</span></div>
+    </body>
+    </html>
+    """
+        )
+    )
+
+
+def test_rules_run_on_load(selector):
+    loader = DeferredLoader(selector=selector)
+    loader.add_css("name", "h1::text")
+    loader.add_xpath("price", "//p/text()")
+    loader.add_value("url", "http://example.com")
+    assert not selector.css.called
+    assert not selector.xpath.called
+    assert loader.load_item() == {
+        "name": "Color TV",
+        "price": ["$1200"],
+        "url": ["http://example.com"],
+    }
+
+
+def test_fields(selector):
+    loader = DeferredLoader(selector=selector)
+    loader.add_css("name", "h1::text")
+    loader.add_css("price", "p::text")
+    loader.add_css("tags", "span::text")
+    assert loader.load_item(fields=["name", "tags", "other"]) == {
+        "name": "Color TV",
+        "tags": ["tv", "color"],
+    }
+    assert [call.args[0] for call in selector.css.call_args_list] == [
+        "h1::text",
+        "span::text",
+    ]
+    # Rules of other fields are still pending
+    assert loader.load_item() == {
+        "name": "Color TV",
+        "price": ["$1200"],
+        "tags": ["tv", "color"],
+    }
+
+
+def test_fields_not_deferred():
+    loader = ItemLoader()
+    loader.add_value("name", "Color TV")
+    loader.add_value("price", "$1200")
+    assert loader.load_item(fields=["price"]) == {"price": ["$1200"]}
+
+
+def test_satisfied_field(selector):
+    loader = DeferredLoader(selector=selector)
+    loader.add_css("name", "h2::text")
+    loader.add_css("name", "h1::text")
+    loader.add_xpath("name", "//title/text()")
+    loader.add_value("name", "TV")
+    assert loader.load_item() == {"name": "Color TV"}
+    assert [call.args[0] for call in selector.css.call_args_list] == [
+        "h2::text",
+        "h1::text",
+    ]
+    assert not selector.xpath.called
+    assert loader.get_collected_values("name") == ["Color TV"]
+
+
+def test_replace(selector):
+    loader = DeferredLoader(selector=selector)
+    loader.add_css("name", "h1::text")
+    loader.replace_css("name", "p::text")
+    loader.replace_value("tags", "tv")
+    assert loader.load_item() == {"name": "$1200", "tags": ["tv"]}
+
+
+def test_shared_rules(selector):
+    loader = DeferredLoader(selector=selector)
+    loader.add_css("name", "h1::text")
+    loader.add_css("title", "h1::text")
+    assert loader.load_item() == {"name": "Color TV", "title": [" Color TV "]}
+    assert selector.css.call_count == 1
+    assert loader.extraction_cache is None
+
+
+def test_collected_values(selector):
+    loader = DeferredLoader(selector=selector)
+    loader.add_css("name", "h1::text")
+    loader.add_css("price", "p::text")
+    assert loader.get_collected_values("name") == ["Color TV"]
+    assert loader.get_output_value("price") == ["$1200"]
+
+
+def test_nested_loader(selector):
+    loader = DeferredLoader(selector=selector)
+    nested_loader = loader.nested_css("div.tags")
+    nested_loader.add_css("tags", "span::text")
+    loader.add_css("name", "h1::text")
+    assert loader.load_item(fields=["name"]) == {"name": "Color TV"}
+    assert nested_loader.load_item() == {
+        "name": "Color TV",
+        "tags": ["tv", "color"],
+    }
+
+
+def test_no_selector():
+    loader = DeferredLoader()
+    with pytest.raises(RuntimeError):
+        loader.add_css("name", "h1::text")
+    loader.add_value("name", "Color TV")
+    assert loader.load_item() == {"name": "Color TV"}
+
+
+def add_suffix(value, loader_context):
+    return value + loader_context["suffix"]
+
+
+class ContextLoader(ItemLoader):
+    defer_rules = True
+    tags_in = MapCompose(add_suffix)
+
+
+def test_context():
+    loader = ContextLoader(suffix="1")
+    loader.add_value("tags", "x")
+    loader.context["suffix"] = "2"
+    loader.add_value("tags", "y")
+    assert loader.load_item() == {"tags": ["x1", "y2"]}
+    assert loader.context == {"suffix": "2", "item": loader.item, "selector": None}
+
+
+def test_values_copied():
+    loader = DeferredLoader()
+    tags = ["tv"]
+    loader.add_value("tags", tags)
+    loader.replace_value("sizes", {"width": 32})
+    tags.append("color")
+    assert loader.load_item() == {"tags": ["tv"], "sizes": [{"width": 32}]}
+
+
+def test_no_field_name():
+    loader = DeferredLoader()
+    loader.add_value("tags", "first")
+    loader.add_value(None, {"tags": "second", "url": "http://example.com"})
+    loader.replace_value(None, {"url": "http://example.org"})
+    assert loader._deferred_rules
+    assert loader.load_item() == {
+        "tags": ["first", "second"],
+        "url": ["http://example.org"],
+    }
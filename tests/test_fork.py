@@ -0,0 +1,197 @@
+from dataclasses import dataclass, field
+from unittest.mock import Mock
+
+from parsel import Selector
+
+from itemloaders import ItemLoader
+from itemloaders.processors import Compose, Identity, Join, TakeFirst
+
+selector = Selector(
+    text="""
+<html>
+<body>
+<h1>Color TV</h1>
+<p class="description">A TV.</p>
+<ul>
+  <li data-sku="tv-32" data-size="32">32"</li>
+  <li data-sku="tv-40" data-size="40">40"</li>
+</ul>
+</body>
+</html>
+"""
+)
+
+
+class ProductLoader(ItemLoader):
+    default_output_processor = TakeFirst()
+    description_out = Join()
+    tags_out = Identity()
+
+
+def test_fork():
+    loader = ProductLoader(selector=selector, site="a")
+    loader.add_css("name", "h1::text")
+    loader.add_css("description", "p.description::text")
+    loader.add_value("tags", ["tv"])
+    items = []
+    for variant in selector.css("li"):
+        variant_loader = loader.fork(variant=variant)
+        assert variant_loader.selector is selector
+        assert variant_loader.context["site"] == "a"
+        assert variant_loader.context["variant"] is variant
+        assert variant_loader._values["name"] is loader._values["name"]
+        variant_loader.add_value("sku", variant.attrib["data-sku"])
+        variant_loader.add_value("tags", variant.attrib["data-size"])
+        items.append(variant_loader.load_item())
+    assert items == [
+        {
+            "name": "Color TV",
+            "description": "A TV.",
+            "tags": ["tv", "32"],
+            "sku": "tv-32",
+        },
+        {
+            "name": "Color TV",
+            "description": "A TV.",
+            "tags": ["tv", "40"],
+            "sku": "tv-40",
+        },
+    ]
+    assert loader.load_item() == {
+        "name": "Color TV",
+        "description": "A TV.",
+        "tags": ["tv"],
+    }
+    assert loader.item is not items[0]
+
+
+def test_copy_on_write():
+    loader = ProductLoader()
+    loader.add_value("tags", ["a"])
+    fork = loader.fork()
+    loader.add_value("tags", "b")
+    fork.add_value("tags", "c")
+    fork.add_value("tags", "d")
+    assert loader.get_collected_values("tags") == ["a", "b"]
+    assert fork.get_collected_values("tags") == ["a", "c", "d"]
+    fork.replace_value("tags", "e")
+    second_fork = fork.fork()
+    second_fork.add_value("tags", "f")
+    assert loader.get_collected_values("tags") == ["a", "b"]
+    assert fork.get_collected_values("tags") == ["e"]
+    assert second_fork.get_collected_values("tags") == ["e", "f"]
+
+
+def test_collected_values_changed():
+    loader = ProductLoader()
+    loader.add_value("tags", ["a"])
+    fork = loader.fork()
+    fork.get_collected_values("tags").append("b")
+    loader.get_collected_values("tags").append("c")
+    second_fork = loader.fork()
+    second_fork.get_collected_values("tags").append("d")
+    assert fork.load_item() == {"tags": ["a", "b"]}
+    assert loader.load_item() == {"tags": ["a", "c"]}
+    assert second_fork.load_item() == {"tags": ["a", "c", "d"]}
+
+
+def test_nested_loader():
+    loader = ProductLoader(selector=selector)
+    nested_loader = loader.nested_css("ul")
+    nested_loader.add_css("sizes", "li::attr(data-size)")
+    fork = nested_loader.fork()
+    assert fork.parent is None
+    assert fork.selector is nested_loader.selector
+    fork.add_css("sku", "li::attr(data-sku)")
+    nested_loader.add_value("sizes", "55")
+    assert fork.load_item() == {"sizes": "32", "sku": "tv-32"}
+    assert loader.get_collected_values("sizes") == ["32", "40", "55"]
+
+
+def test_item():
+    @dataclass
+    class Product:
+        name: list[str] = field(default_factory=list)
+        tags: list[str] = field(default_factory=list)
+
+    loader = ItemLoader(item=Product(name=["TV"]))
+    loader.add_value("tags", "tv")
+    fork = loader.fork(item=Product(tags=["sale"]))
+    assert fork.load_item() == Product(name=["TV"], tags=["tv", "sale"])
+    assert loader.fork().load_item() == {"name": ["TV"], "tags": ["tv"]}
+
+
+def test_output_values():
+    output_processor = Mock(side_effect=" ".join)
+    list_output_processor = Mock(side_effect=list)
+
+    class MockLoader(ItemLoader):
+        name_out = output_processor
+        tags_out = list_output_processor
+
+    loader = MockLoader()
+    loader.add_value("name", ["Color", "TV"])
+    loader.add_value("tags", ["tv"])
+    items = [loader.fork().load_item() for _ in range(3)]
+    assert items == [{"name": "Color TV", "tags": ["tv"]}] * 3
+    assert output_processor.call_count == 1
+    # Mutable output values are not shared.
+    assert list_output_processor.call_count == 3
+    assert items[0]["tags"] is not items[1]["tags"]
+    fork = loader.fork()
+    fork.add_value("name", "sale")
+    assert fork.load_item()["name"] == "Color TV sale"
+    assert output_processor.call_count == 2
+
+
+def test_identity_output():
+    loader = ItemLoader()
+    loader.add_value("tags", ["tv"])
+    first_item = loader.fork().load_item()
+    second_item = loader.fork().load_item()
+    first_item["tags"].append("sale")
+    assert second_item == {"tags": ["tv"]}
+    assert loader.load_item() == {"tags": ["tv"]}
+
+
+def test_initial_values():
+    loader = ItemLoader(item={"tags": ["tv"], "sizes": iter([32, 40])})
+    first_item = loader.fork().load_item()
+    second_item = loader.load_item()
+    assert first_item == second_item == {"tags": ["tv"], "sizes": [32, 40]}
+    assert first_item["tags"] is not second_item["tags"]
+    assert first_item["sizes"] is not second_item["sizes"]
+    first_item["tags"].append("sale")
+    assert second_item["tags"] == ["tv"]
+    assert loader.fork().load_item() == {"tags": ["tv"], "sizes": [32, 40]}
+
+
+def test_deferred_rules():
+    class DeferredLoader(ProductLoader):
+        defer_rules = True
+
+    loader = DeferredLoader(selector=selector)
+    loader.add_css("name", "h1::text")
+    fork = loader.fork()
+    assert fork._values == {"name": ["Color TV"]}
+    fork.add_css("description", "p::text")
+    assert fork.load_item() == {"name": "Color TV", "description": "A TV."}
+
+
+def test_impure_output():
+    stamps = iter(range(10))
+
+    def stamp(value: str) -> str:
+        return f"{value}-{next(stamps)}"
+
+    stamp.impure = True  # type: ignore[attr-defined]
+
+    class StampLoader(ItemLoader):
+        name_out = Compose(TakeFirst(), stamp)
+
+    loader = StampLoader()
+    loader.add_value("name", "a")
+    fork = loader.fork()
+    assert fork.load_item() == {"name": "a-0"}
+    assert loader.load_item() == {"name": "a-1"}
+    assert fork.load_item() == {"name": "a-2"}
@@ -0,0 +1,129 @@
+from collections import Counter
+from io import BytesIO
+
+import pytest
+
+from itemloaders import ItemLoader
+from itemloaders.processors import TakeFirst
+
+FEED = b"""<?xml version="1.0"?>
+<rss xmlns:g="http://base.google.com/ns/1.0">
+<channel>
+<title>Products</title>
+<item><title>TV</title><g:price>1200</g:price><tag>tv</tag><tag>color</tag></item>
+<item><title>Radio</title><g:price>50</g:price></item>
+<item><title>Phone</title></item>
+</channel>
+</rss>
+"""
+
+
+class ProductLoader(ItemLoader):
+    default_output_processor = TakeFirst()
+
+
+def populate(loader):
+    loader.add_xpath("name", "title/text()")
+    loader.add_xpath("price", "g:price/text()")
+
+
+def test_iter_items():
+    items = ProductLoader.iter_items(
+        BytesIO(FEED),
+        "item",
+        populate,
+        namespaces={"g": "http://base.google.com/ns/1.0"},
+    )
+    assert list(items) == [
+        {"name": "TV", "price": "1200"},
+        {"name": "Radio", "price": "50"},
+        {"name": "Phone"},
+    ]
+
+
+def test_path(tmp_path):
+    path = tmp_path / "feed.xml"
+    path.write_bytes(FEED)
+
+    def populate(loader):
+        loader.add_xpath("tags", "tag/text()")
+        loader.add_value("source", "feed")
+
+    assert list(ItemLoader.iter_items(str(path), "item", populate)) == [
+        {"tags": ["tv", "color"], "source": ["feed"]},
+        {"source": ["feed"]},
+        {"source": ["feed"]},
+    ]
+    assert list(ItemLoader.iter_items(path, "missing", populate)) == []
+
+
+def test_records_removed():
+    sizes = []
+
+    def populate(loader):
+        element = loader.selector.root
+        sizes.append(len(element.getparent()))
+        loader.add_xpath("name", "title/text()")
+
+    feed = b"<feed>" + b"<item><title>x</title></item>" * 10000 + b"</feed>"
+    items = list(ItemLoader.iter_items(BytesIO(feed), "item", populate))
+    assert len(items) == 10000
+    # Only the records that the parser has read ahead are kept.
+    assert max(sizes) < 2000
+
+
+def test_namespaced_record_tag():
+    feed = b"""<feed xmlns="http://example.com/ns">
+    <entry><id>1</id></entry><entry><id>2</id></entry>
+    </feed>"""
+
+    def populate(loader):
+        loader.add_xpath("id", "ns:id/text()")
+
+    items = ProductLoader.iter_items(
+        BytesIO(feed),
+        "{http://example.com/ns}entry",
+        populate,
+        namespaces={"ns": "http://example.com/ns"},
+    )
+    assert list(items) == [{"id": "1"}, {"id": "2"}]
+
+
+def test_loader_arguments():
+    stats: Counter[str] = Counter()
+
+    class Stats:
+        def inc_value(self, key, count=1):
+            stats[key] += count
+
+    def populate(loader):
+        assert loader.context["source"] == "feed"
+        loader.add_xpath("name", "title/text()")
+
+    items = list(
+        ProductLoader.iter_items(
+            BytesIO(FEED), "item", populate, stats=Stats(), source="feed"
+        )
+    )
+    assert items == [{"name": "TV"}, {"name": "Radio"}, {"name": "Phone"}]
+    assert stats == {"parser/name/xpath/title/text()": 3}
+
+
+def test_entities():
+    feed = b"""<?xml version="1.0"?>
+<!DOCTYPE feed [<!ENTITY secret SYSTEM "file:///etc/passwd">]>
+<feed><item><title>&secret;</title></item></feed>"""
+
+    def populate(loader):
+        loader.add_xpath("name", "title/text()")
+
+    assert list(ProductLoader.iter_items(BytesIO(feed), "item", populate)) == [{}]
+
+
+def test_populate_error():
+    def populate(loader):
+        raise ValueError("error")
+
+    items = ProductLoader.iter_items(BytesIO(FEED), "item", populate)
+    with pytest.raises(ValueError, match="error"):
+        next(items)
@@ -4,6 +4,8 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Any
 
+from parsel import Selector
+
 from itemloaders import ItemLoader
 
 
@@ -86,16 +88,16 @@ class TestInitializationBase(ABC):
         assert loaded_item == {"name": ["foo", "bar"]}
 
     def test_values_single(self) -> None:
-        """Values from initial item must be added to loader._values"""
+        """Values from initial item must be collected"""
         input_item = self.item_class(name="foo")
         il = ItemLoader(item=input_item)
-        assert il._values.get("name") == ["foo"]
+        assert il.get_collected_values("name") == ["foo"]
 
     def test_values_list(self) -> None:
-        """Values from initial item must be added to loader._values"""
+        """Values from initial item must be collected"""
         input_item = self.item_class(name=["foo", "bar"])
         il = ItemLoader(item=input_item)
-        assert il._values.get("name") == ["foo", "bar"]
+        assert il.get_collected_values("name") == ["foo", "bar"]
 
 
 class TestInitializationFromDict(TestInitializationBase):
@@ -120,3 +122,42 @@ def test_keep_field_defaults_of_the_given_item() -> None:
     il = ItemLoader(item=DefaultItem())
     il.add_value("name", "foo")
     assert il.load_item() == DefaultItem(name=["default", "foo"])
+
+
+def test_initial_values_collected_lazily() -> None:
+    tags = ["a", "b"]
+    input_item: dict[str, Any] = {f"field{i}": [i] for i in range(80)}
+    input_item.update(tags=tags, price="10")
+    il = ItemLoader(item=input_item)
+    il.add_value("tags", "c")
+    il.add_value("name", "foo")
+    assert il._values == {"tags": ["a", "b", "c"], "name": ["foo"]}
+    assert il.get_output_value("field1") == [1]
+    loaded_item = il.load_item()
+    assert loaded_item["field1"] is input_item["field1"]
+    assert loaded_item["price"] == ["10"]
+    assert loaded_item["tags"] == ["a", "b", "c"]
+    assert tags == ["a", "b"]
+    assert len(loaded_item) == 83
+
+
+def test_initial_values_replaced() -> None:
+    il = ItemLoader(item={"name": "foo", "price": "10"})
+    il.replace_value("name", "bar")
+    assert il.get_collected_values("price") == ["10"]
+    il.add_value("price", "20")
+    assert il.load_item() == {"name": ["bar"], "price": ["10", "20"]}
+
+
+def test_initial_values_nested_loader() -> None:
+    il = ItemLoader(item={"name": "foo"}, selector=Selector(text="<p>bar</p>"))
+    nested_loader = il.nested_css("p")
+    nested_loader.add_css("name", "::text")
+    assert il.load_item() == {"name": ["foo", "bar"]}
+
+
+def test_initial_values_changed_in_item() -> None:
+    input_item = {"name": ["foo"]}
+    il = ItemLoader(item=input_item)
+    input_item["name"] = ["bar"]
+    assert il.load_item() == {"name": ["foo"]}
@@ -114,3 +114,23 @@ class TestSubselectorLoader:
         nested_css = loader.nested_css("bar")
         assert isinstance(nested_css, ItemLoader)
         nested_css.add_css("foo", "foo")
+
+    def test_nested_deep(self):
+        loader = ItemLoader(selector=self.selector)
+        nl1 = loader.nested_css("footer")
+        nl2 = nl1.nested_xpath("a")
+        nl3 = nl2.nested_xpath("@href", scheme="http")
+        nl3.add_xpath("url", ".")
+        nl2.replace_value("name", "homepage")
+
+        assert nl3.context == {
+            "scheme": "http",
+            "selector": nl3.selector,
+            "item": loader.item,
+        }
+        assert nl3.item is loader.item
+        assert nl3.get_collected_values("url") == ["http://www.scrapy.org"]
+        assert loader.load_item() == {
+            "url": ["http://www.scrapy.org"],
+            "name": ["homepage"],
+        }
@@ -0,0 +1,137 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+import pytest
+from parsel import Selector
+
+from itemloaders import ItemLoader
+from itemloaders.cache import ExtractionCache
+from itemloaders.processors import Compose, MapCompose, TakeFirst
+
+selector = Selector(
+    text="""
+<html>
+<body>
+<ul>
+  <li class="product"><h2> TV </h2><span class="price">1200</span><i>new</i></li>
+  <li class="product"><h2> Radio </h2><span class="price">50</span></li>
+  <li class="product"><b>Phone</b><i>new</i><i>sale</i></li>
+</ul>
+</body>
+</html>
+"""
+)
+
+XPATH_RULES = {
+    "name": ["h2/text()", "b/text()"],
+    "price": "span[@class='price']/text()",
+    "tags": "i/text()",
+}
+CSS_RULES = {
+    "name": ["h2::text", "b::text"],
+    "price": "span.price::text",
+    "tags": "i::text",
+}
+
+
+class ProductLoader(ItemLoader):
+    name_in = MapCompose(str.strip)
+    name_out = TakeFirst()
+    price_in = MapCompose(int)
+    price_out = TakeFirst()
+    tags_out = Compose(lambda tags, loader_context: [*tags, loader_context["site"]])
+
+
+def load_rows(
+    loader: ItemLoader,
+    rule_type: str,
+    query: str,
+    rules: dict[str, Any],
+    **context: Any,
+) -> list[Any]:
+    """Load each row with a loader of its own."""
+    items = []
+    assert loader.selector is not None
+    for row in getattr(loader.selector, rule_type)(query):
+        row_loader = loader.__class__(selector=row, **context)
+        for field_name, field_rules in rules.items():
+            getattr(row_loader, f"add_{rule_type}")(field_name, field_rules)
+        items.append(row_loader.load_item())
+    return items
+
+
+def test_iter_nested_xpath():
+    loader = ProductLoader(selector=selector)
+    items = list(
+        loader.iter_nested_xpath("//li[@class='product']", XPATH_RULES, site="a")
+    )
+    assert items == [
+        {"name": "TV", "price": 1200, "tags": ["new", "a"]},
+        {"name": "Radio", "price": 50},
+        {"name": "Phone", "tags": ["new", "sale", "a"]},
+    ]
+    assert items == load_rows(
+        loader, "xpath", "//li[@class='product']", XPATH_RULES, site="a"
+    )
+    assert loader.load_item() == {}
+
+
+def test_iter_nested_css():
+    loader = ProductLoader(selector=selector)
+    items = list(loader.iter_nested_css("li.product", CSS_RULES, site="b"))
+    assert items == load_rows(loader, "css", "li.product", CSS_RULES, site="b")
+    assert items[0] == {"name": "TV", "price": 1200, "tags": ["new", "b"]}
+
+
+def test_no_rows():
+    loader = ProductLoader(selector=selector)
+    assert list(loader.iter_nested_css("div.product", CSS_RULES)) == []
+
+
+def test_no_selector():
+    loader = ItemLoader()
+    with pytest.raises(RuntimeError):
+        loader.iter_nested_css("li", {})
+
+
+def test_item_class():
+    @dataclass
+    class Product:
+        name: list[str] = field(default_factory=list)
+        tags: list[str] = field(default_factory=list)
+
+    class DataclassLoader(ItemLoader):
+        default_item_class = Product
+
+    loader = DataclassLoader(selector=selector)
+    items = list(loader.iter_nested_css("li", {"tags": "i::text"}))
+    assert items == [
+        Product(tags=["new"]),
+        Product(),
+        Product(tags=["new", "sale"]),
+    ]
+    assert len({id(item) for item in items}) == 3
+
+
+def test_stats_and_cache():
+    stats: Counter[str] = Counter()
+
+    class Stats:
+        def inc_value(self, key, count=1):
+            stats[key] += count
+
+    extraction_cache = ExtractionCache()
+    loader = ProductLoader(
+        selector=selector, stats=Stats(), extraction_cache=extraction_cache
+    )
+    rules = {"name": ["h2/text()", "b/text()"]}
+    assert [item["name"] for item in loader.iter_nested_xpath("//li", rules)] == [
+        "TV",
+        "Radio",
+        "Phone",
+    ]
+    assert stats == {"parser/name/xpath/h2/text()": 2, "parser/name/xpath/b/text()": 1}
+    assert extraction_cache.misses == 6
+    list(loader.iter_nested_xpath("//li", rules))
+    assert extraction_cache.hits == 6
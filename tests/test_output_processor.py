@@ -2,8 +2,10 @@ from __future__ import annotations
 
 from typing import Any
 
+from parsel import Selector
+
 from itemloaders import ItemLoader
-from itemloaders.processors import Compose, Identity, TakeFirst
+from itemloaders.processors import Compose, Identity, Join, MapCompose, TakeFirst
 
 
 class TestOutputProcessorDict:
@@ -36,3 +38,77 @@ class TestOutputProcessorItem:
         item = loader.load_item()
         assert isinstance(item, dict)
         assert dict(item) == {"temp": 0.3}
+
+
+def test_output_value_cached() -> None:
+    calls: list[list[Any]] = []
+
+    def join(values: list[Any]) -> str:
+        calls.append(values)
+        return " ".join(values)
+
+    class JoinLoader(ItemLoader):
+        default_output_processor = Compose(join)
+        tags_out = MapCompose(str.upper)
+
+    loader = JoinLoader()
+    loader.add_value("name", "foo")
+    loader.add_value("tags", ["a", "b"])
+    assert loader.load_item() == {"name": "foo", "tags": ["A", "B"]}
+    assert loader.get_output_value("name") == "foo"
+    assert len(calls) == 1
+    loader.add_value("name", "bar")
+    assert loader.load_item() == {"name": "foo bar", "tags": ["A", "B"]}
+    loader.replace_value("name", "baz")
+    assert loader.get_output_value("name") == "baz"
+    assert len(calls) == 3
+    tags = loader.get_output_value("tags")
+    tags.append("C")
+    assert loader.get_output_value("tags") == ["A", "B"]
+
+
+def test_output_value_cached_context() -> None:
+    def add_unit(value: str, loader_context: dict[str, Any]) -> str:
+        return value + str(loader_context.get("unit", "m"))
+
+    class LengthLoader(ItemLoader):
+        length_out = Compose(TakeFirst(), add_unit)
+
+    loader = LengthLoader(selector=Selector(text="<p></p>"))
+    loader.add_value("length", "10")
+    assert loader.get_output_value("length") == "10m"
+    loader.context["unit"] = "cm"
+    assert loader.get_output_value("length") == "10cm"
+    nested_loader = loader.nested_css("p", unit="mm")
+    assert nested_loader.get_output_value("length") == "10mm"
+    assert loader.get_output_value("length") == "10cm"
+    del loader.context["unit"]
+    assert loader.get_output_value("length") == "10m"
+
+
+def test_output_value_impure() -> None:
+    counter = iter(range(10))
+
+    def count(values: list[Any]) -> int:
+        return next(counter)
+
+    count.impure = True  # type: ignore[attr-defined]
+
+    class CountLoader(ItemLoader):
+        default_output_processor = Compose(TakeFirst(), str, count)
+
+    loader = CountLoader()
+    loader.add_value("count", "1")
+    assert loader.get_output_value("count") == 0
+    assert loader.get_output_value("count") == 1
+
+
+def test_output_value_collected_values_changed() -> None:
+    class JoinLoader(ItemLoader):
+        default_output_processor = Join()
+
+    loader = JoinLoader()
+    loader.add_value("name", ["Color", "TV"])
+    assert loader.get_output_value("name") == "Color TV"
+    loader.get_collected_values("name").append("sale")
+    assert loader.get_output_value("name") == "Color TV sale"
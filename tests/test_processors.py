@@ -1,6 +1,17 @@
+import gc
+import inspect
+import linecache
+
 import pytest
 
-from itemloaders.processors import Compose, Identity, Join, MapCompose, TakeFirst
+from itemloaders.processors import (
+    Compose,
+    Identity,
+    Join,
+    MapCompose,
+    TakeFirst,
+    simplify,
+)
 
 
 def test_take_first():
@@ -67,3 +78,174 @@ def test_mapcompose():
         match=r"Error in MapCompose with .* error='TypeError: (can only|unsupported operand)",
     ):
         proc("hello")
+
+
+def add_suffix(value, loader_context):
+    return value + loader_context.get("suffix", "")
+
+
+def test_compose_loader_context():
+    proc = Compose(add_suffix, str.upper)
+    assert proc("a") == "A"
+    assert proc("a", {"suffix": "b"}) == "AB"
+    proc = Compose(add_suffix, suffix="c")
+    assert proc("a") == "ac"
+    assert proc("a", {"suffix": "b"}) == "ab"
+
+
+def test_mapcompose_loader_context():
+    proc = MapCompose(add_suffix, str.upper)
+    assert proc("a") == ["A"]
+    assert proc("a", {"suffix": "b"}) == ["AB"]
+    proc = MapCompose(add_suffix, suffix="c")
+    assert proc("a") == ["ac"]
+    assert proc("a", {"suffix": "b"}) == ["ab"]
+
+
+def test_replaced_functions():
+    proc = MapCompose(str.upper)
+    assert proc("a") == ["A"]
+    proc.functions = (add_suffix,)
+    assert proc("a", {"suffix": "b"}) == ["ab"]
+    proc.functions = (str.upper,)
+    assert proc("a", {"suffix": "b"}) == ["A"]
+
+
+def test_compose_compile():
+    proc = Compose(lambda v: v[0], str.upper).compile()
+    assert proc(["hello", "world"]) == "HELLO"
+    assert Compose(str.upper).compile()(None) is None
+    proc = Compose(add_suffix, str.upper, suffix="c").compile()
+    assert proc("a") == "AC"
+    assert proc("a", {"suffix": "b"}) == "AB"
+    proc = Compose(str.upper, stop_on_none=False).compile()
+    with pytest.raises(
+        ValueError,
+        match=r"Error in Compose with .* value=None error='TypeError: (descriptor 'upper'|'str' object expected)",
+    ):
+        proc(None)
+    proc = Compose(str.upper, lambda x: x + 1).compile()
+    with pytest.raises(
+        ValueError,
+        match=r"Error in Compose with <function .* value='HELLO' error='TypeError: (can only|unsupported operand)",
+    ):
+        proc("hello")
+    assert Compose().compile()("hello") == "hello"
+
+
+def test_mapcompose_compile():
+    def filter_world(x):
+        return None if x == "world" else x
+
+    def split(x):
+        return iter(x.split())
+
+    values = [" hello world", "this is", "scrapy "]
+    proc = MapCompose(str.strip, split, filter_world, str.upper)
+    assert proc.compile()(values) == proc(values) == ["HELLO", "THIS", "IS", "SCRAPY"]
+    assert proc.compile()(iter(values)) == ["HELLO", "THIS", "IS", "SCRAPY"]
+    assert MapCompose(str.split).compile()({"a b"}) == ["a", "b"]
+    assert MapCompose(filter_world).compile()(None) == []
+    assert MapCompose().compile()("hello") == ["hello"]
+    compiled = MapCompose(add_suffix, str.upper, suffix="c").compile()
+    assert compiled("a") == ["AC"]
+    assert compiled("a", {"suffix": "b"}) == ["AB"]
+    compiled = MapCompose(filter_world, lambda x: x + 1).compile()
+    with pytest.raises(
+        ValueError,
+        match=r"Error in MapCompose with <function .* value='hello' error='TypeError: (can only|unsupported operand)",
+    ):
+        compiled("hello")
+
+    def broken(x):
+        yield x
+        raise KeyError(x)
+
+    compiled = MapCompose(broken, str.upper).compile()
+    with pytest.raises(
+        ValueError, match=r"Error in MapCompose with <function .*broken.* value="
+    ):
+        compiled(["hello"])
+
+
+def test_compile_source():
+    proc = MapCompose(str.strip, float).compile()
+    assert "float" not in inspect.getsource(proc)
+    assert "f1(v1)" in inspect.getsource(proc)
+
+
+def test_compile_source_released():
+    proc = MapCompose(str.strip, float)
+    compiled = proc.compile()
+    filename = compiled.__code__.co_filename
+    assert filename in linecache.cache
+    assert proc.compile().__code__.co_filename != filename
+    del compiled
+    gc.collect()
+    assert filename not in linecache.cache
+
+
+def test_simplify_compose():
+    proc = Compose(str.strip)
+    assert simplify(proc) is proc
+    assert isinstance(simplify(Compose(Identity())), Identity)
+    assert isinstance(simplify(Compose()), Identity)
+    simplified = simplify(Compose(Identity(), Compose(str.strip, Compose(str.upper))))
+    assert isinstance(simplified, Compose)
+    assert simplified.functions == (str.strip, str.upper)
+    assert simplified(" a ") == "A"
+
+    # Only processors that would behave the same way are inlined
+    nested = Compose(str.strip, stop_on_none=False)
+    simplified = simplify(Compose(nested, str.upper))
+    assert isinstance(simplified, Compose)
+    assert simplified.functions == (nested, str.upper)
+    nested = Compose(str.strip, suffix="a")
+    simplified = simplify(Compose(nested, str.upper))
+    assert isinstance(simplified, Compose)
+    assert simplified.functions == (nested, str.upper)
+    simplified = simplify(
+        Compose(Compose(add_suffix, suffix="a"), str.upper, suffix="a")
+    )
+    assert isinstance(simplified, Compose)
+    assert simplified.functions == (add_suffix, str.upper)
+    assert simplified("b") == "BA"
+
+    class CustomCompose(Compose):
+        pass
+
+    proc = CustomCompose(Identity())
+    assert simplify(proc) is proc
+
+
+def test_simplify_mapcompose():
+    proc = MapCompose(str.strip, float)
+    assert simplify(proc) is proc
+
+    simplified = simplify(MapCompose(str.strip, str.upper, str.split))
+    assert isinstance(simplified, MapCompose)
+    assert len(simplified.functions) == 2
+    assert simplified.functions[1] is str.split
+    assert simplified([" a b ", "c"]) == ["A", "B", "C"]
+    assert str(simplified.functions[0]) == "<string functions str.strip, str.upper>"
+
+    # Identity and nested MapCompose objects flatten lists, so they stay
+    # unless they follow a function that returns single values.
+    proc = MapCompose(Identity(), str.upper)
+    assert simplify(proc) is proc
+    assert proc([["a", "b"]]) == ["A", "B"]
+    proc = MapCompose(str.split, MapCompose(str.upper))
+    assert simplify(proc) is proc
+    simplified = simplify(
+        MapCompose(str.strip, Identity(), MapCompose(str.upper, float))
+    )
+    assert isinstance(simplified, MapCompose)
+    assert len(simplified.functions) == 2
+    assert simplified.functions[1] is float
+    assert simplified([" 1 "]) == [1.0]
+
+    nested = MapCompose(add_suffix, suffix="b")
+    simplified = simplify(MapCompose(str.strip, nested))
+    assert isinstance(simplified, MapCompose)
+    assert simplified.functions == (str.strip, nested)
+    assert simplified(" a ") == ["ab"]
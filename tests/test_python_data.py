@@ -0,0 +1,157 @@
+import json
+from typing import Any
+
+import pytest
+from parsel import Selector
+
+from itemloaders import ItemLoader
+from itemloaders.cache import ExtractionCache
+from itemloaders.processors import MapCompose, TakeFirst
+from itemloaders.sources import JSONDocument
+
+DATA = {
+    "name": " Color TV ",
+    "price": "the price is $1200",
+    "tags": ["tv", "color"],
+    "offers": [
+        {"seller": "a", "price": 1200},
+        {"seller": "b", "price": 1100},
+    ],
+    "brand": {"name": "ACME"},
+    "sizes": [[32, 40], 55],
+    "stock": None,
+}
+
+
+class ProductLoader(ItemLoader):
+    name_in = MapCompose(str.strip)
+    name_out = TakeFirst()
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "name",
+        "tags",
+        "tags[0]",
+        "offers",
+        "offers[*].price",
+        "brand",
+        "sizes",
+        "stock",
+        "missing",
+        "length(tags)",
+    ],
+)
+def test_parity(query):
+    loader = ProductLoader(python_data=DATA)
+    loader.add_jmes("field", query)
+    selector_loader = ProductLoader(selector=Selector(text=json.dumps(DATA)))
+    selector_loader.add_jmes("field", query)
+    assert loader.load_item() == selector_loader.load_item()
+    assert loader.get_jmes(query) == selector_loader.get_jmes(query)
+
+
+def test_methods():
+    loader = ProductLoader(python_data=DATA)
+    assert loader.python_data is DATA
+    assert loader.selector is None
+    loader.add_jmes("name", "name")
+    loader.add_jmes("price", "price", re=r"\$(\d+)")
+    loader.add_first_jmes("seller", ["seller", "offers[0].seller"])
+    loader.add_jmes("tags", "tags")
+    loader.replace_jmes("tags", "tags[-1]")
+    assert loader.get_jmes("brand.name", TakeFirst()) == "ACME"
+    assert loader.load_item() == {
+        "name": "Color TV",
+        "price": ["1200"],
+        "seller": ["a"],
+        "tags": ["color"],
+    }
+
+
+def test_nested_jmes():
+    loader = ProductLoader(python_data=DATA)
+    brand_loader = loader.nested_jmes("brand")
+    assert brand_loader.python_data is DATA["brand"]
+    brand_loader.add_jmes("brand", "name")
+    offers_loader = loader.nested_jmes("offers")
+    offers_loader.add_jmes("prices", "[*].price")
+    missing_loader = loader.nested_jmes("missing")
+    missing_loader.add_jmes("missing", "name")
+    assert loader.load_item() == {"brand": ["ACME"], "prices": [1200, 1100]}
+
+
+def test_nested_jmes_selector():
+    loader = ProductLoader(selector=Selector(text=json.dumps(DATA)))
+    offers_loader = loader.nested_jmes("offers")
+    offers_loader.add_jmes("prices", "price")
+    assert loader.load_item() == {"prices": [1200, 1100]}
+
+
+@pytest.mark.parametrize("source", ["data", "document", "selector"])
+@pytest.mark.parametrize("defer_rules", [False, True])
+def test_nested_jmes_missing(source, defer_rules):
+    text = json.dumps(DATA)
+    kwargs: dict[str, Any] = {"python_data": DATA}
+    if source == "document":
+        kwargs = {"python_data": JSONDocument(text)}
+    elif source == "selector":
+        kwargs = {"selector": Selector(text=text)}
+    loader = ItemLoader(defer_rules=defer_rules, **kwargs)
+    missing_loader = loader.nested_jmes("missing")
+    missing_loader.add_jmes("all", "@")
+    missing_loader.add_jmes("length", "length(@)")
+    missing_loader.nested_jmes("name").add_jmes("name", "@")
+    assert loader.load_item() == {}
+
+
+def test_no_data():
+    loader = ItemLoader()
+    with pytest.raises(RuntimeError):
+        loader.add_jmes("name", "name")
+    with pytest.raises(RuntimeError):
+        loader.nested_jmes("brand")
+
+
+def test_data_and_selector():
+    loader = ItemLoader(selector=Selector(text="<p>paragraph</p>"), python_data=DATA)
+    loader.add_css("description", "p::text")
+    loader.add_jmes("tags", "tags")
+    assert loader.load_item() == {
+        "description": ["paragraph"],
+        "tags": ["tv", "color"],
+    }
+
+
+def test_context():
+    loader = ItemLoader(python_data=DATA, data="api")
+    assert loader.python_data is DATA
+    assert "python_data" not in loader.context
+    assert loader.context["data"] == "api"
+
+
+def test_extraction_cache():
+    extraction_cache = ExtractionCache()
+    loader = ItemLoader(python_data=DATA, extraction_cache=extraction_cache)
+    loader.add_jmes("tags", "tags")
+    other_loader = ItemLoader(python_data=DATA, extraction_cache=extraction_cache)
+    other_loader.add_jmes("tags", "tags")
+    assert other_loader.load_item() == {"tags": ["tv", "color"]}
+    assert extraction_cache.hits == 1
+    assert extraction_cache.misses == 1
+
+
+def test_deferred_rules():
+    class DeferredLoader(ProductLoader):
+        defer_rules = True
+
+    loader = DeferredLoader(python_data=DATA, stop_on_first_value=True)
+    loader.add_jmes("name", "name")
+    loader.add_jmes("tags", ["tags", "labels"])
+    loader.nested_jmes("brand").add_jmes("brand", "name")
+    assert loader.load_item() == {
+        "name": "Color TV",
+        "tags": ["tv", "color"],
+        "brand": ["ACME"],
+    }
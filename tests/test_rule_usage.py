@@ -72,3 +72,11 @@ def test_repeated_rule(loader, stats):
     loader.add_css("name", "h1::text")
     loader.add_css("name", "h1::text")
     assert stats.values == {"parser/name/css/h1::text": 2}
+
+
+def test_add_first(loader, stats):
+    loader.add_first_css("name", ["h2::text", "h1::text", "p::text"])
+    assert stats.values == {
+        "parser/name/css/h2::text": 0,
+        "parser/name/css/h1::text": 1,
+    }
@@ -5,7 +5,8 @@ import pytest
 from parsel import Selector
 
 from itemloaders import ItemLoader
-from itemloaders.processors import MapCompose, TakeFirst
+from itemloaders.cache import ExtractionCache
+from itemloaders.processors import Identity, MapCompose, TakeFirst
 
 needs_parsel_jmespath = pytest.mark.skipif(
     not hasattr(Selector, "jmespath"), reason="parsel < 1.8.1"
@@ -308,3 +309,244 @@ class TestSelectorItemLoader:
             "description": ["paragraph"],
             "url": ["http://foo"],
         }
+
+
+class FirstValueLoader(ItemLoader):
+    default_output_processor = TakeFirst()
+    stop_on_first_value = True
+    name_in = MapCompose(str.strip, lambda v: v or None)
+
+
+class TestStopOnFirstValue:
+    selector = Selector(
+        text="""
+    <html>
+    <body>
+    <p> </p>
+    <p>first</p>
+    <p>second</p>
+    <div>other</div>
+    </body>
+    </html>
+    """
+    )
+
+    def test_stop_within_rule(self):
+        loader = FirstValueLoader(selector=self.selector)
+        loader.add_xpath("name", "//p/text()")
+        assert loader.get_collected_values("name") == ["first"]
+        loader.add_css("name", "div::text")
+        assert loader.get_collected_values("name") == ["first"]
+        assert loader.load_item() == {"name": "first"}
+
+    def test_stop_between_rules(self):
+        selector = MagicMock(wraps=self.selector)
+        loader = FirstValueLoader(selector=selector)
+        loader.add_css("name", ["span::text", "div::text", "p::text"])
+        assert loader.get_collected_values("name") == ["other"]
+        assert [call.args[0] for call in selector.css.call_args_list] == [
+            "span::text",
+            "div::text",
+        ]
+
+    def test_replace(self):
+        loader = FirstValueLoader(selector=self.selector)
+        loader.add_xpath("name", "//p/text()")
+        loader.replace_css("name", "div::text")
+        assert loader.get_collected_values("name") == ["other"]
+        loader.replace_xpath("name", "//span/text()")
+        assert loader.get_collected_values("name") == []
+
+    def test_re(self):
+        loader = FirstValueLoader(selector=self.selector)
+        loader.add_xpath("name", "//p/text()", re="s(.+)")
+        assert loader.get_collected_values("name") == ["t"]
+
+    def test_not_take_first(self):
+        class OtherLoader(FirstValueLoader):
+            name_out = Identity()
+
+        loader = OtherLoader(selector=self.selector)
+        loader.add_xpath("name", "//p/text()")
+        assert loader.get_collected_values("name") == ["first", "second"]
+
+    def test_processors(self):
+        loader = FirstValueLoader(selector=self.selector)
+        loader.add_xpath("name", "//p/text()", lambda v: v[1:])
+        assert loader.get_collected_values("name") == ["first", "second"]
+
+    def test_disabled(self):
+        class OtherLoader(FirstValueLoader):
+            stop_on_first_value = False
+
+        loader = OtherLoader(selector=self.selector)
+        loader.add_xpath("name", "//p/text()")
+        assert loader.get_collected_values("name") == ["first", "second"]
+
+    def test_no_selector(self):
+        loader = FirstValueLoader()
+        with pytest.raises(RuntimeError):
+            loader.add_xpath("name", "//p/text()")
+        loader.add_value("name", "first")
+        with pytest.raises(RuntimeError):
+            loader.replace_css("name", "p::text")
+        assert loader.get_collected_values("name") == ["first"]
+
+    @needs_parsel_jmespath
+    def test_jmes(self):
+        loader = FirstValueLoader(selector=Selector(text='{"a": ["", "b", "c"]}'))
+        loader.add_jmes("name", ["x", "a[]"])
+        assert loader.get_collected_values("name") == ["b"]
+
+
+class TestAddFirst:
+    selector = Selector(
+        text="""
+    <html>
+    <body>
+    <h1>marta</h1>
+    <p class="name">paragraph</p>
+    </body>
+    </html>
+    """
+    )
+
+    def test_add_first_xpath(self):
+        loader = ItemLoader(selector=self.selector)
+        loader.add_first_xpath(
+            "name",
+            ["//span/text()", "//p/text()", "//h1/text()"],
+            MapCompose(str.upper),
+        )
+        assert loader.get_collected_values("name") == ["PARAGRAPH"]
+        loader.add_first_xpath("name", "//span/text()")
+        assert loader.get_collected_values("name") == ["PARAGRAPH"]
+
+    def test_add_first_css(self):
+        loader = ItemLoader(selector=self.selector)
+        loader.add_first_css("name", ["span::text", "h1::text", "p::text"])
+        assert loader.get_collected_values("name") == ["marta"]
+
+    @needs_parsel_jmespath
+    def test_add_first_jmes(self):
+        loader = ItemLoader(selector=Selector(text='{"a": "b", "c": "d"}'))
+        loader.add_first_jmes("name", ["x", "c", "a"])
+        assert loader.get_collected_values("name") == ["d"]
+
+    def test_no_selector(self):
+        loader = ItemLoader()
+        with pytest.raises(RuntimeError):
+            loader.add_first_xpath("name", "//p/text()")
+        with pytest.raises(RuntimeError):
+            loader.add_first_css("name", "p::text")
+        with pytest.raises(RuntimeError):
+            loader.add_first_jmes("name", "name")
+
+    def test_adaptive_rule_order(self):
+        class AdaptiveLoader(ItemLoader):
+            adaptive_rule_order = True
+
+        rules = ["span::text", "p::text", "h1::text"]
+        selector = MagicMock(wraps=self.selector)
+        loader = AdaptiveLoader(selector=selector)
+        loader.add_first_css("name", rules)
+        assert loader.get_collected_values("name") == ["paragraph"]
+        # span::text failed and p::text matched, so p::text goes first now
+        selector.reset_mock()
+        loader.add_first_css("name", rules)
+        assert [call.args[0] for call in selector.css.call_args_list] == ["p::text"]
+        assert loader.get_collected_values("name") == ["paragraph", "paragraph"]
+
+        # The order is kept per loader class
+        ItemLoader(selector=self.selector).add_first_css("name", rules)
+        assert AdaptiveLoader._rule_usage == {
+            ("name", "css", "span::text"): [1, 0],
+            ("name", "css", "p::text"): [2, 2],
+        }
+        assert ItemLoader._rule_usage == {}
+
+
+class TestExtractionCache:
+    selector = Selector(
+        text="""
+    <html>
+    <body>
+    <div><p>first</p><span>a</span></div>
+    <div><p>second</p><span>b</span></div>
+    </body>
+    </html>
+    """
+    )
+
+    def test_shared_between_loaders(self):
+        cache = ExtractionCache()
+        selector = MagicMock(wraps=self.selector)
+        loader = ItemLoader(selector=selector, extraction_cache=cache)
+        loader.add_xpath("name", "//p/text()")
+        other_loader = CustomItemLoader(selector=selector, extraction_cache=cache)
+        other_loader.add_xpath("name", "//p/text()")
+        assert selector.xpath.call_count == 1
+        assert (cache.hits, cache.misses, len(cache)) == (1, 1, 1)
+        assert loader.load_item() == {"name": ["first", "second"]}
+        assert other_loader.load_item() == {"name": ["First", "Second"]}
+
+    def test_nested_loaders(self):
+        cache = ExtractionCache()
+        loader = ItemLoader(selector=self.selector, extraction_cache=cache)
+        nested_loader = loader.nested_css("div")
+        assert nested_loader.extraction_cache is cache
+        nested_loader.add_css("name", "p::text")
+        assert (cache.hits, cache.misses) == (0, 2)
+        # Each div is a cached node, whichever selector it comes from
+        loader.nested_xpath("//div").add_css("name", "p::text")
+        loader.nested_xpath("//div[2]").add_css("name", "p::text")
+        assert (cache.hits, cache.misses) == (3, 2)
+        assert loader.get_collected_values("name") == [
+            "first",
+            "second",
+            "first",
+            "second",
+            "second",
+        ]
+
+    def test_key(self):
+        cache = ExtractionCache()
+        loader = ItemLoader(selector=self.selector, extraction_cache=cache)
+        assert loader.get_xpath("//div[$i]/p/text()", i=1) == ["first"]
+        assert loader.get_xpath("//div[$i]/p/text()", i=2) == ["second"]
+        assert loader.get_css("span::text") == ["a", "b"]
+        assert loader.get_xpath("//span/text()") == ["a", "b"]
+        assert (cache.hits, cache.misses) == (0, 4)
+        assert loader.get_xpath("//div[$i]/p/text()", i=2) == ["second"]
+        assert (cache.hits, cache.misses) == (1, 4)
+
+    def test_cached_values_are_copied(self):
+        cache = ExtractionCache()
+        values = cache.getall(self.selector, "css", "p::text")
+        values.append("other")
+        assert cache.getall(self.selector, "css", "p::text") == ["first", "second"]
+
+    def test_unknown_rule_type(self):
+        with pytest.raises(ValueError, match="Unknown rule type"):
+            ExtractionCache().getall(self.selector, "regex", "first")
+
+    def test_all_methods(self):
+        cache = ExtractionCache()
+        loader = FirstValueLoader(selector=self.selector, extraction_cache=cache)
+        loader.add_css("name", "p::text")
+        loader.replace_css("name", "p::text")
+        loader.add_first_css("name", ["h1::text", "p::text"])
+        assert loader.get_collected_values("name") == ["first", "first", "second"]
+        assert (cache.hits, cache.misses) == (2, 2)
+        cache.clear()
+        assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+
+    @needs_parsel_jmespath
+    def test_jmes(self):
+        cache = ExtractionCache()
+        selector = Selector(text='{"name": "marta"}')
+        for _ in range(2):
+            loader = ItemLoader(selector=selector, extraction_cache=cache)
+            loader.add_jmes("name", "name")
+            assert loader.load_item() == {"name": ["marta"]}
+        assert (cache.hits, cache.misses) == (1, 1)
@@ -0,0 +1,298 @@
+import gzip
+import json
+from io import BytesIO
+from unittest.mock import patch
+
+import jmespath
+import pytest
+
+from itemloaders import ItemLoader
+from itemloaders.sources import JSONDocument, parse_json
+
+DATA = {
+    "meta": {"name": "feed", "count": 2, "tags": ["a", "b"]},
+    "items": [
+        {
+            "name": "TV",
+            "price": {"amount": 1200, "currency": "USD"},
+            "variants": [{"sku": "tv-1", "size": 32}, {"sku": "tv-2", "size": 40}],
+            "stock": None,
+        },
+        {
+            "name": "Radio",
+            "price": {"amount": 50, "currency": "EUR"},
+            "variants": [],
+            "stock": 3,
+        },
+    ],
+    "groups": [[{"id": 1}, {"id": 2}], [{"id": 3}]],
+    "labels": {"en": {"title": "Feed"}, "es": {"title": "Fuente"}},
+    "empty": {},
+}
+TEXT = json.dumps(DATA)
+
+
+class DeferredLoader(ItemLoader):
+    defer_rules = True
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "meta.name",
+        "meta",
+        "meta.tags[0]",
+        "meta.tags[-1]",
+        "meta.missing",
+        "missing.name",
+        "items",
+        "items[0].name",
+        "items[1].price.amount",
+        "items[*].name",
+        "items[*].price.amount",
+        "items[*].variants[0].sku",
+        "items[*].variants[*].sku",
+        "items[].variants[].sku",
+        "items[:1].name",
+        "items[::-1].price",
+        "items[0].variants[:1].sku",
+        "groups[]",
+        "groups[][].id",
+        "groups[*][0].id",
+        "labels.*.title",
+        "labels.*",
+        "empty.*",
+        "items[?price.amount > `100`].name",
+        "items[?stock].name",
+        "length(items)",
+        "keys(labels)",
+        "max_by(items, &price.amount).name",
+        "sort_by(items, &name)[0].name",
+        "items[0] | name",
+        "items[*].name | [0]",
+        "{name: meta.name, first: items[0].name}",
+        "[meta.name, meta.count]",
+        "items[0].price.[amount, currency]",
+        "meta.count == `2`",
+        "meta.name || missing",
+        "!meta.missing",
+        "`1`",
+        "@",
+        "@.meta.name",
+    ],
+)
+def test_parse_json(query):
+    data = parse_json(TEXT, [query])
+    assert jmespath.search(query, data) == jmespath.search(query, DATA)
+
+
+def test_parse_json_prune():
+    assert parse_json(TEXT, ["meta.name"]) == {"meta": {"name": "feed"}}
+    assert parse_json(TEXT, ["meta.name", "items[*].price.amount"]) == {
+        "meta": {"name": "feed"},
+        "items": [{"price": {"amount": 1200}}, {"price": {"amount": 50}}],
+    }
+    assert parse_json(TEXT, ["labels.*.title"]) == {
+        "labels": {"en": {"title": "Feed"}, "es": {"title": "Fuente"}},
+    }
+    assert parse_json(TEXT, ["length(items)"]) == {"items": DATA["items"]}
+    assert parse_json(TEXT, ["`1`"]) == {}
+    assert parse_json(TEXT, []) == {}
+    assert parse_json("[1, 2]", ["[0]"]) == [1, 2]
+    assert parse_json(' "a" ', ["@"]) == "a"
+
+
+def test_parse_json_bytes():
+    assert parse_json(TEXT.encode(), ["meta.name"]) == {"meta": {"name": "feed"}}
+    assert parse_json(TEXT.encode("utf-16"), ["meta.name"]) == {
+        "meta": {"name": "feed"}
+    }
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "{",
+        '{"a": 1,}',
+        '{"a" 1}',
+        '{"a": 1 "b": 2}',
+        "{'a': 1}",
+        '{"b": [1, 2}',
+        '{"a": 1} 2',
+        '{"a": [1 2]}',
+    ],
+)
+def test_parse_json_invalid(text):
+    with pytest.raises(json.JSONDecodeError):
+        parse_json(text, ["a[0]"])
+
+
+def test_document():
+    document = JSONDocument(TEXT)
+    assert document.text == TEXT
+    document.prune(["meta.name"])
+    assert document.get_data(["meta.name"]) == {"meta": {"name": "feed"}}
+    # Parsing again is not needed to prune again.
+    document.prune(["meta.count"])
+    assert document.get_data(["meta.name"]) == {"meta": {"name": "feed"}}
+    # Other expressions need the whole document.
+    assert document.get_data(["meta.count"]) == DATA
+    assert document.get_data() == DATA
+
+
+def test_document_deferred_rules():
+    loader = DeferredLoader(python_data=JSONDocument(TEXT))
+    loader.add_jmes("name", "meta.name")
+    loader.add_jmes("prices", "items[*].price.amount")
+    loader.add_jmes("tags", ["meta.labels", "meta.tags"])
+    with patch("json.loads") as loads:
+        assert loader.load_item() == {
+            "name": ["feed"],
+            "prices": [1200, 50],
+            "tags": ["a", "b"],
+        }
+    assert not loads.called
+    assert loader.python_data._chains == {
+        ("meta.name",),
+        ("items[*].price.amount",),
+        ("meta.labels",),
+        ("meta.tags",),
+    }
+
+
+def test_document_not_deferred():
+    loader = ItemLoader(python_data=JSONDocument(TEXT))
+    loader.add_jmes("name", "meta.name")
+    loader.add_jmes("count", "length(items)")
+    assert loader.load_item() == {"name": ["feed"], "count": [2]}
+    assert loader.python_data._chains is None
+
+
+def test_document_new_rules():
+    loader = DeferredLoader(python_data=JSONDocument(TEXT))
+    loader.add_jmes("name", "meta.name")
+    assert loader.load_item() == {"name": ["feed"]}
+    assert loader.get_jmes("meta.count") == [2]
+    assert loader.python_data._chains is None
+    loader.add_jmes("count", "meta.count")
+    assert loader.load_item() == {"name": ["feed"], "count": [2]}
+
+
+def test_document_nested_loader():
+    loader = DeferredLoader(python_data=JSONDocument(TEXT))
+    loader.add_jmes("name", "meta.name")
+    first_loader = loader.nested_jmes("items[0]")
+    first_loader.add_jmes("product", "name")
+    first_loader.add_jmes("skus", "variants[*].sku")
+    price_loader = first_loader.nested_jmes("price")
+    price_loader.add_jmes("price", "amount")
+    assert price_loader.python_data._prefix == ("items[0]", "price")
+    assert price_loader.load_item() == {
+        "name": ["feed"],
+        "product": ["TV"],
+        "skus": ["tv-1", "tv-2"],
+        "price": [1200],
+    }
+    assert loader.python_data._chains == {
+        ("meta.name",),
+        ("items[0]", "name"),
+        ("items[0]", "variants[*].sku"),
+        ("items[0]", "price", "amount"),
+    }
+    assert price_loader.python_data.get_data(["amount"]) == {"amount": 1200}
+    assert loader.nested_jmes("missing").python_data.get_data() is None
+
+
+HTML = b"""<html><head><meta charset="utf-8"></head>
+<body><h1>Color TV</h1><p class="price">\xe2\x82\xac1200</p></body></html>"""
+
+
+def test_from_file_html(tmp_path):
+    path = tmp_path / "page.html"
+    path.write_bytes(HTML)
+    for source in (path, str(path)):
+        loader = ItemLoader.from_file(source)
+        assert loader.selector is not None
+        assert loader.selector.type == "html"
+        loader.add_css("name", "h1::text")
+        loader.add_xpath("price", "//p/text()")
+        assert loader.load_item() == {"name": ["Color TV"], "price": ["€1200"]}
+    with path.open("rb") as file:
+        loader = ItemLoader.from_file(file)
+        assert loader.get_css("h1::text") == ["Color TV"]
+    assert ItemLoader.from_file(HTML).get_css("h1::text") == ["Color TV"]
+
+
+def test_from_file_gzip(tmp_path):
+    path = tmp_path / "page.html.gz"
+    with gzip.open(path, "wb") as file:
+        file.write(HTML)
+    with gzip.open(path) as file:
+        loader = ItemLoader.from_file(file)
+        assert loader.get_css("h1::text") == ["Color TV"]
+
+
+def test_from_file_position(tmp_path):
+    path = tmp_path / "page.json"
+    path.write_bytes(b"header\n" + json.dumps(DATA).encode())
+    with path.open("rb") as file:
+        file.readline()
+        loader = ItemLoader.from_file(file)
+        assert loader.get_jmes("meta.name") == ["feed"]
+    with path.open("rb", buffering=0) as raw_file:
+        raw_file.seek(7)
+        loader = ItemLoader.from_file(raw_file)
+        assert loader.get_jmes("meta.name") == ["feed"]
+
+
+def test_from_file_xml(tmp_path):
+    path = tmp_path / "feed.xml"
+    path.write_bytes(
+        b'<?xml version="1.0" encoding="ISO-8859-1"?><feed><item>caf\xe9</item></feed>'
+    )
+    loader = ItemLoader.from_file(path, type="xml")
+    assert loader.selector is not None
+    assert loader.selector.type == "xml"
+    assert loader.get_xpath("//item/text()") == ["café"]
+
+
+def test_from_file_empty(tmp_path):
+    path = tmp_path / "empty.html"
+    path.write_bytes(b"")
+    loader = ItemLoader.from_file(path)
+    assert loader.get_xpath("/*") == ["<html></html>"]
+    assert ItemLoader.from_file(b" \n").get_xpath("/*") == ["<html></html>"]
+
+
+def test_from_file_json(tmp_path):
+    path = tmp_path / "feed.json"
+    path.write_bytes(TEXT.encode())
+    loader = DeferredLoader.from_file(path, stats=None)
+    assert isinstance(loader.python_data, JSONDocument)
+    mapping = loader._mapping
+    assert mapping is not None
+    loader.add_jmes("name", "meta.name")
+    assert loader.load_item() == {"name": ["feed"]}
+    assert mapping.closed
+    assert loader._mapping is None
+    assert loader.get_jmes("meta.name") == ["feed"]
+    with pytest.raises(ValueError, match="closed"):
+        loader.get_jmes("meta.count")
+
+
+def test_from_file_json_buffer():
+    loader = ItemLoader.from_file(BytesIO(TEXT.encode("utf-16")))
+    loader.add_jmes("prices", "items[*].price.amount")
+    assert loader.load_item() == {"prices": [1200, 50]}
+    loader = ItemLoader.from_file(memoryview(b" [1, 2]"), type="json")
+    assert loader.get_jmes("[0]") == [1]
+
+
+def test_from_file_html_encoding():
+    body = "<html><body><p>café</p></body></html>".encode("cp1252")
+    assert ItemLoader.from_file(body, encoding="cp1252").get_css("p::text") == ["café"]
+    body = '<meta charset="cp1252"><p>café</p>'.encode("cp1252")
+    assert ItemLoader.from_file(body).get_css("p::text") == ["café"]
+    body = "<p>café</p>".encode("utf-16")
+    assert ItemLoader.from_file(body).get_css("p::text") == ["café"]
@@ -0,0 +1,108 @@
+import re
+from collections import Counter
+
+import pytest
+from parsel import Selector
+
+from itemloaders import ItemLoader
+from itemloaders.processors import MapCompose, TakeFirst
+from itemloaders.xslt import XPathStylesheet, get_xslt_incompatibility
+
+selector = Selector(
+    text="""
+<html>
+<body>
+<h1> Color &amp; TV </h1>
+<div class="price" data-currency="">
+  <span>$</span>1200<span>.50</span>
+</div>
+<ul><li>tv</li><li>color</li><li class="new">new</li></ul>
+<a href="/tv?a=1&amp;b=2" title="TV">TV</a>
+</body>
+</html>
+"""
+)
+
+RULES = {
+    "name": "//h1/text()",
+    "price": ["//div[@class='price']/text()", "//div[@class='price']/span/text()"],
+    "currency": "//div/@data-currency",
+    "tags": ["body/ul/li[not(@class)]/text()", "//li[last()]/text()"],
+    "url": "//a/@href",
+    "title": "//a/attribute::title",
+    "attributes": "//a/@*",
+    "missing": "//h2/text()",
+}
+
+
+class ProductLoader(ItemLoader):
+    default_output_processor = TakeFirst()
+    name_in = MapCompose(str.strip)
+
+
+def test_extract():
+    stylesheet = XPathStylesheet(RULES)
+    assert stylesheet.extract(selector) == {
+        field_name: [
+            value
+            for query in stylesheet.rules[field_name]
+            for value in selector.xpath(query).getall()
+        ]
+        for field_name in RULES
+    }
+    nested_selector = selector.xpath("//ul")
+    assert stylesheet.extract(nested_selector)["tags"] == ["new"]
+    assert stylesheet.extract(nested_selector.xpath("li"))["tags"] == [
+        "new",
+        "new",
+        "new",
+    ]
+
+
+def test_add_values():
+    stats: Counter[str] = Counter()
+
+    class Stats:
+        def inc_value(self, key, count=1):
+            stats[key] += count
+
+    loader = ProductLoader(selector=selector, stats=Stats())
+    XPathStylesheet(RULES).add_values(loader)
+    other_loader = ProductLoader(selector=selector)
+    for field_name, queries in RULES.items():
+        other_loader.add_xpath(field_name, queries)
+    assert loader.load_item() == other_loader.load_item()
+    assert loader.load_item()["name"] == "Color & TV"
+    assert stats["parser/price/xpath///div[@class='price']/span/text()"] == 1
+    assert stats["parser/missing/xpath///h2/text()"] == 0
+
+
+def test_add_values_no_selector():
+    with pytest.raises(RuntimeError):
+        XPathStylesheet(RULES).add_values(ItemLoader())
+
+
+@pytest.mark.parametrize(
+    ("query", "reason"),
+    [
+        ("//h1", "selects elements"),
+        ("count(//li)", "not a plain location path"),
+        ("//li/text() | //h1/text()", "not a plain location path"),
+        ("//li[@class=$class]/text()", "XPath variables"),
+        ("//g:price/text()", "namespace prefixes"),
+        ("//h1[", "not a valid XPath expression"),
+    ],
+)
+def test_incompatible_rules(query, reason):
+    incompatibility = get_xslt_incompatibility(query)
+    assert incompatibility is not None
+    assert reason in incompatibility
+    with pytest.raises(ValueError, match=re.escape(f"{query!r} of field 'name': it")):
+        XPathStylesheet({"name": ["//h1/text()", query]})
+
+
+def test_literals():
+    assert get_xslt_incompatibility("//a[@href='$x:y']/@title") is None
+    assert XPathStylesheet({"title": "//a[@href='/tv?a=1&b=2']/@title"}).extract(
+        selector
+    ) == {"title": ["TV"]}